@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+North Sea energy hub optimisation: MILP design (wind turbines, floating PV, battery, electrolyser, compressor,
+H2 storage) maximising the NPV, with the hourly dispatch of one or more years.
+
+    from energy_hub import load_inputs, build_model, solve, postprocess
+    inputs = load_inputs('input/input_file.xlsx')
+    model = build_model(inputs)
+    solve(model, inputs)
+    results = postprocess(model, inputs)
+
+Command line: python -m energy_hub --help. matplotlib is only imported by plots.py, when a plot is made.
+"""
+from .inputs import load_inputs, INPUT_NAMES
+from .model import CreateModel, CreateCompactModel, AddDesign, AddOperation, design_constants
+from .pipeline import build_model, solve, postprocess
+from .sweep import DESIGN_VARIABLES
+
+__all__ = ['load_inputs', 'INPUT_NAMES', 'CreateModel', 'CreateCompactModel', 'AddDesign', 'AddOperation', 'design_constants', 'build_model', 'solve', 'postprocess', 'DESIGN_VARIABLES']
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"python -m energy_hub [options], see cli.py"
+from .cli import main
+
+if __name__ == '__main__':
+    main()
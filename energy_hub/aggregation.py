@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Time-series aggregation: representative days.
+
+The hourly wind, solar and price profiles are cut in days and clustered with k-medoids (profiles scaled to [0,1]
+so the three have the same influence). Every cluster is represented by its medoid, a real day of the input data,
+weighted with the number of days in the cluster. The reduced profiles (k*24 hours) go into CreateModel with
+hour_weights, and LinkRepresentativeDays (model.py) links the storage levels over the sequence of original days.
+"""
+import numpy as np
+
+
+def kmedoids(X, k, seed=0, max_iter=100):
+    "k-medoids (k-medoids++ initialisation, alternate assignment/medoid update). X = n x features. Returns medoids, labels"
+    n = len(X)
+    k = min(k, n)
+    sq = (X**2).sum(axis=1)
+    D = np.sqrt(np.maximum(sq[:, None] + sq[None, :] - 2*X @ X.T, 0))
+    rng = np.random.default_rng(seed)
+    medoids = [int(rng.integers(n))]
+    for _ in range(1, k):
+        d = D[:, medoids].min(axis=1)
+        if d.sum() > 0:
+            medoids.append(int(rng.choice(n, p=d/d.sum())))
+        else:                                                    #remaining days identical to the medoids
+            medoids.append(int(rng.choice(np.setdiff1d(np.arange(n), medoids))))
+    medoids = np.array(medoids)
+    for _ in range(max_iter):
+        labels = D[:, medoids].argmin(axis=1)
+        new = medoids.copy()
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if members.size:
+                new[c] = members[D[np.ix_(members, members)].sum(axis=1).argmin()]
+        if np.array_equal(new, medoids):
+            break
+        medoids = new
+    return medoids, D[:, medoids].argmin(axis=1)
+
+
+def aggregate_profiles(df_EWind_h, df_EPV_h, df_electricity_prices, k, period_length=24, seed=0,
+                       columns=('Wind_Power_1', 'Power_Output[kWh/m2]', 'Average_2015_2022_[EUR/kWh]')):
+    """
+    Clusters the days of the hourly profiles in k representative days.
+    Returns a dict with the reduced DataFrames (same columns as the inputs, medoid days in chronological order),
+    hour_weights (days represented by every hour, scaled so the weights add up to the full horizon),
+    assignment (representative day of every original day), medoids (original day of every representative day)
+    and period_length.
+    """
+    n_days = len(df_EPV_h)//period_length
+    if n_days*period_length < len(df_EPV_h):
+        print('\n Representative days: the last %i hours do not make a full day and are not clustered' %(len(df_EPV_h) - n_days*period_length))
+    profiles = np.column_stack([df_EWind_h[columns[0]].to_numpy(dtype=float), df_EPV_h[columns[1]].to_numpy(dtype=float),
+                                df_electricity_prices[columns[2]].to_numpy(dtype=float)])[:n_days*period_length]
+    span = profiles.max(axis=0) - profiles.min(axis=0)
+    scaled = (profiles - profiles.min(axis=0))/np.where(span > 0, span, 1)
+    X = scaled.reshape(n_days, period_length, -1).reshape(n_days, -1)           #one row per day: 24 wind, solar and price values
+
+    medoids, labels = kmedoids(X, k, seed)
+    order = np.argsort(medoids)                                                 #representative days in chronological order
+    medoids = medoids[order]
+    assignment = np.argsort(order)[labels]
+    counts = np.bincount(assignment, minlength=len(medoids))
+
+    hours = np.concatenate([np.arange(m*period_length, (m+1)*period_length) for m in medoids])
+    scale = len(df_EPV_h)/(n_days*period_length)
+    return {'df_EWind_h': df_EWind_h.iloc[hours].reset_index(drop=True),
+            'df_EPV_h': df_EPV_h.iloc[hours].reset_index(drop=True),
+            'df_electricity_prices': df_electricity_prices.iloc[hours].reset_index(drop=True),
+            'hour_weights': np.repeat(counts*scale, period_length),
+            'assignment': assignment,
+            'medoids': medoids,
+            'period_length': period_length}
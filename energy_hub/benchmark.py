@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite on synthetic input data (synthetic.py): build, solve and postprocess times at increasing horizon and
+scenario sizes, tracked in a history file, with a regression check.
+
+    python -m energy_hub.benchmark                          # suite 'default', history benchmarks/history.json
+    python -m energy_hub.benchmark --suite full --repeat 3
+    python -m energy_hub.benchmark --cases h168 s4x168 --solver highs
+    python -m energy_hub.benchmark --compare-compact        # compact formulation against the full one
+    python -m energy_hub.benchmark --accept                 # this run is the new baseline (expected change)
+
+Every case is timed with the phases of profiling.py (build_model, solver, postprocess), the best of --repeat runs.
+A run is compared with the baseline of the same machine, solver and profile in the history: the median of the last
+--window runs without regressions, from the last run recorded with --accept on (a deliberate slow-down or a changed
+optimum is accepted as the new baseline, the earlier runs are no longer compared). A phase slower than baseline*(1 + --threshold) and more than --min-seconds slower
+is a regression, so is an objective value that changed by more than the MIP gaps (the synthetic data is the same in every
+run, an optimisation of the model must not change its optimum). The run is appended to the history and the exit code is 1 on regressions.
+The history is plain JSON (one entry per run, with the git commit) so it can be kept in the repository or on a CI cache.
+--compare-compact solves the single-horizon cases with both formulations (model.AddOperation compact=False/True) and fails
+if the objective, the design or the hourly flows differ.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import numpy as np
+import pyomo.environ as pyo
+from .profiling import RunProfile, phase
+from .synthetic import synthetic_inputs, synthetic_scenarios
+from .pipeline import build_model, solve, postprocess
+from .model import CreateStochasticModel
+from .solvers import make_solver, select_solver, PROFILES
+from .results import extract_timeseries
+from .sweep import DESIGN_VARIABLES
+
+#hours: horizon of the single-year model, scenarios: number of weather years of the stochastic model (extensive form), compact: compact formulation
+CASES = {
+    'h168': dict(hours=168),
+    'h720': dict(hours=720),
+    'h720c': dict(hours=720, compact=True),
+    'h2190': dict(hours=2190),
+    'h8760': dict(hours=8760),
+    'h17520': dict(hours=17520),
+    'h70080': dict(hours=70080),                                #8 years
+    's4x168': dict(hours=168, scenarios=4),
+    's8x720': dict(hours=720, scenarios=8),
+    's4x8760': dict(hours=8760, scenarios=4),
+}
+SUITES = {
+    'quick': ['h168', 'h720', 's4x168'],
+    'default': ['h168', 'h720', 'h720c', 'h2190', 's4x168', 's8x720'],
+    'full': list(CASES),
+}
+PHASES = ['build_model', 'solver', 'postprocess']
+DEFAULT_HISTORY = os.path.join('benchmarks', 'history.json')
+
+
+def run_case(name, solver=None, profile='fast', seed=0):
+    "Times of the phases of case name (CASES) on synthetic data, with the model size and the objective"
+    case = CASES[name]
+    inputs = synthetic_inputs(case['hours'], seed)                          #generated before the timing
+    scenarios = synthetic_scenarios(case['hours'], case['scenarios'], seed) if case.get('scenarios') else None
+    with RunProfile() as run_profile:
+        if scenarios:
+            with phase('build_model'):
+                model = CreateStochasticModel(*[inputs[name] for name in ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen']], scenarios,
+                                              compact=case.get('compact', False))
+            opt = make_solver(solver, profile)
+            opt.solve(model)
+            solve_stats = opt.stats
+            with phase('postprocess'):
+                for s in model.S:
+                    extract_timeseries(model.scenario[s])
+        else:
+            model = build_model(inputs, compact=case.get('compact', False))
+            solve_stats = solve(model, inputs, solver, profile)
+            with phase('postprocess'):
+                postprocess(model, inputs)
+    times = {record['phase']: record['wall_time_s'] for record in run_profile.phases if record['phase'] in PHASES}
+    return {'times_s': times, 'peak_rss_mb': run_profile.info['peak_rss_mb'], 'n_variables': model.nvariables(), 'n_constraints': model.nconstraints(),
+            'objective': solve_stats['objective'], 'termination': solve_stats['termination'], 'gap': solve_stats['gap']}
+
+
+def run_suite(cases, solver=None, profile='fast', repeat=1, seed=0):
+    "{case: result of run_case} with the best time of every phase over repeat runs"
+    results = {}
+    for name in cases:
+        runs = [run_case(name, solver, profile, seed) for i in range(repeat)]
+        result = runs[-1]
+        result['times_s'] = {key: min(run['times_s'][key] for run in runs) for key in result['times_s']}
+        results[name] = result
+        print(' %-8s %8i variables  build %7.3f s  solve %8.3f s  postprocess %7.3f s  objective %s' %(name, result['n_variables'], result['times_s'].get('build_model', np.nan),
+                                                                                                result['times_s'].get('solver', np.nan), result['times_s'].get('postprocess', np.nan), result['objective']))
+    return results
+
+
+def compare_formulations(hours, solver=None, seed=0, rtol=1e-6):
+    """
+    Solves the full and the compact formulation on the same synthetic data with the exact profile (no MIP gap).
+    Returns (differences, sizes): differences = [(what, full, compact)] beyond rtol (objective, design variables,
+    hourly flows where the design is the same), sizes = {formulation: (variables, constraints)}.
+    """
+    inputs = synthetic_inputs(hours, seed)
+    models = {}
+    for compact in [False, True]:
+        model = build_model(inputs, compact=compact)
+        solve(model, inputs, solver, 'exact')
+        models[compact] = model
+    full, compact = models[False], models[True]
+    scale = max(abs(pyo.value(full.ObjFunction)), 1)
+    differences = []
+    if abs(pyo.value(full.ObjFunction) - pyo.value(compact.ObjFunction)) > rtol*scale:
+        differences.append(('objective', pyo.value(full.ObjFunction), pyo.value(compact.ObjFunction)))
+    for name in DESIGN_VARIABLES:
+        value_full, value_compact = pyo.value(getattr(full, name)), pyo.value(getattr(compact, name))
+        if abs(value_full - value_compact) > rtol*max(abs(value_full), 1):
+            differences.append((name, value_full, value_compact))
+    if not differences:                                         #same design: the KPIs of postprocess must match (the dispatch itself may have alternative optima)
+        kpis_full, kpis_compact = postprocess(full, inputs), postprocess(compact, inputs)
+        for name in ['NPV', 'LCOE', 'LCOH', 'curtailed_percentage']:
+            if abs(kpis_full[name] - kpis_compact[name]) > 1e-4*max(abs(kpis_full[name]), 1):
+                differences.append((name, kpis_full[name], kpis_compact[name]))
+    return differences, {'full': (full.nvariables(), full.nconstraints()), 'compact': (compact.nvariables(), compact.nconstraints())}
+
+
+def machine():
+    "Machine of a benchmark run (results are only compared between runs on the same machine)"
+    return {'node': platform.node(), 'processor': platform.processor() or platform.machine(), 'cpu_count': os.cpu_count(), 'python': platform.python_version()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def baseline(history, entry, case, window=5):
+    "Median times of the phases of case and objective of the last window runs of history comparable with entry, without regressions, from the last accepted run"
+    runs = []
+    for run in history:
+        if (run['machine'] != entry['machine'] or run['solver'] != entry['solver'] or run['profile'] != entry['profile'] or run.get('seed') != entry.get('seed')
+                or case not in run['results']):
+            continue
+        if run.get('accepted'):                                 #new baseline, regressions or not
+            runs = [run['results'][case]]
+        elif not any(regression['case'] == case for regression in run['regressions']):
+            runs.append(run['results'][case])
+    runs = runs[-window:]
+    if not runs:
+        return None
+    return {'times_s': {key: float(np.median([run['times_s'][key] for run in runs if key in run['times_s']])) for key in PHASES if any(key in run['times_s'] for run in runs)},
+            'objective': runs[-1]['objective'], 'gap': runs[-1]['gap'], 'n_runs': len(runs)}
+
+
+def find_regressions(history, entry, threshold=0.25, min_seconds=0.05, window=5, objective_tol=1e-6):
+    "Regressions of entry against the baseline of every case: [{'case', 'phase', 'baseline', 'value'}]"
+    regressions = []
+    for case, result in entry['results'].items():
+        base = baseline(history, entry, case, window)
+        if base is None:
+            continue
+        for key, value in result['times_s'].items():
+            if key in base['times_s'] and value > base['times_s'][key]*(1 + threshold) and value - base['times_s'][key] > min_seconds:
+                regressions.append({'case': case, 'phase': key, 'baseline': base['times_s'][key], 'value': value})
+        tolerance = max(objective_tol, (result['gap'] or 0) + (base['gap'] or 0))           #both within their MIP gap of the optimum
+        if result['objective'] is not None and base['objective'] is not None and abs(result['objective'] - base['objective']) > tolerance*max(abs(base['objective']), 1):
+            regressions.append({'case': case, 'phase': 'objective', 'baseline': base['objective'], 'value': result['objective']})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Energy hub benchmark suite on synthetic data')
+    parser.add_argument('--suite', choices=list(SUITES), default='default', help='cases of the run: %s' %'; '.join('%s = %s' %(key, ', '.join(val)) for key, val in SUITES.items()))
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help='cases of the run (instead of --suite)')
+    parser.add_argument('--solver', choices=['gurobi', 'highs', 'cbc', 'glpk'], help='solver (default: the first available)')
+    parser.add_argument('--profile', choices=list(PROFILES), default='fast', help='solver performance profile (default fast)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs of every case, the best time of every phase is kept (default 1)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic data (default 0)')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='history file (default %s)' %DEFAULT_HISTORY)
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative slow-down of a phase that is a regression (default 0.25)')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='absolute slow-down of a phase that is a regression [s] (default 0.05)')
+    parser.add_argument('--window', type=int, default=5, help='baseline = median of the last WINDOW comparable runs (default 5)')
+    parser.add_argument('--no-record', action='store_true', help='compare with the history but do not append this run')
+    parser.add_argument('--accept', action='store_true', help='record this run as the new baseline (expected slow-down or objective change), exit code 0')
+    parser.add_argument('--compare-compact', action='store_true', help='check the compact formulation against the full one on the single-horizon cases (no timing, no history)')
+    args = parser.parse_args(argv)
+
+    if args.compare_compact:
+        failed = 0
+        for name in args.cases or SUITES[args.suite]:
+            if CASES[name].get('scenarios') or CASES[name].get('compact'):
+                continue
+            differences, sizes = compare_formulations(CASES[name]['hours'], args.solver, args.seed)
+            print(' %-8s full %i variables, %i constraints, compact %i variables, %i constraints: %s' %(name, *sizes['full'], *sizes['compact'], 'same optimum' if not differences else differences))
+            failed += bool(differences)
+        return 1 if failed else 0
+
+    cases = args.cases or SUITES[args.suite]
+    entry = {'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'commit': git_commit(), 'machine': machine(), 'solver': select_solver(args.solver),
+             'profile': args.profile, 'seed': args.seed, 'repeat': args.repeat, 'accepted': args.accept}
+    print('\n Benchmark %s on %s, solver %s, profile %s' %(', '.join(cases), entry['machine']['node'], entry['solver'], args.profile))
+    entry['results'] = run_suite(cases, entry['solver'], args.profile, args.repeat, args.seed)
+
+    history = load_history(args.history)
+    entry['regressions'] = find_regressions(history, entry, args.threshold, args.min_seconds, args.window)
+    for regression in entry['regressions']:
+        print(' Regression: %s %s = %.6g (baseline %.6g)' %(regression['case'], regression['phase'], regression['value'], regression['baseline']))
+    if not args.no_record:
+        os.makedirs(os.path.dirname(args.history) or '.', exist_ok=True)
+        with open(args.history, 'w') as f:
+            json.dump(history + [entry], f, indent=1)
+    print('\n %i regression(s)%s, %s' %(len(entry['regressions']), ' accepted as the new baseline' if args.accept else '', 'not recorded' if args.no_record else 'recorded in %s' %args.history))
+    return 1 if entry['regressions'] and not args.accept else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Benders decomposition between the design (master problem) and the hourly operation (subproblems).
+
+The master chooses the design and the coupling values (e.g. storage levels between months) and has one variable
+theta[k] per subproblem, the revenues of block k. Every subproblem is an LP with copies of the master variables
+fixed by the constraints ccopy[name] == master_value[name]: the optimal value Q_k and the duals of ccopy give the
+optimality cut theta[k] <= Q_k + sum(dual*(master variable - master value)), added to the master every iteration.
+
+The subproblems are built once in worker processes (a group of blocks per worker) and solved in parallel, only the
+mutable master_value Params change between iterations. Where fork is not available (Windows) they are solved in
+the main process.
+"""
+import os
+import time
+import multiprocessing as mp
+import pandas as pd
+import pyomo.environ as pyo
+from .solvers import make_solver, default_threads, profile_settings
+
+
+def _solve_subproblems(subs, values, opts):
+    "[(k, Q_k, {name: dQ_k/dname})] for the master values"
+    rows = []
+    for k, sub in subs.items():
+        opt = opts[k]
+        for name in sub.master_value:
+            sub.master_value[name] = values[name]
+        results = opt.solve(sub)
+        if not opt.optimal():
+            raise RuntimeError('Benders subproblem %i is %s' %(k, opt.stats['termination']))
+        duals = results.solution_loader.get_duals() if opt.persistent else sub.dual
+        #max problem: the dual of ccopy[name] is the derivative of the objective with respect to master_value[name]
+        rows.append((k, pyo.value(sub.ObjFunction), {name: duals[sub.ccopy[name]] for name in sub.master_value}))
+    return rows
+
+
+def _build_subproblems(build_subproblem, blocks, solver, profile, settings, solver_options):
+    subs = {k: build_subproblem(k) for k in blocks}
+    if solver == 'persistent':                                  #one solver per subproblem, each keeps its model in memory
+        opts = {k: make_solver(solver, profile, options=solver_options, **settings) for k in subs}
+    else:
+        opts = dict.fromkeys(subs, make_solver(solver, profile, options=solver_options, **settings))
+        for sub in subs.values():
+            sub.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    return subs, opts
+
+
+def _worker(conn, build_subproblem, blocks, solver, profile, settings, solver_options):
+    try:
+        subs, opts = _build_subproblems(build_subproblem, blocks, solver, profile, settings, solver_options)
+        while True:
+            values = conn.recv()
+            if values is None:
+                break
+            conn.send(_solve_subproblems(subs, values, opts))
+    except Exception as err:                                    # reported to the main process, which stops the decomposition
+        conn.send(('error', repr(err)))
+    finally:
+        conn.close()
+
+
+def _solve_master(master, opt, master_solver, profile):
+    """
+    Solves the master with opt, again with presolve off when the solve fails: the cuts of many iterations have coefficients
+    from 1e-2 to 1e5 and the HiGHS presolve can stop with a solve error on them, while the model solves without it.
+    Returns the solver of the last solve.
+    """
+    try:
+        opt.solve(master)
+        if opt.optimal() or opt.stats['bound'] is not None:
+            return opt
+    except RuntimeError:                                        #the APPSI interfaces (appsi_highs) raise when no solution can be loaded
+        pass
+    retry = make_solver(master_solver, {**profile_settings(profile), 'presolve': 'off'})
+    retry.solve(master)
+    return retry
+
+
+def solve_benders(master, master_vars, build_subproblem, n_blocks, solver=None, master_solver=None, profile='default', solver_options=None,
+                  workers=None, tol=1e-4, max_iter=100):
+    """
+    master = Pyomo model with the variables theta[k] (k = 0..n_blocks-1) in its maximised ObjFunction, bounded above.
+    master_vars = {name: master variable} for every name of master_value in the subproblems.
+    build_subproblem(k) -> Pyomo model with a maximised ObjFunction, mutable Param master_value[name] and constraints ccopy[name].
+    solver, master_solver = subproblem and master solvers, profile = their settings (see solvers.make_solver, solver can be 'persistent').
+    Stops when (upper bound - lower bound)/|upper bound| <= tol. The master variables are left at the best design found
+    (highest lower bound).
+    Returns a DataFrame with the bounds of every iteration.
+    """
+    workers = min(workers or os.cpu_count() or 1, n_blocks)
+    settings = default_threads(profile, workers)
+    groups = [list(range(w, n_blocks, workers)) for w in range(workers)]
+    if not hasattr(master, 'cuts'):
+        master.cuts = pyo.ConstraintList()
+    opt_master = make_solver(master_solver, profile)
+
+    fork = 'fork' in mp.get_all_start_methods()
+    conns = []
+    procs = []
+    if fork:
+        ctx = mp.get_context('fork')
+        for group in groups:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(child, build_subproblem, group, solver, profile, settings, solver_options))
+            proc.start()
+            child.close()
+            conns.append(parent)
+            procs.append(proc)
+    else:
+        print('\n fork not available, the Benders subproblems are solved in the main process')
+        subs, opts_sub = _build_subproblems(build_subproblem, range(n_blocks), solver, profile, settings, solver_options)
+
+    history = []
+    best_values = None
+    try:
+        for iteration in range(1, max_iter + 1):
+            start = time.perf_counter()
+            opt = _solve_master(master, opt_master, master_solver, profile)
+            #upper bound: the dual bound of the master (its incumbent is lower by up to the MIP gap), the objective only when the solver reports no bound
+            upper = opt.stats['bound']
+            if upper is None:
+                if not opt.optimal():
+                    raise RuntimeError('Benders master is %s' %opt.stats['termination'])
+                upper = pyo.value(master.ObjFunction)
+            if history:                                         #the cuts only lower the master bound, kept monotone despite the solver tolerances
+                upper = min(upper, history[-1]['upper_bound'])
+            values = {name: pyo.value(var) for name, var in master_vars.items()}
+            time_master = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if fork:
+                for conn in conns:
+                    conn.send(values)
+                rows = []
+                for conn in conns:
+                    reply = conn.recv()
+                    if isinstance(reply, tuple) and reply[0] == 'error':
+                        raise RuntimeError('Benders worker failed: %s' %reply[1])
+                    rows.extend(reply)
+            else:
+                rows = _solve_subproblems(subs, values, opts_sub)
+            time_sub = time.perf_counter() - start
+
+            for k, Q, grad in rows:
+                master.cuts.add(master.theta[k] <= Q + sum(g*(master_vars[name] - values[name]) for name, g in grad.items() if abs(g) > 1e-9))   #solver noise dropped
+            #lower bound: master objective with the theta of the subproblem values (design of this iteration)
+            theta = {k: pyo.value(master.theta[k]) for k in master.theta}
+            for k, Q, grad in rows:
+                master.theta[k].set_value(Q, skip_validation=True)
+            lower = pyo.value(master.ObjFunction)
+            for k in theta:
+                master.theta[k].set_value(theta[k], skip_validation=True)
+            if not history or lower > history[-1]['lower_bound']:
+                best_values = values
+            best_lower = max(lower, history[-1]['lower_bound'] if history else lower)
+            gap = (upper - best_lower)/max(abs(upper), 1)
+            history.append({'iteration': iteration, 'lower_bound': best_lower, 'upper_bound': upper, 'gap': gap,
+                            'master_time_s': time_master, 'subproblems_time_s': time_sub, 'master_solver': opt.stats['solver'],
+                            'master_termination': opt.stats['termination'], 'profile': opt.stats['profile']})
+            print('\n Benders iteration %i: lower bound = %4.2f, upper bound = %4.2f, gap = %6.4f %% (master %4.2f s, subproblems %4.2f s)'
+                  %(iteration, best_lower, upper, gap*100, time_master, time_sub))
+            if gap <= tol:
+                break
+    finally:
+        for conn in conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for proc in procs:
+            proc.join()
+    if best_values is not None:
+        for name, var in master_vars.items():
+            var.set_value(best_values[name], skip_validation=True)
+    return pd.DataFrame(history).set_index('iteration')
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+Command line of the energy hub model: python -m energy_hub [options] (or Energy_Hub_Optimization_REV3.py).
+
+Runs the base case (load_inputs -> build_model -> solve -> postprocess), the report (report.py), the H2 price sensitivity and
+the optional analyses selected by the options (rolling horizon, Benders, representative days, multi-year,
+stochastic design, Monte-Carlo, site screening, Pareto front, what-if re-solve). The inputs are read from --input, every output file is written to --output.
+"""
+import os
+import time
+import json
+import argparse
+import pyomo.environ as pyo
+from .inputs import load_inputs, INPUT_NAMES, DEFAULT_INPUT_FILE
+from .pipeline import build_model, solve, postprocess, print_results, cache_results
+from .model import CreateModel, CreateCompactModel, CreateMultiYearModel, CreateStochasticModel, LinkRepresentativeDays
+from .decomposition import RollingHorizonDispatch, BendersDecomposition, StochasticProgressiveHedging
+from .uncertainty import MonteCarloDistributions, MonteCarloEvaluator
+from .solvers import make_solver, profile_settings, available, PROFILES
+from .sweep import run_sweep, DESIGN_VARIABLES
+from .aggregation import aggregate_profiles
+from .timeseries import iter_years, count_hours
+from .results import extract_timeseries, solution_arrays
+from .montecarlo import run_montecarlo
+from .report import render_report, MAX_POINTS
+from .profiling import RunProfile, phase
+from .incremental import IncrementalModel, apply_change
+from .sites import read_sites, run_sites
+from .pareto import pareto_front, METRICS
+from .persistent_solver import PERSISTENT_SOLVERS
+
+
+def build_parser():
+    #Run Options (command line), main() uses parse_known_args so the script still runs from Spyder/IPython
+    parser = argparse.ArgumentParser(description='Energy Hub Optimisation - North Sea')
+    parser.add_argument('--rebuild-cache', action='store_true', help='parse input_file.xlsx again and rebuild the sheet cache in input/.cache')
+    parser.add_argument('--build-benchmark', action='store_true', help='time CreateModel vs CreateMatrixModel for 1, 5 and 8 years of hourly data')
+    parser.add_argument('--compact', action='store_true', help='compact formulation: the flows fixed by an equality row are expressions, about half the variables and rows, same optimum')
+    parser.add_argument('--persistent', action='store_true', help='persistent solver (Gurobi or HiGHS via Pyomo APPSI): changing a mutable Param only updates the affected coefficients')
+    parser.add_argument('--representative-days', type=int, default=0, metavar='K', help='also solve the model on K representative days (k-medoids) and report the NPV error against the full resolution')
+    parser.add_argument('--multi-year', metavar='FILE', help='also solve the model over several years of hourly data streamed from FILE (csv or parquet, one block per year)')
+    parser.add_argument('--hours-per-year', type=int, default=8760, help='hours per year block of --multi-year (default 8760)')
+    parser.add_argument('--rolling-horizon', action='store_true', help='dispatch with the design of the base run fixed, in overlapping windows (on the --multi-year file if given)')
+    parser.add_argument('--window', type=int, default=168, help='rolling horizon window [h] (default 168)')
+    parser.add_argument('--overlap', type=int, default=24, help='rolling horizon overlap between windows [h] (default 24)')
+    parser.add_argument('--max-ramp-violation', type=float, default=None, help='rolling horizon: stop when the electrolyser ramp limit is exceeded by more than this total [kW] (default: warning only)')
+    parser.add_argument('--benders', type=int, default=0, metavar='HOURS', help='also solve the model by Benders decomposition with blocks of HOURS hours (730 = months), subproblems in parallel')
+    parser.add_argument('--monte-carlo', type=int, default=0, metavar='N', help='Monte-Carlo run of N samples (CAPEX/OPEX, H2 price, electrolyser efficiency, weather year of --multi-year), resumed if the store exists')
+    parser.add_argument('--mc-store', metavar='FILE', help='Monte-Carlo results store (SQLite), default output/montecarlo.sqlite')
+    parser.add_argument('--mc-seed', type=int, default=0, help='Monte-Carlo seed (default 0)')
+    parser.add_argument('--stochastic', choices=['extensive', 'ph'], help='two-stage stochastic design over the years of --multi-year (equal probabilities): extensive form or progressive hedging')
+    parser.add_argument('--ph-rho', type=float, default=2, help='progressive hedging penalty, share of the cost of every design variable (default 2)')
+    parser.add_argument('--sites', metavar='FILE', help='screen the candidate hub locations of the site table FILE (csv/xlsx: site, profiles file, parameters of the input sheets), ranked by NPV in OUTPUT/site_ranking.csv')
+    parser.add_argument('--site-workers', type=int, help='worker processes of --sites (default one per core)')
+    parser.add_argument('--site-memory', type=float, metavar='MB', help='memory limit per worker of --sites [MB], also limits the workers to what fits in the RAM')
+    parser.add_argument('--pareto', choices=list(METRICS), help='Pareto front of the NPV vs curtailment, LCOH proxy or electrolyser capacity x4 (epsilon-constraint points solved in parallel), in OUTPUT/pareto_<metric>.csv')
+    parser.add_argument('--pareto-points', type=int, default=20, help='points of the --pareto front (default 20)')
+    parser.add_argument('--pareto-npv-floor', type=float, default=0, help='NPV at the far end of the --pareto front (default 0)')
+    parser.add_argument('--what-if', nargs='+', metavar='CHANGE', help="re-solve the base case incrementally with CHANGEs: NAME=VALUE (mutable Param, e.g. pipe_capacity=40000), xN<=VALUE, xN>=VALUE, PROFILE[START:END]*FACTOR (solar, wind, price hours)")
+    parser.add_argument('--lp-rounding', type=float, nargs='?', const=0.01, metavar='GAP', help='fast solve of the base case and of --sites: LP relaxation, then x2 (turbines) rounded down and up as two LPs in parallel, the MILP only when the certified gap is above GAP (default 0.01)')
+    parser.add_argument('--solver', choices=['gurobi', 'highs', 'cbc', 'glpk'], help='solver (default: the first available of gurobi, highs, cbc, glpk)')
+    parser.add_argument('--profile', choices=list(PROFILES), default='default', help='solver performance profile (solvers.py): default, fast (1%% gap, 10 min), exact, lp (barrier without crossover)')
+    parser.add_argument('--threads', type=int, help='solver threads (overrides the profile)')
+    parser.add_argument('--mip-gap', type=float, help='relative MIP gap (overrides the profile)')
+    parser.add_argument('--time-limit', type=float, help='time limit per solve [s] (overrides the profile)')
+    parser.add_argument('--no-cache', action='store_true', help='solve again even if the result cache (output/.cache) has the solution of the same inputs and options')
+    parser.add_argument('--cache-size', type=float, default=1024, help='result cache size limit [MB], least recently used results are deleted (default 1024)')
+    parser.add_argument('--input', default=DEFAULT_INPUT_FILE, help='input workbook (default input/input_file.xlsx)')
+    parser.add_argument('--output', default='output', help='folder of the output files and of the result cache (default output)')
+    parser.add_argument('--no-plots', action='store_true', help='no figures at all (no report, no windows), matplotlib is not imported')
+    parser.add_argument('--show-plots', action='store_true', help='also show the figures in pyplot windows (Spyder/IPython), blocks a batch run')
+    parser.add_argument('--report-dir', help='folder of the report (figures rendered off-screen), default OUTPUT/report/<date-time of the run>')
+    parser.add_argument('--report-format', nargs='+', choices=['png', 'svg'], default=['png'], help='file formats of the report figures (default png)')
+    parser.add_argument('--plot-points', type=int, default=MAX_POINTS, help='points per report figure after min/max decimation of the hourly series (default %i)' %MAX_POINTS)
+    parser.add_argument('--instrument', action='store_true', help='record wall time, CPU time and peak RSS of every phase and the model sizes per constraint block in OUTPUT/run_profile.json')
+    parser.add_argument('--cprofile', action='store_true', help='--instrument and also profile the run with cProfile (OUTPUT/run_profile.prof, read with python -m pstats)')
+    return parser
+
+
+def main(argv=None):
+    "Runs the command line options argv (default sys.argv), returns the inputs, model, solve statistics and results of the base case"
+    args, _ = build_parser().parse_known_args(argv)
+    if not (args.instrument or args.cprofile):
+        return run(args)
+    
+    #Instrumented run (profiling.py): the phases marked in the pipeline are timed, the JSON is written even if the run fails
+    run_profile = RunProfile(cprofile=args.cprofile, options=vars(args))
+    try:
+        with run_profile:
+            return run(args, run_profile)
+    finally:
+        paths = run_profile.write(os.path.join(args.output, 'run_profile.json'))
+        print('\n ---------------------------------------------------')
+        print('\n Run profile (%4.2f s, peak RSS %4.1f MB): %s' %(run_profile.info['wall_time_s'], run_profile.info['peak_rss_mb'] or float('nan'), ', '.join(paths)))
+        for line in run_profile.summary():
+            print(' ' + line)
+
+
+def run(args, run_profile=None):
+    "Runs the options args (build_parser), run_profile = RunProfile recording the model sizes (the phases are recorded without it)"
+    SOLVER = 'persistent' if args.persistent else args.solver                     #None: first available solver
+    overrides = {key: val for key, val in [('threads', args.threads), ('mip_gap', args.mip_gap), ('time_limit', args.time_limit)] if val is not None}
+    PROFILE = {**profile_settings(args.profile), **overrides} if overrides else args.profile     #recorded as 'custom' with its settings
+    CACHE_DIR = None if args.no_cache else os.path.join(args.output, '.cache')
+    
+    "--------------------Reading Input Data-------------------"
+    inputs = load_inputs(args.input, rebuild_cache=args.rebuild_cache)
+    df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices = [inputs[name] for name in INPUT_NAMES]
+    
+    print('\n Energy HUB Model North Sea')
+    print('\n Shore Distance [km]', df_general.loc['shore_distance','Input'])
+    print('\n Area Hub [km2]', df_general.loc['area_hub','Input'])
+    
+    "---------------------------------BUILD BENCHMARK---------------------------------"
+    if args.build_benchmark:
+        from .matrix_model import BuildBenchmark
+        with phase('build_benchmark'):
+            BuildBenchmark(**inputs)
+    
+    "---------------------------------BASE CASE---------------------------------"
+    #Result cache (result_cache.py): same input data, mutable Params and solver profile --> the stored solution is loaded instead of solving again
+    model = build_model(inputs, compact=args.compact)
+    if run_profile is not None:
+        run_profile.add_model('base', model)
+    with phase('solve'):
+        solve_stats = solve(model, inputs, SOLVER, PROFILE, tee=True, cache_dir=CACHE_DIR, rounding_gap=args.lp_rounding)
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'solve_stats.json'), 'w') as f:      #solver, profile and statistics of this run, to compare runs on different machines
+        json.dump(solve_stats, f, indent=1)
+    
+    with phase('postprocess'):
+        results = postprocess(model, inputs)
+    print_results(results)
+    if CACHE_DIR and not solve_stats['cached']:
+        cache_results(CACHE_DIR, model, inputs, results, solve_stats, PROFILE, max_bytes=args.cache_size*1e6, rounding_gap=args.lp_rounding, solver=SOLVER)
+    
+    #Report: the figures are rendered to files by a process pool while the sensitivity sweep and the other analyses run
+    report_dir = args.report_dir or os.path.join(args.output, 'report', time.strftime('%Y%m%d-%H%M%S'))
+    reports = []
+    if not args.no_plots:
+        reports.append(render_report(results['df_results'], report_dir, formats=args.report_format, max_points=args.plot_points, background=True))
+    if args.show_plots and not args.no_plots:
+        from .plots import plot_results
+        plot_results(results['df_results'])
+    
+    # Sensitivity Analysis  
+    # H2_price is a mutable Param: the sweep runs the prices in parallel worker processes (one model per worker, see sweep.py),
+    # each worker warm starts from the solution of the neighbouring price and every point is written to output/sensitivity_H2_price.csv when it finishes
+    def sensitivity_results(model):
+        return {'Installed Capacity Electrolyser [MW]': pyo.value(model.x4)/1000,
+                'FPV Area [km2]': (pyo.value(model.x1)*df_solar.loc['FPV_kWpm2','Input']*df_solar.loc['area_FPV','Input'])/1000000}
+    
+    h2_price=[2,3,4,5,6,7,8,9,10,11,12,13,14,15]
+    with phase('sensitivity', points=len(h2_price)):
+        df_sensitivity = run_sweep(CreateCompactModel if args.compact else CreateModel, tuple(inputs[name] for name in INPUT_NAMES),
+                                   'H2_price', h2_price, result_fn=sensitivity_results, solver=SOLVER, profile=PROFILE,
+                                   out_file=os.path.join(args.output, 'sensitivity_H2_price.csv'), cache_dir=CACHE_DIR,
+                                   start_values={name: pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES})   #base case solution as MIP start
+    print({(x, 'Installed Capacity Electrolyser [MW]'): df_sensitivity.loc[x, 'Installed Capacity Electrolyser [MW]'] for x in h2_price})
+    if not args.no_plots:
+        reports.append(render_report({}, report_dir, sensitivity=df_sensitivity, formats=args.report_format, background=True))
+    if args.show_plots and not args.no_plots:
+        from .plots import plot_sensitivity
+        plot_sensitivity(df_sensitivity)
+    
+    
+    "---------------------------------ROLLING HORIZON---------------------------------"
+    # Dispatch with the design of the base run fixed, window by window. On the input year the revenues are compared with the monolithic solution
+    if args.rolling_horizon:
+        design = {name: pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES}
+        source = args.multi_year if args.multi_year else (df_EWind_h, df_EPV_h, df_electricity_prices)
+        start = time.perf_counter()
+        with phase('rolling_horizon'):
+            df_dispatch = RollingHorizonDispatch(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, source, design, window=args.window, overlap=args.overlap,
+                                                 solver=args.solver, profile=PROFILE, max_violation=args.max_ramp_violation)
+        os.makedirs(args.output, exist_ok=True)
+        df_dispatch.to_csv(os.path.join(args.output, 'rolling_horizon_dispatch.csv'))
+
+        print('\n ---------------------------------------------------')
+        print('\n Rolling horizon: %i hours, window %i h, overlap %i h, %4.2f s' %(len(df_dispatch), args.window, args.overlap, time.perf_counter() - start))
+        print('\n Revenues rolling horizon = %4.2f EUR, electrolyser ramp limit exceeded in %i hours (max %4.2f kW)' %(df_dispatch['revenue'].sum(), (df_dispatch['ramp_violation'] > 1e-6).sum(), df_dispatch['ramp_violation'].max()))
+        if not args.multi_year:
+            print('\n Revenues monolithic = %4.2f EUR, difference = %4.2f %%' %(pyo.value(model.revenue), (df_dispatch['revenue'].sum() - pyo.value(model.revenue))/abs(pyo.value(model.revenue))*100))
+
+
+    "---------------------------------BENDERS DECOMPOSITION---------------------------------"
+    # Same design problem by Benders decomposition, compared with the monolithic solution
+    if args.benders:
+        start = time.perf_counter()
+        with phase('benders'):
+            master, benders_history = BendersDecomposition(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices,
+                                                           block_hours=args.benders, solver=SOLVER, master_solver=args.solver, profile=PROFILE)
+        os.makedirs(args.output, exist_ok=True)
+        benders_history.to_csv(os.path.join(args.output, 'benders_history.csv'))
+
+        print('\n ---------------------------------------------------')
+        print('\n Benders decomposition: %i blocks of %i hours, %i iterations, %4.2f s' %(len(master.theta), args.benders, len(benders_history), time.perf_counter() - start))
+        print('\n Decision Variables (Benders): ', {name: pyo.value(getattr(master, name)) for name in DESIGN_VARIABLES})
+        print('\n NPV Benders (lower bound) = %4.2f, upper bound = %4.2f, NPV monolithic = %4.2f' %(benders_history['lower_bound'].iloc[-1], benders_history['upper_bound'].iloc[-1], pyo.value(model.ObjFunction)))
+
+
+    "---------------------------------REPRESENTATIVE DAYS---------------------------------"
+    # Same model on K representative days: reports the NPV error against the full-resolution run, and the NPV of the reduced-model design
+    # evaluated at full resolution (design x1-x6 fixed in the full model, dispatch re-optimised)
+    if args.representative_days:
+        aggregation = aggregate_profiles(df_EWind_h, df_EPV_h, df_electricity_prices, args.representative_days)
+        start = time.perf_counter()
+        with phase('representative_days'):
+            model_rd = CreateModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, aggregation['df_EWind_h'], aggregation['df_EPV_h'], aggregation['df_electricity_prices'], hour_weights=aggregation['hour_weights'],
+                                   compact=args.compact)
+            LinkRepresentativeDays(model_rd, aggregation, df_storage)
+            make_solver(args.solver, PROFILE).solve(model_rd)
+        time_rd = time.perf_counter() - start
+        NPV_full = pyo.value(model.ObjFunction)
+        NPV_rd = pyo.value(model_rd.ObjFunction)
+
+        model_design = model.clone()                                               #the base model keeps its solution (multi-year, what-if)
+        for name in DESIGN_VARIABLES:
+            getattr(model_design, name).fix(pyo.value(getattr(model_rd, name)))
+        with phase('representative_days_design'):
+            make_solver(args.solver, PROFILE).solve(model_design)
+        NPV_rd_design = pyo.value(model_design.ObjFunction)
+
+        if run_profile is not None:
+            run_profile.add_model('representative_days', model_rd)
+
+        print('\n ---------------------------------------------------')
+        print('\n Representative days: %i (%i hours), build + solve %4.2f s' %(args.representative_days, len(aggregation['df_EPV_h']), time_rd))
+        print('\n Decision Variables (representative days): ', {name: pyo.value(getattr(model_rd, name)) for name in DESIGN_VARIABLES})
+        print('\n NPV full resolution = %4.2f, NPV representative days = %4.2f, error = %4.2f %%' %(NPV_full, NPV_rd, (NPV_rd - NPV_full)/abs(NPV_full)*100))
+        print('\n NPV of the representative-days design at full resolution = %4.2f, error = %4.2f %%' %(NPV_rd_design, (NPV_rd_design - NPV_full)/abs(NPV_full)*100))
+
+
+    "---------------------------------MULTI-YEAR---------------------------------"
+    # Same design problem over all the years of hourly data in args.multi_year (one block per year, input streamed from disk)
+    if args.multi_year:
+        start = time.perf_counter()
+        with phase('multi_year_build'):
+            model_my = CreateMultiYearModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, args.multi_year, hours_per_year=args.hours_per_year, compact=args.compact)
+        time_build = time.perf_counter() - start
+        with phase('multi_year_solve'):
+            opt_my = make_solver(args.solver, PROFILE, tee=True)
+            opt_my.solve(model_my)
+        if run_profile is not None:
+            run_profile.add_model('multi_year', model_my)
+
+        print('\n ---------------------------------------------------')
+        print('\n Multi-year model: %i years, %i hours, build %4.2f s, solve %4.2f s' %(len(model_my.Y), sum(len(model_my.year[y].T) for y in model_my.Y), time_build, time.perf_counter() - start - time_build))
+        print('\n Decision Variables (multi-year): ', {name: pyo.value(getattr(model_my, name)) for name in DESIGN_VARIABLES})
+        print('\n NPV multi-year = %4.2f (single year = %4.2f)' %(pyo.value(model_my.ObjFunction), pyo.value(model.ObjFunction)))
+        for y in model_my.Y:
+            print('\n Year %i: revenues = %4.2f EUR, H2 exported = %4.2f kg' %(y, pyo.value(model_my.year[y].revenue), extract_timeseries(model_my.year[y], ['H2_Export_h'])['H2_Export_h'].sum()))
+
+    "---------------------------------STOCHASTIC---------------------------------"
+    # One design for all the years of args.multi_year as equally likely scenarios (a short last block is not a scenario)
+    if args.stochastic and not args.multi_year:
+        print('\n --stochastic needs the scenarios of --multi-year')
+    elif args.stochastic:
+        scenarios = [profiles for profiles in iter_years(args.multi_year, args.hours_per_year) if len(profiles[1]) == args.hours_per_year]
+        start = time.perf_counter()
+        if args.stochastic == 'extensive':
+            with phase('stochastic_extensive'):
+                model_st = CreateStochasticModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, scenarios, compact=args.compact)
+                make_solver(args.solver, PROFILE, tee=True).solve(model_st)
+            if run_profile is not None:
+                run_profile.add_model('stochastic', model_st)
+            design_st = {name: pyo.value(getattr(model_st, name)) for name in DESIGN_VARIABLES}
+            NPV_st = pyo.value(model_st.ObjFunction)
+        else:
+            with phase('progressive_hedging'):
+                design_st, NPV_st, ph_history = StochasticProgressiveHedging(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, scenarios, rho=args.ph_rho,
+                                                                             solver=SOLVER, profile=PROFILE)
+            os.makedirs(args.output, exist_ok=True)
+            ph_history.to_csv(os.path.join(args.output, 'progressive_hedging_history.csv'))
+            print('\n Progressive hedging: %i iterations, expected NPV of the wait-and-see designs (upper bound) = %4.2f' %(len(ph_history) - 1, ph_history['expected_objective'].iloc[0]))
+
+        print('\n ---------------------------------------------------')
+        print('\n Stochastic design (%s): %i scenarios of %i hours, %4.2f s' %(args.stochastic, len(scenarios), args.hours_per_year, time.perf_counter() - start))
+        print('\n Decision Variables (stochastic): ', design_st)
+        print('\n Expected NPV = %4.2f' %NPV_st)
+
+
+    "---------------------------------MONTE-CARLO---------------------------------"
+    # N samples solved in a process pool, every finished sample is saved in the store: running again with the same store only solves the missing samples
+    if args.monte_carlo:
+        n_weather_years = -(-count_hours(args.multi_year)//args.hours_per_year) if args.multi_year else 0
+        distributions = MonteCarloDistributions(df_economic, df_Hydrogen, n_weather_years)
+        evaluate = MonteCarloEvaluator(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices,
+                                       timeseries_file=args.multi_year, hours_per_year=args.hours_per_year, solver=SOLVER, profile=PROFILE)
+        start = time.perf_counter()
+        with phase('monte_carlo'):
+            df_mc = run_montecarlo(distributions, evaluate, args.monte_carlo, args.mc_store or os.path.join(args.output, 'montecarlo.sqlite'), seed=args.mc_seed)
+
+        print('\n ---------------------------------------------------')
+        print('\n Monte-Carlo: %i samples in the store, %4.2f s' %(len(df_mc), time.perf_counter() - start))
+        if len(df_mc):
+            print('\n NPV: mean = %4.2f, P10 = %4.2f, P50 = %4.2f, P90 = %4.2f, P(NPV > 0) = %4.2f %%' %(df_mc['NPV'].mean(), df_mc['NPV'].quantile(0.1), df_mc['NPV'].quantile(0.5), df_mc['NPV'].quantile(0.9), (df_mc['NPV'] > 0).mean()*100))
+            print('\n IRR: P10 = %4.2f, P50 = %4.2f, P90 = %4.2f' %(df_mc['IRR'].quantile(0.1), df_mc['IRR'].quantile(0.5), df_mc['IRR'].quantile(0.9)))
+    
+    "---------------------------------SITE SCREENING---------------------------------"
+    # Every site of the table solved by its own worker process (sites.py), sites already in the result cache are not solved again
+    if args.sites:
+        start = time.perf_counter()
+        with phase('site_screening'):
+            df_sites = run_sites(inputs, read_sites(args.sites), solver=args.solver, profile=PROFILE, workers=args.site_workers, memory_mb=args.site_memory,
+                                 rounding_gap=args.lp_rounding, cache_dir=CACHE_DIR, max_bytes=args.cache_size*1e6, out_file=os.path.join(args.output, 'site_ranking.csv'))
+
+        print('\n ---------------------------------------------------')
+        print('\n Site screening: %i sites, %4.2f s, ranking in %s' %(len(df_sites), time.perf_counter() - start, os.path.join(args.output, 'site_ranking.csv')))
+        print(df_sites[['rank', 'NPV', 'LCOH', 'IRR', 'x2', 'x4']].head(10).to_string())
+
+    "---------------------------------PARETO FRONT---------------------------------"
+    # NPV vs a second metric: anchors (NPV optimum, best metric with NPV >= floor), then the epsilon sweep in parallel worker processes (pareto.py)
+    if args.pareto:
+        start = time.perf_counter()
+        pareto_file = os.path.join(args.output, 'pareto_%s.csv' %args.pareto)
+        with phase('pareto', points=args.pareto_points):
+            df_front = pareto_front(inputs, args.pareto, n_points=args.pareto_points, solver=SOLVER, profile=PROFILE, npv_floor=args.pareto_npv_floor, compact=args.compact,
+                                    out_file=pareto_file, cache_dir=CACHE_DIR)
+
+        print('\n ---------------------------------------------------')
+        print('\n Pareto front NPV vs %s: %i points (%i Pareto optimal), %4.2f s, table in %s' %(args.pareto, len(df_front), df_front['pareto_optimal'].sum(), time.perf_counter() - start, pareto_file))
+        print(df_front[['NPV', METRICS[args.pareto]['label'], 'solve_time_s', 'pareto_optimal']].to_string())
+
+    "---------------------------------WHAT-IF (INCREMENTAL RE-SOLVE)---------------------------------"
+    # Base case kept in a persistent solver (incremental.py): the changes only patch the Params and bounds they touch, the solve starts from the base solution
+    if args.what_if:
+        persistent = any(available(name, persistent=True) for name in PERSISTENT_SOLVERS)
+        session = IncrementalModel(inputs, solver='persistent' if persistent else args.solver, profile=PROFILE, compact=args.compact, start=solution_arrays(model))
+        with phase('what_if_base'):
+            base_stats = session.solve()
+        for change in args.what_if:
+            try:
+                apply_change(session, change)
+            except ValueError as err:                           #typo or not a mutable Param: the other changes are applied
+                print('\n What-if change skipped: %s' %err)
+        with phase('what_if'):
+            what_if_stats = session.solve()
+        results_what_if = postprocess(session.model, session.inputs)
+
+        print('\n ---------------------------------------------------')
+        print('\n What-if %s (%s): %i bounds and %i Params changed, base case %4.2f s, re-solve %4.2f s' %(' '.join(args.what_if), what_if_stats['solver'], what_if_stats['changes']['variables'],
+                                                                                                          what_if_stats['changes']['params'], base_stats['wall_time_s'], what_if_stats['wall_time_s']))
+        print('\n Decision Variables (what-if): ', {name: pyo.value(getattr(session.model, name)) for name in DESIGN_VARIABLES})
+        print('\n NPV what-if = %4.2f (base case %4.2f), LCoH = %4.2f EUR/kg (base case %4.2f)' %(results_what_if['NPV'], results['NPV'], results_what_if['LCOH'], results['LCOH']))
+    
+    if reports:
+        with phase('report_wait'):                             #rendering time not hidden behind the solves
+            n_files = sum(len(report.wait()) for report in reports)
+        print('\n Report: %i files in %s' %(n_files, report_dir))
+    
+    return {'inputs': inputs, 'model': model, 'solve_stats': solve_stats, 'results': results, 'df_sensitivity': df_sensitivity}
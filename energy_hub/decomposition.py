@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Decomposed solves of the energy hub model: rolling horizon dispatch, Benders decomposition and progressive hedging.
+
+The models are built from the parts of model.py (AddDesign, AddOperation), the algorithms themselves are in
+benders.py and progressive_hedging.py.
+"""
+import warnings
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from .model import CreateModel, AddDesign, AddOperation, AddElasticLimits
+from .solvers import make_solver
+from .timeseries import iter_windows
+from .results import extract_timeseries
+from .sweep import DESIGN_VARIABLES
+from .benders import solve_benders
+from .progressive_hedging import solve_progressive_hedging
+
+"Rolling horizon dispatch: design x1-x6 fixed (e.g. from a previous run), the operation is optimised in windows of window hours starting every"
+"window-overlap hours. Only the first window-overlap hours of a window are kept, the overlap is optimised again by the next window. SoC_h, h2Storage and"
+"EElectrolyser_h of the last kept hour are the initial levels of the next window. One window model is in memory at a time, source can be a file (streamed)."
+"The ramp limit of the electrolyser is elastic (ramp_violation [kW] per hour): a RuntimeWarning is issued when the total violation of the kept hours"
+"is not zero, a RuntimeError raised when it is above max_violation [kW] (None: never)"
+DISPATCH_VARIABLES = ['EPV_h', 'EW_h', 'ECurtailed_h', 'SoC_h', 'h2Storage', 'EElectrolyser_h', 'ECompressor_PIPE_h', 'ECompressor_STO_h', 'H2_Export_h', 'Electricity_export', 'ramp_violation']
+
+def RollingHorizonDispatch (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, source, design, window=168, overlap=24, solver=None, profile='default', ramp_penalty=1000,
+                            max_violation=None):
+    #ramp_penalty [EUR per kW over the ramp limit], source = (df_EWind_h, df_EPV_h, df_electricity_prices) or the path of a csv/parquet file (timeseries.py), design = {'x1':.., ..}
+    #Returns a DataFrame with the kept hours of every window (hour 1 = first hour of source) and the revenue of every hour
+    opt = make_solver(solver, profile)
+    initial = None
+    dispatch = []
+    for start, df_EWind_w, df_EPV_w, df_prices_w in iter_windows(source, window, overlap):
+        model_w = pyo.ConcreteModel(name='HPP - Dispatch window')
+        AddDesign(model_w, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen)
+        for name, value in design.items():                                     #solver values can be slightly out of the bounds (e.g. x6 = -1e-13)
+            var = getattr(model_w, name)
+            var.fix(min(max(value, var.lb), var.ub if var.ub is not None else value))
+        AddOperation(model_w, df_storage, df_Hydrogen, df_EWind_w, df_EPV_w, df_prices_w, initial=initial)
+        #a window that starts at a load the next hours cannot sustain (the previous window did not see them) would be infeasible with the 10 kW/h limit,
+        #violations are reported in ramp_violation (a longer overlap reduces them)
+        violation = AddElasticLimits(model_w)
+        model_w.ObjFunction = pyo.Objective(expr=model_w.revenue - ramp_penalty*violation, sense=pyo.maximize)   #design costs are constant
+        opt.solve(model_w)
+        if not opt.optimal():
+            raise RuntimeError('Rolling horizon: window starting at hour %i is %s' %(start + 1, opt.stats['termination']))
+        
+        keep = window - overlap if len(df_EPV_w) == window else len(df_EPV_w)     #the last window is kept whole
+        df_w = extract_timeseries(model_w, DISPATCH_VARIABLES).iloc[:keep]
+        df_w.index = pd.RangeIndex(start + 1, start + keep + 1, name='hour')
+        df_w['revenue'] = df_w['H2_Export_h']*pyo.value(model_w.H2_price) + df_w['Electricity_export']*df_prices_w['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float)[:keep]
+        dispatch.append(df_w)
+        initial = {name: pyo.value(getattr(model_w, name)[keep]) for name in ['SoC_h', 'h2Storage', 'EElectrolyser_h']}
+    dispatch = pd.concat(dispatch)
+    violation = dispatch['ramp_violation'].sum()
+    if max_violation is not None and violation > max_violation:
+        raise RuntimeError('Rolling horizon: ramp limit violated by %4.2f kW in total (max_violation %4.2f kW), use a longer overlap' %(violation, max_violation))
+    if violation > 1e-6:                                                       #solver tolerance
+        warnings.warn('Rolling horizon: ramp limit violated by %4.2f kW in total in %i hours, use a longer overlap'
+                      %(violation, (dispatch['ramp_violation'] > 1e-6).sum()), RuntimeWarning)
+    return dispatch
+
+"Benders decomposition (benders.py): the hours are split in blocks (e.g. months). Master = AddDesign + level[j, ..] (SoC_h, h2Storage and EElectrolyser_h"
+"at the boundary j between block j-1 and j) + theta[k] = revenues of block k. Subproblem k = AddOperation of block k with copies of x1-x6 and of the"
+"boundary levels, fixed to the master values by ccopy. The boundary levels and operating limits are elastic (penalised), so every subproblem is feasible for any master"
+BENDERS_LEVELS = ['SoC_h', 'h2Storage', 'EElectrolyser_h']
+
+def CreateBendersMaster (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, theta_max):
+    #theta_max[k]: upper bound of the revenues of block k, bounds the master until block k has cuts
+    n_blocks = len(theta_max)
+    master = pyo.ConcreteModel(name='HPP - Benders master')
+    AddDesign(master, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen)
+    master.K = pyo.RangeSet(0, n_blocks-1)
+    master.J = pyo.RangeSet(1, n_blocks-1)
+    master.L = pyo.Set(initialize=BENDERS_LEVELS, ordered=True)
+    master.level = pyo.Var(master.J, master.L, within=pyo.NonNegativeReals)
+    master.theta = pyo.Var(master.K, bounds=lambda master, k: (None, theta_max[k]))
+    #same limits as SoC2-3, h2Storage2 and electrolyser6 at the boundary hours
+    master.cSoC_upper = pyo.Constraint(master.J, rule=lambda master, j: master.level[j, 'SoC_h'] <= master.x3*0.90)
+    master.cSoC_lower = pyo.Constraint(master.J, rule=lambda master, j: master.level[j, 'SoC_h'] >= master.x3*0.10)
+    master.ch2Storage = pyo.Constraint(master.J, rule=lambda master, j: master.level[j, 'h2Storage'] <= master.x6)
+    master.celectrolyser = pyo.Constraint(master.J, rule=lambda master, j: master.level[j, 'EElectrolyser_h'] <= master.x4)
+    
+# OBJECTIVE FUNCTION
+    def OF (master):
+        return master.annuity_factor*sum(master.theta[k] for k in master.K) - master.costs
+    master.ObjFunction = pyo.Objective(rule=OF, sense = pyo.maximize)
+    
+    master_vars = {name: getattr(master, name) for name in DESIGN_VARIABLES}
+    master_vars.update({'%s[%i]' %(name, j): master.level[j, name] for j in master.J for name in BENDERS_LEVELS})
+    return master, master_vars
+
+def CreateBendersSubproblem (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_k, df_EPV_k, df_prices_k, k, n_blocks, elastic_penalty=100):
+    #elastic_penalty [EUR per unit of boundary level deviation], well above the value of stored kWh, kg H2 or kW of electrolyser load
+    sub = pyo.ConcreteModel(name='HPP - Benders subproblem %i' %k)
+    AddDesign(sub, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen)
+    sub.x2.domain = pyo.NonNegativeReals                                       #fixed by the master, the subproblem is an LP
+    copies = {name: getattr(sub, name) for name in DESIGN_VARIABLES}
+    initial = None
+    if k > 0:                                                                  #the first block starts empty, as the full model
+        sub.level_in = pyo.Var(BENDERS_LEVELS, within=pyo.NonNegativeReals)
+        initial = {name: sub.level_in[name] for name in BENDERS_LEVELS}
+        copies.update({'%s[%i]' %(name, k): sub.level_in[name] for name in BENDERS_LEVELS})
+    AddOperation(sub, df_storage, df_Hydrogen, df_EWind_k, df_EPV_k, df_prices_k, initial=initial)
+    if k < n_blocks-1:
+        copies.update({'%s[%i]' %(name, k+1): getattr(sub, name)[sub.T.last()] for name in BENDERS_LEVELS})
+    
+    sub.N = pyo.Set(initialize=list(copies), ordered=True)
+    sub.E = pyo.Set(initialize=[name for name in copies if name not in DESIGN_VARIABLES], ordered=True)
+    sub.master_value = pyo.Param(sub.N, initialize=0, mutable=True)
+    sub.slack_up = pyo.Var(sub.E, within=pyo.NonNegativeReals)
+    sub.slack_down = pyo.Var(sub.E, within=pyo.NonNegativeReals)
+    def copy (sub, name):
+        if name in DESIGN_VARIABLES:
+            return copies[name] == sub.master_value[name]
+        return copies[name] + sub.slack_up[name] - sub.slack_down[name] == sub.master_value[name]
+    sub.ccopy = pyo.Constraint(sub.N, rule=copy)
+    #the minimum SoC and the ramp limit are elastic too: a large battery may not be chargeable to 10% in the first hours, whatever the boundary levels
+    violation = AddElasticLimits(sub, soc_min=True)
+    sub.ObjFunction = pyo.Objective(expr=sub.revenue - elastic_penalty*(pyo.quicksum(sub.slack_up.values()) + pyo.quicksum(sub.slack_down.values()) + violation), sense=pyo.maximize)
+    return sub
+
+def BendersDecomposition (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, block_hours=730,
+                          solver=None, master_solver=None, profile='default', workers=None, tol=1e-4, max_iter=100, H2_price=None):
+    #Returns the master (design = best design found) and the bounds of every iteration. H2_price: value of the H2_price Param (default the one of AddDesign)
+    bounds = list(range(0, len(df_EPV_h), block_hours)) + [len(df_EPV_h)]
+    blocks = list(zip(bounds[:-1], bounds[1:]))
+    
+    #revenue bound of every block: pipe export at the H2 price + all the generation of the largest PV/wind that fits in the hub area sold at the hourly price
+    x1_max = 0.9*df_general.loc['area_hub','Input']*1000000/(df_solar.loc['FPV_kWpm2','Input']*df_solar.loc['area_FPV','Input'])
+    x2_max = 0.9*df_general.loc['area_hub','Input']/df_wind.loc['required_area_turbine','Input']
+    price = np.maximum(df_electricity_prices['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float), 0)
+    generation_max = x1_max*df_EPV_h['Power_Output[kWh/m2]'].to_numpy(dtype=float) + x2_max*df_EWind_h['Wind_Power_1'].to_numpy(dtype=float)
+    master, master_vars = CreateBendersMaster(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, [None]*len(blocks))
+    if H2_price is not None:
+        master.H2_price.set_value(H2_price)
+    H2_export_max = 0.85*df_Hydrogen.loc['pipe_capacity','Input']*pyo.value(master.H2_price)
+    for k, (s, e) in enumerate(blocks):
+        master.theta[k].setub((e - s)*H2_export_max + price[s:e] @ generation_max[s:e])
+    def build_subproblem (k):
+        s, e = blocks[k]
+        sub = CreateBendersSubproblem(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h.iloc[s:e], df_EPV_h.iloc[s:e], df_electricity_prices.iloc[s:e], k, len(blocks))
+        sub.H2_price.set_value(pyo.value(master.H2_price))                     #same price as the bounds of theta
+        return sub
+    history = solve_benders(master, master_vars, build_subproblem, len(blocks), solver=solver, master_solver=master_solver, profile=profile, workers=workers, tol=tol, max_iter=max_iter)
+    return master, history
+
+
+def StochasticProgressiveHedging (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, scenarios, probabilities=None, rho=2,
+                                  solver=None, profile='default', workers=None, tol=1e-4, max_iter=100):
+    #rho: PH penalty as a share of the cost of every design variable. Returns (design, expected NPV of the design, PH history)
+    def build_scenario (s):
+        return CreateModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, *scenarios[s])
+    return solve_progressive_hedging(build_scenario, len(scenarios), DESIGN_VARIABLES, probabilities, rho=rho, solver=solver, profile=profile, workers=workers, tol=tol, max_iter=max_iter)
+
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorised cash-flow calculations (NPC, NPV, IRR, LCOE, LCOH).
+
+A cost or production flow is an array over the years 0..lifetime (CAPEX in year 0, OPEX/production from year 1).
+Every function also takes a batch of scenarios: a 2-D array scenarios x years, with the discount rate and the
+values as scalars or one value per scenario, so thousands of Monte-Carlo cost draws are evaluated in one call.
+"""
+import numpy as np
+
+
+def discount_factors(lifetime, r):
+    "1/(1+r)**k for k = 0..lifetime, shape (years,) or (scenarios, years) when r has one value per scenario"
+    return (1 + np.asarray(r, dtype=float)[..., None])**-np.arange(lifetime + 1)
+
+
+def costs_production_flow(opex_production_asset, lifetime):
+    "Flow of costs or production starting in year 1 (year 0 = 0, reserved for CAPEX), one row per scenario for array values"
+    value = np.asarray(opex_production_asset, dtype=float)
+    flow = np.zeros(value.shape + (lifetime + 1,))
+    flow[..., 1:] = value[..., None]
+    return flow
+
+
+def np_calculator(C, r):
+    "Net present value of the flow C (years, or scenarios x years) at the rate r (scalar or one per scenario)"
+    C = np.asarray(C, dtype=float)
+    return (C*discount_factors(C.shape[-1] - 1, r)).sum(axis=-1)
+
+
+def add_replacements(flow, interval, cost, until=None):
+    """
+    Adds cost (scalar or one per scenario) to flow in the years interval, 2*interval, ... <= until
+    (default until = lifetime - 1: no replacement in the last year). Returns flow, changed in place.
+    """
+    interval = int(interval)
+    until = flow.shape[-1] - 2 if until is None else int(until)
+    years = np.arange(interval, until + 1, interval) if interval > 0 else np.arange(0)
+    flow[..., years] += np.asarray(cost, dtype=float)[..., None]
+    return flow
+
+
+def cost_flow(capex, opex, lifetime, replacement_interval=0, replacement_cost=0):
+    "CAPEX in year 0, OPEX from year 1 and replacements (e.g. electrolyser stack) every replacement_interval years before the end of the lifetime"
+    shape = np.broadcast_shapes(np.shape(capex), np.shape(opex), np.shape(replacement_cost))
+    flow = costs_production_flow(np.broadcast_to(opex, shape), lifetime)
+    flow[..., 0] = capex
+    return add_replacements(flow, replacement_interval, np.broadcast_to(replacement_cost, shape))
+
+
+def levelised_cost(capex, opex, production, lifetime, r, replacement_interval=0, replacement_cost=0):
+    "NPC of the costs / NPC of the yearly production (LCOE, LCOH)"
+    return np_calculator(cost_flow(capex, opex, lifetime, replacement_interval, replacement_cost), r)/np_calculator(costs_production_flow(production, lifetime), r)
+
+
+def irr(cashflows, low=-0.99, high=10.0, tol=1e-10, max_iter=200):
+    """
+    Internal rate of return of every row of cashflows, by bisection on the NPV (all rows at once).
+    NaN where the NPV does not change sign between low and high.
+    """
+    C = np.asarray(cashflows, dtype=float)
+    low = np.full(C.shape[:-1], low)
+    high = np.full(C.shape[:-1], high)
+    npv_low = np_calculator(C, low)
+    valid = np.sign(npv_low) != np.sign(np_calculator(C, high))
+    for _ in range(max_iter):
+        mid = (low + high)/2
+        npv_mid = np_calculator(C, mid)
+        same = np.sign(npv_mid) == np.sign(npv_low)
+        low = np.where(same, mid, low)
+        npv_low = np.where(same, npv_mid, npv_low)
+        high = np.where(same, high, mid)
+        if np.all(high - low < tol):
+            break
+    return np.where(valid, (low + high)/2, np.nan)
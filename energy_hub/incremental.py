@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental re-solve: what-if changes to a solved model without building it or sending it to the solver again.
+
+A new bound on a design variable (x6 <= 3,000,000 kg), another pipe capacity or one week of a different wind profile
+used to mean a new CreateModel and a solve from scratch. IncrementalModel builds the model once with the hourly
+profiles as mutable Params (model.AddOperation mutable_profiles=True), keeps it in a persistent solver
+(persistent_solver.py) and only patches what changed:
+- mutable Params (H2_price, CAPEX/OPEX, electrolyser_efficiency, pipe_capacity = limit of cbalanceH22...): set_value
+- hours of the wind, solar or price profile: the Params of the hours whose value changes (model.EWind_profile[t]...)
+- bounds of the design variables (x1-x6): setlb/setub, only these variables are sent to the solver again
+The persistent solver only gets the coefficients, row bounds and objective terms that hold one of the Params changed
+since the last solve (its own update_params is turned off: it sends every mutable coefficient of the model again, one per
+hour of every profile), nothing is rebuilt on the Pyomo side, and it starts from the previous solution (basis of the LP,
+incumbent as MIP start). The update time scales with the rows that hold the changed Params, not with the horizon: a week
+of wind is 168 coefficients whatever the number of hours, pipe_capacity is the limit of one row per hour.
+Solvers without a persistent interface (cbc, glpk) get the same patched model, written again in full, with the
+previous solution as warm start when the solver accepts one.
+The inputs are patched with the model (session.inputs), so postprocess(session.model, session.inputs) reports the
+changed case. The solutions are not stored in the result cache: the bounds are not part of its key.
+
+    session = IncrementalModel(inputs)
+    session.solve()
+    session.set_bounds(x6=(0, 2e6))
+    session.set_params(pipe_capacity=40000)
+    session.set_profile('wind', wind_week, start=24*7*10)              #hours 1681-1848
+    session.solve()
+    results = postprocess(session.model, session.inputs)
+
+The same changes as text (command line --what-if): apply_change(session, 'x6<=2e6'), 'pipe_capacity=40000', 'wind[1680:1848]*0.5'.
+"""
+import re
+import time
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.common.collections import ComponentSet
+from pyomo.core.expr.visitor import identify_mutable_parameters
+from .pipeline import build_model
+from .solvers import make_solver
+from .results import load_solution
+from .profiling import phase
+
+#profile name -> (Param of model.AddOperation, input, column) of the hourly inputs that can be patched
+HOURLY_INPUTS = {'solar': ('EPV_profile', 'df_EPV_h', 'Power_Output[kWh/m2]'),
+                 'wind': ('EWind_profile', 'df_EWind_h', 'Wind_Power_1'),
+                 'price': ('electricity_price', 'df_electricity_prices', 'Average_2015_2022_[EUR/kWh]')}
+#mutable Param -> (input, parameter) holding its value, patched with the Param
+PARAM_INPUTS = {'pipe_capacity': ('df_Hydrogen', 'pipe_capacity'), 'electrolyser_efficiency': ('df_Hydrogen', 'Electrolysis_Efficiency'),
+                'charge_rate': ('df_storage', 'charge_rate'), 'discharge_rate': ('df_storage', 'discharge_rate')}
+
+
+def param_updates(opt):
+    """
+    {id(ParamData): [update functions]} of the APPSI persistent solver opt (HiGHS or Gurobi) after set_instance: the
+    helpers that send a coefficient, row bound, variable bound or objective term holding the Param to the solver model.
+    """
+    helpers = [helper for row in opt._mutable_helpers.values() for helper in row] + [helper for _, helper in opt._mutable_bounds.values()]
+    terms = [(helper.update, [getattr(helper, name, None) for name in ('expr', 'lower_expr', 'upper_expr', 'lhs_expr', 'rhs_expr')]) for helper in helpers]
+    if hasattr(opt, '_objective_helpers'):                      #HiGHS: one helper per objective coefficient
+        terms += [(helper.update, [helper.expr]) for helper in opt._objective_helpers]
+    elif getattr(opt, '_mutable_objective', None) is not None:  #Gurobi: linear coefficients and constant of one helper
+        objective = opt._mutable_objective
+        terms += [(lambda coef=coef: setattr(coef.var, 'Obj', pyo.value(coef.expr)), [coef.expr]) for coef in objective.linear_coefs]
+        terms.append((lambda: setattr(objective.gurobi_model, 'ObjCon', pyo.value(objective.constant.expr)), [objective.constant.expr]))
+    updates = {}
+    for update, exprs in terms:
+        params = {id(param): None for expr in exprs if expr is not None for param in identify_mutable_parameters(expr)}
+        for key in params:
+            updates.setdefault(key, []).append(update)
+    return updates
+
+
+class IncrementalModel:
+    """
+    Model of inputs kept by a solver between what-if changes (see the module docstring).
+    solver = 'persistent' (default, Gurobi or HiGHS) or a solver name of make_solver, start = solution_arrays of a
+    solved model of the same inputs (e.g. the base case) as warm start of the first solve.
+    """
+
+    def __init__(self, inputs, solver='persistent', profile='default', compact=False, hour_weights=None, tee=False, start=None):
+        self.inputs = dict(inputs)
+        self.model = build_model(inputs, hour_weights, compact, mutable_profiles=True)
+        self.opt = make_solver(solver, profile, tee=tee)
+        if self.opt.persistent:
+            self.opt.opt.config.warmstart = True
+            self.opt.opt.update_config.update_params = False    #solve() sends the changed Params only (param_updates)
+        self.warmstart = not self.opt.persistent and getattr(self.opt.opt, 'warm_start_capable', lambda: False)()
+        if start is not None:
+            load_solution(self.model, start)
+        self.n_solves = 0
+        self._copied = set()                                    #inputs already copied, the DataFrames of the caller are never changed
+        self._variables = ComponentSet()                        #changes since the last solve
+        self._params = ComponentSet()
+        self._updates = None                                    #param_updates of the persistent solver, after the first solve
+
+    def _input(self, name):
+        if name not in self._copied:
+            self.inputs[name] = self.inputs[name].copy()
+            self._copied.add(name)
+        return self.inputs[name]
+
+    def set_params(self, **values):
+        "Sets mutable Params by name (set_params(pipe_capacity=40000, H2_price=6))"
+        for name, value in values.items():
+            param = getattr(self.model, name, None)
+            if not isinstance(param, pyo.Param) or not param.mutable:
+                raise ValueError('%s is not a mutable Param of the model' %name)
+            param.set_value(value)
+            self._params.update(param.values())
+            if name in PARAM_INPUTS:
+                df_name, parameter = PARAM_INPUTS[name]
+                self._input(df_name).loc[parameter, 'Input'] = value
+
+    def set_bounds(self, **bounds):
+        "Sets the bounds of design variables by name, set_bounds(x6=(0, 2e6)), None = no bound"
+        for name, (lb, ub) in bounds.items():
+            var = getattr(self.model, name, None)
+            if not isinstance(var, pyo.Var) or var.is_indexed():
+                raise ValueError('%s is not a design variable of the model' %name)
+            var.setlb(lb)
+            var.setub(ub)
+            self._variables.add(var)
+
+    def set_profile(self, name, values, start=0):
+        """
+        Sets the hourly profile name ('solar', 'wind' or 'price', HOURLY_INPUTS) to values from hour index start
+        (0 = hour 1 of the model). Only the hours whose value changes are patched. Returns the number of hours changed.
+        """
+        param_name, df_name, column = HOURLY_INPUTS[name]
+        df = self._input(df_name)
+        col = df.columns.get_loc(column)
+        values = np.asarray(values, dtype=float)
+        old = df.iloc[start:start + len(values), col].to_numpy(dtype=float)
+        if len(old) != len(values):
+            raise ValueError('%s: %i values from hour index %i, the model has %i hours' %(name, len(values), start, len(df)))
+        changed = np.flatnonzero(old != values)
+        df.iloc[start + changed, col] = values[changed]
+        param = getattr(self.model, param_name)
+        for i in changed:
+            param[start + i + 1].set_value(float(values[i]))
+            self._params.add(param[start + i + 1])
+        return len(changed)
+
+    def solve(self):
+        """
+        Solves with the changes made since the last solve. Returns the solve statistics (solvers.Solver.stats) with the
+        changes ({'variables': bounds changed, 'params': Params changed, 'updates': coefficients and bounds sent to the
+        persistent solver}), the time to send them to the solver and warm_start (True when the solve started from the
+        previous solution).
+        """
+        changes = {'variables': len(self._variables), 'params': len(self._params), 'updates': 0}
+        with phase('incremental_update', **changes) as record:
+            start = time.perf_counter()
+            if self.opt.persistent and self.n_solves:           #first solve: the whole model is sent (set_instance)
+                if self._variables:
+                    self.opt.opt.update_variables(list(self._variables))
+                for param in self._params:
+                    for update in self._updates.get(id(param), ()):
+                        update()
+                        changes['updates'] += 1
+            update_time = time.perf_counter() - start
+            record['updates'] = changes['updates']
+        self._variables, self._params = ComponentSet(), ComponentSet()
+        warm_start = bool(self.n_solves) and (self.opt.persistent or self.warmstart)
+        if self.warmstart and self.n_solves:
+            self.opt.solve(self.model, warmstart=True)
+        else:
+            self.opt.solve(self.model)
+        if self.opt.persistent and self._updates is None:
+            self._updates = param_updates(self.opt.opt)
+        self.n_solves += 1
+        return {**self.opt.stats, 'changes': changes, 'update_time_s': update_time, 'warm_start': warm_start}
+
+
+def apply_change(session, change):
+    """
+    Applies a change given as text to session: 'NAME=VALUE' (mutable Param), 'xN<=VALUE' or 'xN>=VALUE' (bound of a design
+    variable, the other bound is kept) or 'PROFILE[START:END]*FACTOR' (hour indices START to END-1 of solar, wind or price scaled)
+    """
+    change = change.replace(' ', '')
+    bound = re.fullmatch(r'(x\w+)(<=|>=)(.+)', change)
+    profile = re.fullmatch(r'(solar|wind|price)\[(\d*):(\d*)\]\*(.+)', change)
+    param = re.fullmatch(r'(\w+)=(.+)', change)
+    if bound:
+        var = getattr(session.model, bound.group(1), None)
+        if not isinstance(var, pyo.Var) or var.is_indexed():
+            raise ValueError('What-if change %r: %s is not a design variable of the model' %(change, bound.group(1)))
+        value = float(bound.group(3))
+        session.set_bounds(**{var.local_name: (var.lb, value) if bound.group(2) == '<=' else (value, var.ub)})
+    elif profile:
+        name, start, end, factor = profile.groups()
+        _, df_name, column = HOURLY_INPUTS[name]
+        values = session.inputs[df_name][column].to_numpy(dtype=float)[int(start or 0):int(end) if end else None]
+        session.set_profile(name, values*float(factor), start=int(start or 0))
+    elif param:
+        session.set_params(**{param.group(1): float(param.group(2))})
+    else:
+        raise ValueError("What-if change %r: expected NAME=VALUE, xN<=VALUE, xN>=VALUE or PROFILE[START:END]*FACTOR" %change)
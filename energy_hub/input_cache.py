@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of the input workbook in a columnar binary format.
+
+pd.read_excel (openpyxl) is slow for the hourly sheets, so every sheet is parsed once and saved as a Parquet file
+in a cache folder next to the workbook (input/.cache). Next runs read the Parquet files.
+The cache is keyed by the modification time, size and SHA-256 hash of the workbook: if the workbook changes,
+the cache is rebuilt automatically. rebuild=True forces a rebuild (--rebuild-cache of the command line).
+Sheets with mixed-type columns that Arrow cannot store are saved as pickle instead.
+"""
+import os
+import json
+import hashlib
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_manifest(cache_dir, manifest):
+    tmp = os.path.join(cache_dir, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST))
+
+
+def _workbook_key(input_file, manifest):
+    "mtime and size are checked first, the hash is only computed when they changed"
+    stat = os.stat(input_file)
+    key = {'mtime': stat.st_mtime, 'size': stat.st_size}
+    if manifest is not None and manifest.get('mtime') == key['mtime'] and manifest.get('size') == key['size']:
+        key['sha256'] = manifest.get('sha256')
+    else:
+        key['sha256'] = file_hash(input_file)
+    return key
+
+
+def _write_sheet(df, path_base):
+    try:
+        df.to_parquet(path_base + '.parquet')
+        return os.path.basename(path_base) + '.parquet'
+    except Exception:                                        # ArrowInvalid/ArrowTypeError for mixed-type columns
+        df.to_pickle(path_base + '.pkl')
+        return os.path.basename(path_base) + '.pkl'
+
+
+def _read_sheet(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def read_excel_cached(input_file, sheets, cache_dir=None, rebuild=False):
+    """
+    sheets = {name: keyword arguments of pd.read_excel (sheet_name, header, usecols, index_col...)}
+    Returns {name: DataFrame}, read from the cache when the workbook did not change.
+    """
+    if not _parquet_available():
+        print('\n pyarrow not installed, reading the input workbook without cache')
+        return {name: pd.read_excel(input_file, **kwargs) for name, kwargs in sheets.items()}
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(input_file)), '.cache')
+    os.makedirs(cache_dir, exist_ok=True)
+
+    manifest = None if rebuild else _load_manifest(cache_dir)
+    key = _workbook_key(input_file, manifest)
+    changed = manifest is None or any(manifest.get(k) != key[k] for k in key)
+    if manifest is None or manifest.get('sha256') != key['sha256']:
+        manifest = {'workbook': os.path.abspath(input_file), 'sheets': {}}
+    manifest.update(key)                                      # a touched but identical workbook keeps its cache
+
+    dfs = {}
+    for name, kwargs in sheets.items():
+        entry = manifest['sheets'].get(name)
+        kwargs_json = json.loads(json.dumps(kwargs))        # tuples -> lists, as stored in the manifest
+        path = os.path.join(cache_dir, entry['file']) if entry else None
+        if entry and entry['kwargs'] == kwargs_json and os.path.exists(path):
+            dfs[name] = _read_sheet(path)
+        else:
+            dfs[name] = pd.read_excel(input_file, **kwargs)
+            manifest['sheets'][name] = {'file': _write_sheet(dfs[name], os.path.join(cache_dir, name)), 'kwargs': kwargs_json}
+            changed = True
+    if changed:
+        _save_manifest(cache_dir, manifest)
+    return dfs
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Input data of the energy hub model: the sheets of input_file.xlsx as DataFrames.
+
+load_inputs returns {name: DataFrame} with the argument names of CreateModel (INPUT_NAMES), so a model is built
+with CreateModel(**inputs). The workbook is parsed once and cached as Parquet (input_cache.py).
+"""
+import os
+from .input_cache import read_excel_cached
+from .profiling import phase
+
+INPUT_NAMES = ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen', 'df_EWind_h', 'df_EPV_h', 'df_electricity_prices']
+DEFAULT_INPUT_FILE = os.path.join('input', 'input_file.xlsx')
+
+
+def readExcel (input_file, rebuild_cache=False):                              #Reading Excel Sheets, use index_col argunment to have the first column as the value of row, then I use loc
+    #Sheets are parsed once and cached as Parquet in input/.cache, the cache is rebuilt when the workbook changes (see input_cache.py)
+    sheets = {
+        'General': dict(sheet_name="General", header = 0, usecols=[0,1,2], index_col=0),
+        'Economic': dict(sheet_name="Economic", header = 0, usecols=[0,1,2], index_col=0),
+        'Solar': dict(sheet_name="Solar", header = 0, usecols=[0,1,2], index_col=0),
+        'Wind': dict(sheet_name="Wind", header = 0, usecols=[0,1], index_col=0),
+        'Storage': dict(sheet_name="Storage", header = 0, usecols=[0,1,2], index_col=0),
+        'Hydrogen': dict(sheet_name="Hydrogen", header = 0, usecols=[0,1,2], index_col=0),
+        'Wind_Power_Data': dict(sheet_name="Wind_Power_Data", header = 0, usecols=[0,1,2]),
+        'Solar_Power_Data': dict(sheet_name="Solar_Power_Data", header = 0, usecols=[0,1,2]),
+        'Prices': dict(sheet_name="Day-ahead Prices_2015-2022", header = 0),
+        }
+    dfs = read_excel_cached(input_file, sheets, rebuild=rebuild_cache)
+    
+    return tuple(dfs[name] for name in sheets)
+
+
+def load_inputs(input_file=None, rebuild_cache=False):
+    "{name in INPUT_NAMES: DataFrame} of input_file (default input/input_file.xlsx in the working directory)"
+    input_file = input_file or os.path.join(os.getcwd(), DEFAULT_INPUT_FILE)
+    with phase('read_inputs', input_file=input_file, rebuild_cache=rebuild_cache):
+        return dict(zip(INPUT_NAMES, readExcel(input_file, rebuild_cache=rebuild_cache)))
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Matrix build of the energy hub model (NumPy/SciPy) and the build time benchmark against the Pyomo model.
+
+The same MILP as model.CreateModel assembled from numpy arrays as one sparse matrix, one vectorised block of rows
+per constraint family (no Python rule per hour). It is solved directly with HiGHS (scipy.optimize.milp) or with the
+gurobipy matrix API, no Pyomo objects are created.
+"""
+import time
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from .model import CreateModel, design_constants, design_params
+
+
+class MatrixModel:
+    "maximise c*x + c0  subject to  A*x (sense) rhs,  lb <= x <= ub"
+    def __init__(self, n_hours):
+        self.n_hours = n_hours
+        self.columns = {}            # variable name -> column indices (numpy array)
+        self.n_cols = 0
+        self.blocks = {}             # constraint name -> row indices, same names as the Pyomo constraints
+        self.n_rows = 0
+        self.lb, self.ub, self.integer = [], [], []
+        self.A_rows, self.A_cols, self.A_vals = [], [], []
+        self.sense, self.rhs = [], []
+        self.solution = None
+        self.objective = None
+
+    def add_var(self, name, size=1, lb=0, ub=np.inf, integer=False):
+        self.columns[name] = np.arange(self.n_cols, self.n_cols+size)
+        self.n_cols = self.n_cols + size
+        self.lb.append(np.full(size, lb, dtype=float))
+        self.ub.append(np.full(size, ub, dtype=float))
+        self.integer.append(np.full(size, integer))
+
+    def col(self, name):
+        return self.columns[name] if self.columns[name].size > 1 else self.columns[name][0]
+
+    def add_rows(self, name, n, terms, sense, rhs):
+        "terms = [(columns, coefficients), ...], each broadcast to n rows; sense is '=', '<' or '>'"
+        rows = np.arange(self.n_rows, self.n_rows+n)
+        for cols, coefs in terms:
+            self.A_rows.append(rows)
+            self.A_cols.append(np.broadcast_to(cols, (n,)))
+            self.A_vals.append(np.broadcast_to(np.asarray(coefs, dtype=float), (n,)))
+        self.sense.append(np.full(n, sense))
+        self.rhs.append(np.broadcast_to(np.asarray(rhs, dtype=float), (n,)))
+        self.blocks[name] = rows
+        self.n_rows = self.n_rows + n
+
+    def matrix(self):
+        from scipy import sparse
+        return sparse.csr_matrix((np.concatenate(self.A_vals), (np.concatenate(self.A_rows), np.concatenate(self.A_cols))), shape=(self.n_rows, self.n_cols))
+
+    def nnz(self):
+        return sum(v.size for v in self.A_vals)
+
+    def fix(self, name, index, value):
+        cols = self.columns[name]
+        lb, ub = np.concatenate(self.lb), np.concatenate(self.ub)
+        lb[cols[index]] = value
+        ub[cols[index]] = value
+        self.lb, self.ub = [lb], [ub]
+
+    def value(self, name):
+        values = self.solution[self.columns[name]]
+        return values if values.size > 1 else values[0]
+
+
+def model_params (model):
+    "Values of the mutable Params of a Pyomo model (CreateModel) by name, as params of CreateMatrixModel"
+    return {param.local_name: pyo.value(param) for param in model.component_objects(pyo.Param, descend_into=False) if param.mutable and not param.is_indexed()}
+
+#params = values of the mutable Params of AddDesign by name (e.g. {'H2_price': 6} or model_params(model)), default model.design_params of the inputs
+def CreateMatrixModel (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, params=None):
+    H = len(df_EPV_h)
+    mm = MatrixModel(H)
+    EPV_profile = df_EPV_h['Power_Output[kWh/m2]'].to_numpy(dtype=float)
+    EWind_profile = df_EWind_h['Wind_Power_1'].to_numpy(dtype=float)
+    electricity_price = df_electricity_prices['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float)
+    self_discharge = float(df_storage.loc['Self_discharge','Input'])
+    charge_discharge_power = float(df_storage.loc['charge_discharge_power','Input'])
+    npc = design_constants(df_general, df_economic, df_Hydrogen)
+    p = {**design_params(df_economic, df_storage, df_Hydrogen, npc), **(params or {})}
+    charge_rate, discharge_rate, electrolyser_efficiency = float(p['charge_rate']), float(p['discharge_rate']), float(p['electrolyser_efficiency'])
+    
+    #Decision Variables
+    mm.add_var('x1')
+    mm.add_var('x2', integer=True)
+    mm.add_var('x3')
+    mm.add_var('x4')
+    mm.add_var('x5')
+    mm.add_var('x5b')
+    mm.add_var('x6', ub=3000000)
+    #Flows
+    for name in ['EW_h', 'EPV_h', 'EUsed_h', 'ECurtailed_h', 'EUsed_Grid_h', 'EUsed_Battery_h', 'EUsed_H2_h', 'EH2_Electrolyser_h', 'EH2_Compressor_h',
+                 'EBattery_Grid_h', 'EBattery_Electrolyser_h', 'PIPEEBattery_Compressor_h', 'STOEBattery_Compressor_h', 'SoC_h', 'EElectrolyser_h',
+                 'PIPEECompressor_h', 'STOECompressor_h', 'ECompressor_PIPE_h', 'ECompressor_STO_h', 'E_H2_Total_h', 'H2_flow_h', 'H2_EL_STO_h',
+                 'H2_EL_PIPE_h', 'H2_STO_PIPE_h', 'H2_Export_h', 'h2Storage', 'Electricity_export']:
+        mm.add_var(name, H)
+    mm.add_var('variation', H, lb=-np.inf)
+    mm.fix('SoC_h', 0, 0)
+    mm.fix('h2Storage', 0, 0)
+    mm.fix('variation', 0, 0)
+    
+    v = mm.col                                      # all hours of a flow, or the column of a decision variable
+    def now(name): return mm.col(name)[1:]          # hours t = 2..H (rules with t-1)
+    def prev(name): return mm.col(name)[:-1]        # hours t-1
+    battery_discharge = [('EBattery_Grid_h', 1/discharge_rate), ('EBattery_Electrolyser_h', 1/discharge_rate), ('PIPEEBattery_Compressor_h', 1/discharge_rate), ('STOEBattery_Compressor_h', 1/discharge_rate)]
+    
+    # Electricity Equations
+    mm.add_rows('celectricity1', H, [(v('EPV_h'), 1), (v('x1'), -EPV_profile)], '=', 0)
+    mm.add_rows('celectricity2', H, [(v('EW_h'), 1), (v('x2'), -EWind_profile)], '=', 0)
+    mm.add_rows('celectricity3', H, [(v('EUsed_h'), 1), (v('EPV_h'), -1), (v('EW_h'), -1), (v('ECurtailed_h'), 1)], '=', 0)
+    mm.add_rows('celectricity4', H, [(v('EUsed_h'), 1), (v('EUsed_Grid_h'), -1), (v('EUsed_Battery_h'), -1), (v('EUsed_H2_h'), -1)], '=', 0)
+    # SoC Equations
+    mm.add_rows('cSoC1', H-1, [(now('SoC_h'), 1), (prev('SoC_h'), -self_discharge), (now('EUsed_Battery_h'), -charge_rate)] + [(now(name), coef) for name, coef in battery_discharge], '=', 0)
+    mm.add_rows('cSoC2', H, [(v('SoC_h'), 1), (v('x3'), -0.90)], '<', 0)
+    mm.add_rows('cSoC3', H-1, [(now('SoC_h'), 1), (v('x3'), -0.10)], '>', 0)
+    mm.add_rows('cSoC4', H-1, [(now(name), coef) for name, coef in battery_discharge] + [(prev('SoC_h'), -1)], '<', 0)
+    mm.add_rows('cSoC5', H-1, [(now('EUsed_Battery_h'), charge_rate), (v('x3'), -0.90), (prev('SoC_h'), 1)], '<', 0)
+    mm.add_rows('cSoC6', H, [(v('EUsed_Battery_h'), charge_rate), (v('x3'), -charge_discharge_power)], '<', 0)
+    mm.add_rows('cSoC7', H, [(v(name), coef) for name, coef in battery_discharge] + [(v('x3'), -charge_discharge_power)], '<', 0)
+    # Balance Electricity
+    mm.add_rows('cbalance0', H, [(v('Electricity_export'), 1), (v('EUsed_Grid_h'), -1), (v('EBattery_Grid_h'), -1)], '=', 0)
+    # Hydrogen and Electrolyser Equations
+    mm.add_rows('chydrogen0', H, [(v('EUsed_H2_h'), 1), (v('EH2_Electrolyser_h'), -1), (v('EH2_Compressor_h'), -1)], '=', 0)
+    mm.add_rows('celectrolyser0', H, [(v('EElectrolyser_h'), 1), (v('EH2_Electrolyser_h'), -1), (v('EBattery_Electrolyser_h'), -1)], '=', 0)
+    mm.add_rows('celectrolyser1', H-1, [(now('variation'), 1), (now('EElectrolyser_h'), -1), (prev('EElectrolyser_h'), 1)], '=', 0)
+    mm.add_rows('celectrolyser2', H-1, [(now('variation'), 1)], '<', 10)
+    mm.add_rows('celectrolyser3', H-1, [(now('variation'), 1)], '>', -10)
+    mm.add_rows('celectrolyser4', H, [(v('H2_flow_h'), 1), (v('EElectrolyser_h'), -1/electrolyser_efficiency)], '=', 0)
+    mm.add_rows('celectrolyser5', H, [(v('H2_flow_h'), 1), (v('H2_EL_STO_h'), -1), (v('H2_EL_PIPE_h'), -1)], '=', 0)
+    mm.add_rows('celectrolyser6', H, [(v('EElectrolyser_h'), 1), (v('x4'), -1)], '<', 0)
+    # Hydrogen Storage
+    mm.add_rows('ch2Storage1', H-1, [(now('h2Storage'), 1), (prev('h2Storage'), -1), (now('H2_EL_STO_h'), -1), (now('H2_STO_PIPE_h'), 1)], '=', 0)
+    mm.add_rows('ch2Storage2', H, [(v('h2Storage'), 1), (v('x6'), -1)], '<', 0)
+    mm.add_rows('ch2Storage3', H-1, [(now('H2_STO_PIPE_h'), 1), (prev('h2Storage'), -1)], '<', 0)
+    mm.add_rows('ch2Storage4', H-1, [(now('H2_EL_STO_h'), 1), (v('x6'), -1), (prev('h2Storage'), 1)], '<', 0)
+    # Compressor Equations
+    mm.add_rows('ccompressor0', H, [(v('EH2_Compressor_h'), 1), (v('PIPEECompressor_h'), -1), (v('STOECompressor_h'), -1)], '=', 0)
+    mm.add_rows('ccompressor1', H, [(v('ECompressor_PIPE_h'), 1), (v('H2_EL_PIPE_h'), -npc['compressor_power_94bar'])], '=', 0)
+    mm.add_rows('ccompressor2', H, [(v('ECompressor_STO_h'), 1), (v('H2_EL_STO_h'), -npc['compressor_power_200bar'])], '=', 0)
+    mm.add_rows('ccompressor3', H, [(v('ECompressor_PIPE_h'), 1), (v('x5'), -1)], '<', 0)
+    mm.add_rows('ccompressor4', H, [(v('ECompressor_PIPE_h'), 1), (v('PIPEECompressor_h'), -1), (v('PIPEEBattery_Compressor_h'), -1)], '=', 0)
+    mm.add_rows('ccompressor5', H, [(v('ECompressor_STO_h'), 1), (v('STOECompressor_h'), -1), (v('STOEBattery_Compressor_h'), -1)], '=', 0)
+    mm.add_rows('ccompressor6', H, [(v('ECompressor_STO_h'), 1), (v('x5b'), -1)], '<', 0)
+    # Balance Hydrogen
+    mm.add_rows('cbalanceH21', H, [(v('H2_Export_h'), 1), (v('H2_EL_PIPE_h'), -1), (v('H2_STO_PIPE_h'), -1)], '=', 0)
+    mm.add_rows('cbalanceH22', H, [(v('H2_Export_h'), 1)], '<', 0.85*p['pipe_capacity'])
+    mm.add_rows('cH2_electricity_total', H, [(v('E_H2_Total_h'), 1), (v('ECompressor_PIPE_h'), -1), (v('ECompressor_STO_h'), -1), (v('EElectrolyser_h'), -1)], '=', 0)
+    # Area constraint
+    mm.add_rows('carea_check', 1, [(v('x1'), df_solar.loc['FPV_kWpm2','Input']*df_solar.loc['area_FPV','Input']/1000000), (v('x2'), df_wind.loc['required_area_turbine','Input'])], '<', 0.9*df_general.loc['area_hub','Input'])
+    
+    # Objective Function (same as OF)
+    mm.c = np.zeros(mm.n_cols)
+    mm.c[v('H2_Export_h')] = npc['annuity_factor']*p['H2_price']
+    mm.c[v('Electricity_export')] = npc['annuity_factor']*electricity_price
+    mm.c[v('x1')] = -df_solar.loc['FPV_kWpm2','Input']*(p['PV_CAPEX'] + p['PV_OPEX'])
+    mm.c[v('x2')] = -(p['W_CAPEX'] + p['W_OPEX'])
+    mm.c[v('x3')] = -(p['CAPEX_Storage'] + p['OPEX_Storage'])
+    mm.c[v('x4')] = -(p['CAPEX_electrolyser'] + p['OPEX_electrolyser'])
+    mm.c[v('x5')] = -(p['CAPEX_compressor'] + p['OPEX_compressor'])
+    mm.c[v('x5b')] = -(p['CAPEX_compressor'] + p['OPEX_compressor'])
+    mm.c[v('x6')] = -(p['CAPEX_h2_storage'] + p['OPEX_h2_storage'])
+    mm.c0 = -(npc['H2_Pipe'] + df_Hydrogen.loc['CAPEX_pipe','Input'])
+    return mm
+
+def solve_matrix_model (mm, solver='highs', tee=False):
+    "Solves the MatrixModel with HiGHS (scipy) or Gurobi (gurobipy), stores the solution vector and the objective value in mm"
+    A = mm.matrix()
+    sense, rhs = np.concatenate(mm.sense), np.concatenate(mm.rhs)
+    lb, ub, integer = np.concatenate(mm.lb), np.concatenate(mm.ub), np.concatenate(mm.integer)
+    if solver == 'gurobi':
+        import gurobipy as gp
+        m = gp.Model()
+        m.Params.OutputFlag = int(tee)
+        x = m.addMVar(mm.n_cols, lb=lb, ub=ub, vtype=np.where(integer, gp.GRB.INTEGER, gp.GRB.CONTINUOUS))
+        m.addMConstr(A, x, sense, rhs)
+        m.setObjective(mm.c @ x + mm.c0, gp.GRB.MAXIMIZE)
+        m.optimize()
+        mm.solution = x.X
+    else:
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        row_lb = np.where(sense == '<', -np.inf, rhs)
+        row_ub = np.where(sense == '>', np.inf, rhs)
+        res = milp(-mm.c, constraints=LinearConstraint(A, row_lb, row_ub), integrality=integer.astype(int), bounds=Bounds(lb, ub), options={'disp': tee})
+        if res.x is None:
+            raise RuntimeError('Matrix model could not be solved: ' + res.message)
+        mm.solution = res.x
+    mm.objective = mm.c @ mm.solution + mm.c0
+    return mm
+
+"Build time of CreateModel (Pyomo rules) and CreateMatrixModel for 1, 5 and 8 years of hourly data (the input year repeated)"
+def BuildBenchmark (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, years=(1, 5, 8)):
+    print('\n Build time benchmark')
+    for n_years in years:
+        df_EWind_n = pd.concat([df_EWind_h]*n_years, ignore_index=True)
+        df_EPV_n = pd.concat([df_EPV_h]*n_years, ignore_index=True)
+        df_prices_n = pd.concat([df_electricity_prices]*n_years, ignore_index=True)
+        start = time.perf_counter()
+        benchmark_model = CreateModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_n, df_EPV_n, df_prices_n)
+        time_pyomo = time.perf_counter() - start
+        del benchmark_model
+        start = time.perf_counter()
+        benchmark_mm = CreateMatrixModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_n, df_EPV_n, df_prices_n)
+        benchmark_mm.matrix()
+        time_matrix = time.perf_counter() - start
+        print('\n %i year(s), %i hours: Pyomo %6.2f s, Matrix %6.2f s (%i rows, %i columns, %i nonzeros)' %(n_years, len(df_EPV_n), time_pyomo, time_matrix, benchmark_mm.n_rows, benchmark_mm.n_cols, benchmark_mm.nnz()))
+        del benchmark_mm
@@ -0,0 +1,639 @@
+# -*- coding: utf-8 -*-
+"""
+Pyomo model of the energy hub: design (x1-x6, investment costs, area) and hourly operation.
+
+CreateModel is the MILP of the study (one horizon), CreateMultiYearModel, CreateStochasticModel and
+LinkRepresentativeDays build the multi-year, stochastic and representative-days variants from the same
+AddDesign/AddOperation parts. Everything the model needs is computed from the input sheets (load_inputs)
+when it is built, nothing is read from module level state, so the functions can be used from worker processes.
+"""
+import numpy as np
+import pyomo.environ as pyo
+from .finance import np_calculator, costs_production_flow, discount_factors, add_replacements
+from .timeseries import iter_years, count_hours
+from .profiling import phase
+
+
+def power_compressor (Pin, Pout):
+    # Calculate estimated compressor power [kWh/kg], Pin and Pout in bar
+    Tmean = 333.15  # Inlet temperature of the compressor
+    gamma = 1.4  # Specific heat ratio
+    Pout = Pout*100   #bar to kPa
+    Pin =  Pin*100   #bar to kPa
+    GH = 0.0696
+    P_compressor = ((286.76/(GH*0.85*0.98))*Tmean*(gamma/(gamma-1))*(((Pout/Pin)**((gamma-1)/gamma))-1))/3600000     #J to kWh
+    return P_compressor
+
+"Constants of AddDesign: NPC of the OPEX of every asset, compressor power and annuity factor"
+#1st Create a cost flow of the OPEX
+#2nd If lifetime of asseet is lower than lifetime of the project, then add the corresponing extra costs in the correct year
+#3nd Calculate NPC
+def design_constants (df_general, df_economic, df_Hydrogen):
+    lifetime = int(df_general.loc['system_lifetime','Input'])
+    r = df_general.loc['discount_rate','Input']
+    
+    Electrolyser_OPEX_flow = costs_production_flow(df_economic.loc['OPEX_Electrolysis','Input'], lifetime)
+    #Adding Investment costs of the stack over the lifetime
+    add_replacements(Electrolyser_OPEX_flow, df_Hydrogen.loc['lifetime_stack','Input'], df_Hydrogen.loc['CAPEX_stack','Input'], until=lifetime)
+    
+    return {
+        'PV_OPEX': np_calculator(costs_production_flow(df_economic.loc['OPEX_solar_total','Input'], lifetime), r),
+        'W_OPEX': np_calculator(costs_production_flow(df_economic.loc['OPEX_wind','Input'], lifetime), r),
+        'OPEX_Storage': np_calculator(costs_production_flow(df_economic.loc['OPEX_battery','Input'], lifetime), r),
+        'OPEX_electrolyser': np_calculator(Electrolyser_OPEX_flow, r),
+        'OPEX_compressor': np_calculator(costs_production_flow(df_economic.loc['OPEX_compressor','Input'], lifetime), r),
+        'OPEX_h2_storage': np_calculator(costs_production_flow(df_economic.loc['OPEX_H2_storage','Input'], lifetime), r),
+        'H2_Pipe': np_calculator(costs_production_flow(df_Hydrogen.loc['OPEX_pipe','Input'], lifetime), r),
+        #Annuity factor: NPC of 1 EUR of revenue every year from year 1 to lifetime, the hourly flows in the OF are discounted only once with it
+        'annuity_factor': np_calculator(costs_production_flow(1, lifetime), r),
+        'compressor_power_94bar': power_compressor(df_Hydrogen.loc['output_pressure','Input'], df_Hydrogen.loc['export_pressure','Input']),    # for current user input Pin, Pout (94 bar for 85km with on shore oressure of 68bar)
+        'compressor_power_200bar': power_compressor(30, 200),     # storage at 200 bar
+        }
+
+"Initial values of the mutable Params of AddDesign by name (sweeps and what-if runs change them with set_value), also the parameters of matrix_model.CreateMatrixModel"
+def design_params (df_economic, df_storage, df_Hydrogen, npc):
+    return {
+        'PV_CAPEX': df_economic.loc['CAPEX_FPV','Input'], 'PV_OPEX': npc['PV_OPEX'],
+        'W_CAPEX': df_economic.loc['CAPEX_wind','Input'], 'W_OPEX': npc['W_OPEX'],
+        'CAPEX_Storage': df_economic.loc['CAPEX_battery','Input'], 'OPEX_Storage': npc['OPEX_Storage'],
+        'charge_rate': df_storage.loc['charge_rate','Input'], 'discharge_rate': df_storage.loc['discharge_rate','Input'],
+        'CAPEX_electrolyser': df_economic.loc['CAPEX_Electrolysis','Input'], 'OPEX_electrolyser': npc['OPEX_electrolyser'],
+        'electrolyser_efficiency': df_Hydrogen.loc['Electrolysis_Efficiency','Input'],                  #kWh/kg
+        'CAPEX_compressor': df_economic.loc['CAPEX_compressor','Input'], 'OPEX_compressor': npc['OPEX_compressor'],
+        'CAPEX_h2_storage': df_economic.loc['CAPEX_H2_storage','Input'], 'OPEX_h2_storage': npc['OPEX_h2_storage'],
+        'pipe_capacity': df_Hydrogen.loc['pipe_capacity','Input'],                                      #kg/h, limit of balanceH22
+        'H2_price': 10,                                                                                 #EUR/kg
+        }
+
+"The model is built in two parts: AddDesign (parameters, design variables x1-x6, investment costs and area constraint, on the top model)"
+"and AddOperation (hourly flows and constraints of one horizon, on a block). CreateModel = design + one operation horizon on the model itself,"
+"CreateMultiYearModel = design + one block per weather year (model.year[y]), the storage levels linked between consecutive years"
+def CreateModel (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h,df_electricity_prices, hour_weights=None, compact=False, mutable_profiles=False):
+    #hour_weights: number of hours of the year represented by every hour (representative days, see aggregation.py), default 1
+    #compact: alias flows as expressions (see AddOperation), same optimum
+    model = pyo.ConcreteModel(name='HPP - Model Optimisation')
+    AddDesign(model, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen)
+    AddOperation(model, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, hour_weights, compact=compact, mutable_profiles=mutable_profiles)
+    
+# OBJECTIVE FUNCTION
+    def OF (model):                                                           #revenues of one year times the annuity factor, minus CAPEX and NPC of the OPEX
+        return model.annuity_factor*model.revenue - model.costs
+    model.ObjFunction = pyo.Objective(rule=OF, sense = pyo.maximize)
+    
+    return model
+
+def CreateCompactModel (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h,df_electricity_prices, hour_weights=None):
+    #CreateModel(compact=True) with its own name, as model factory of the sweep (the name is part of the result cache key)
+    return CreateModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h,df_electricity_prices, hour_weights, compact=True)
+
+def AddDesign (model, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen):
+    with phase('design_constants'):
+        npc = design_constants(df_general, df_economic, df_Hydrogen)
+    params = design_params(df_economic, df_storage, df_Hydrogen, npc)
+    
+    "----------------------Parameters----------------------"
+    ##Solar
+    model.PV_CAPEX = pyo.Param(initialize=params['PV_CAPEX'], mutable=(True))
+    model.PV_OPEX = pyo.Param(initialize=params['PV_OPEX'], mutable=(True))
+    
+    ##Wind Costs
+    model.W_CAPEX = pyo.Param(initialize=params['W_CAPEX'], mutable=(True))
+    model.W_OPEX = pyo.Param(initialize=params['W_OPEX'], mutable=(True))
+    
+    #Storage 
+    model.CAPEX_Storage = pyo.Param(initialize=params['CAPEX_Storage'], mutable=(True))
+    model.OPEX_Storage = pyo.Param(initialize=params['OPEX_Storage'], mutable=(True))
+    model.charge_rate = pyo.Param(initialize=params['charge_rate'], mutable=(True))
+    model.discharge_rate = pyo.Param(initialize=params['discharge_rate'], mutable=(True))   
+    
+    ##Electrolyser
+    model.CAPEX_electrolyser = pyo.Param(initialize=params['CAPEX_electrolyser'], mutable=(True))
+    model.OPEX_electrolyser = pyo.Param(initialize=params['OPEX_electrolyser'], mutable=(True))
+    model.electrolyser_efficiency = pyo.Param(initialize=params['electrolyser_efficiency'], mutable=(True)) #kWh/kg
+    
+    #Compressor
+    model.CAPEX_compressor = pyo.Param(initialize = params['CAPEX_compressor'], mutable=(True))
+    model.OPEX_compressor = pyo.Param(initialize = params['OPEX_compressor'], mutable=(True))
+    model.compressor_power_94bar = pyo.Param(initialize = npc['compressor_power_94bar'])
+    model.compressor_power_200bar = pyo.Param(initialize = npc['compressor_power_200bar'])
+    #H2 Storage
+    model.CAPEX_h2_storage = pyo.Param(initialize=params['CAPEX_h2_storage'], mutable=(True))
+    model.OPEX_h2_storage = pyo.Param(initialize = params['OPEX_h2_storage'], mutable=(True))
+    
+    #H2 Pipe
+    model.H2_Pipe =  pyo.Param(initialize = npc['H2_Pipe']) #the opex of teh pipe NPC
+    model.CAPEX_pipe = pyo.Param(initialize = df_Hydrogen.loc['CAPEX_pipe','Input'])
+    model.pipe_capacity = pyo.Param(initialize = params['pipe_capacity'], mutable=(True)) #kg/h, limit of balanceH22
+
+    #Hydrogen Price EUR/kg
+    model.H2_price = pyo.Param(initialize = params['H2_price'], mutable=(True))
+    
+    #Annuity factor of the yearly revenues
+    model.annuity_factor = pyo.Param(initialize = npc['annuity_factor'])
+    
+    
+    "--------------------Decision Variables--------------------"
+    #Decision Variables
+    model.x1 = pyo.Var(within=pyo.NonNegativeReals)    # Area PV [m2]
+    model.x2 = pyo.Var(within=pyo.NonNegativeIntegers) # Number of Wind Turbines
+    model.x3 = pyo.Var(within=pyo.NonNegativeReals)    # Storage Size [kWh]
+    model.x4 = pyo.Var(within=pyo.NonNegativeReals)    # Electrolyser Size [kWh]                       
+    model.x5 = pyo.Var(within=pyo.NonNegativeReals)    # Compressor Size  power for exporting from 30 bar to export pressure in pippe
+    model.x5b = pyo.Var(within=pyo.NonNegativeReals)    # Compressor Size required for 200 bar storage
+    model.x6 = pyo.Var(within=pyo.NonNegativeReals, bounds=(0,3000000))    # h2 buffer [kg]
+
+    
+    #CAPEX + NPC of the OPEX of the design, the part of the OF that does not depend on the hours
+    def costs (model):
+        return (((model.x1*df_solar.loc['FPV_kWpm2','Input'])*(model.PV_CAPEX+model.PV_OPEX))  + (model.x2*(model.W_CAPEX+model.W_OPEX)) + (model.x3*(model.CAPEX_Storage + model.OPEX_Storage)) + (model.x4*(model.CAPEX_electrolyser + model.OPEX_electrolyser)) + ((model.x5+model.x5b)*(model.CAPEX_compressor + model.OPEX_compressor)) + (model.x6*(model.CAPEX_h2_storage + model.OPEX_h2_storage)) +  model.H2_Pipe + model.CAPEX_pipe)
+    model.costs = pyo.Expression(rule=costs)
+    
+    #Area constraint (time invariant --> one scalar constraint, not one per hour)
+    def area_check (model):
+        return (((model.x1*df_solar.loc['FPV_kWpm2','Input']*df_solar.loc['area_FPV','Input'])/1000000) + (model.x2*df_wind.loc['required_area_turbine','Input'])) <= 0.9*df_general.loc['area_hub','Input']
+    model.carea_check = pyo.Constraint(rule=area_check)
+    return model
+
+COMPACT_EXPRESSIONS = ['EPV_h', 'EW_h', 'EH2_Compressor_h', 'EUsed_H2_h', 'EUsed_h', 'ECurtailed_h', 'EElectrolyser_h', 'ECompressor_PIPE_h',
+                       'ECompressor_STO_h', 'E_H2_Total_h', 'H2_flow_h', 'H2_Export_h', 'Electricity_export', 'variation']
+
+def is_compact (b):
+    "True if the operation of block b was added with compact=True"
+    return b.component('EPV_h').ctype is pyo.Expression
+
+"Hourly flows and constraints of one horizon on block b (the model itself, or one year block), the design variables and parameters are the ones of the top model"
+"initial = {'SoC_h':.., 'h2Storage':.., 'EElectrolyser_h':..} levels in the hour before t = 1 (numbers, or the variables of the last hour of the previous block)"
+"initial = None: the storage starts empty and the load variation is free at t = 1, as in the single horizon model"
+"compact = True: the flows fixed by an equality row (COMPACT_EXPRESSIONS) are Expressions of the other variables instead of variables + rows,"
+"same names and values (pyo.value), same optimum with half the variables and rows. Curtailment >= 0 and the ramp limit remain as rows"
+"mutable_profiles = True: the hourly profiles are mutable Params b.EPV_profile, b.EWind_profile and b.electricity_price (incremental.py changes single hours)"
+def AddOperation (b, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, hour_weights=None, initial=None, compact=False, mutable_profiles=False):
+    model = b.model()
+    
+    #Defining Sets
+    # b.T = pyo.Set(ordered = True, initialize=range(8760)) ATTENTION: RangeSet starts in 1!, Range starts in 0! 
+    b.T = pyo.Set(initialize = pyo.RangeSet(len(df_EPV_h)), ordered=True) 
+    
+    #Hourly profiles and constants read once as numpy arrays/floats, the rules index them with t-1 instead of calling df.loc in every row
+    EPV_profile = df_EPV_h['Power_Output[kWh/m2]'].to_numpy(dtype=float)
+    EWind_profile = df_EWind_h['Wind_Power_1'].to_numpy(dtype=float)
+    electricity_price = df_electricity_prices['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float)
+    self_discharge = float(df_storage.loc['Self_discharge','Input'])
+    charge_discharge_power = float(df_storage.loc['charge_discharge_power','Input'])
+    hour_weight = np.ones(len(df_EPV_h)) if hour_weights is None else np.asarray(hour_weights, dtype=float)
+    if mutable_profiles:                                        #same t-1 indexing, the rules get the Param of the hour instead of the number
+        b.EPV_profile = pyo.Param(b.T, initialize=lambda b, t: EPV_profile[t-1], mutable=True)
+        b.EWind_profile = pyo.Param(b.T, initialize=lambda b, t: EWind_profile[t-1], mutable=True)
+        b.electricity_price = pyo.Param(b.T, initialize=lambda b, t: electricity_price[t-1], mutable=True)
+        EPV_profile, EWind_profile, electricity_price = [list(param.values()) for param in (b.EPV_profile, b.EWind_profile, b.electricity_price)]
+    
+    #Level of a storage/load variable in the previous hour, at t = 1 the last hour of the previous block
+    def prev (var, t):
+        return var[t-1] if t > 1 else initial[var.local_name]
+    
+    "------------------------Variables - the Flows------------------------"
+    #compact: the variables under "if not compact" are Expressions, declared after the variables (see below)
+    
+    if not compact:
+        b.EW_h = pyo.Var(b.T,within=pyo.NonNegativeReals)    # Total Wind Energy                 
+        b.EPV_h = pyo.Var(b.T,within=pyo.NonNegativeReals)   # Total PV Energy      
+        
+        b.EUsed_h = pyo.Var(b.T,within=pyo.NonNegativeReals)    #Total Electricity used
+        b.ECurtailed_h = pyo.Var(b.T,within=pyo.NonNegativeReals)   #Total electricity Curtailed
+    
+    b.EUsed_Grid_h = pyo.Var(b.T,within=pyo.NonNegativeReals)        #Electricity Used Wind and PV to Grid  
+    b.EUsed_Battery_h = pyo.Var(b.T,within=pyo.NonNegativeReals)     #Electricity from Wind and PV to Storage (Charge_Flow)      
+    if not compact:
+        b.EUsed_H2_h = pyo.Var(b.T,within=pyo.NonNegativeReals)             #Electriity used from W and PV to H2 production 
+   
+    b.EH2_Electrolyser_h = pyo.Var(b.T,within=pyo.NonNegativeReals)     #Electricity from Wind and PV to Electrolyser 
+    if not compact:
+        b.EH2_Compressor_h = pyo.Var(b.T,within=pyo.NonNegativeReals)       #Electricity from Wind and PV to Compressor 
+    
+    b.EBattery_Grid_h = pyo.Var(b.T, within=pyo.NonNegativeReals)           #Electricity from baterry to grid (discharge flow)
+    b.EBattery_Electrolyser_h = pyo.Var(b.T, within=pyo.NonNegativeReals)   #Electricity from baterry to electrolyser (discharge flow)
+    b.PIPEEBattery_Compressor_h = pyo.Var(b.T, within=pyo.NonNegativeReals)
+    b.STOEBattery_Compressor_h = pyo.Var(b.T, within=pyo.NonNegativeReals)
+    
+    b.SoC_h = pyo.Var(b.T, within=pyo.NonNegativeReals)                 #Battery SoC
+    
+    if not compact:
+        b.EElectrolyser_h = pyo.Var(b.T,within=pyo.NonNegativeReals)        #Total electricity used from PV, Wind and Storage! 
+    b.PIPEECompressor_h = pyo.Var(b.T,within=pyo.NonNegativeReals)          #Total electricity used from PV, Wind and Storage!
+    b.STOECompressor_h = pyo.Var(b.T,within=pyo.NonNegativeReals)  
+    if not compact:
+        b.ECompressor_PIPE_h = pyo.Var(b.T,within=pyo.NonNegativeReals) 
+        b.ECompressor_STO_h = pyo.Var(b.T,within=pyo.NonNegativeReals) 
+        
+        b.E_H2_Total_h = pyo.Var(b.T,within=pyo.NonNegativeReals)           
+        b.H2_flow_h = pyo.Var(b.T,within=pyo.NonNegativeReals)              #Total H2 production per hour from the Electrolyser
+    b.H2_EL_STO_h = pyo.Var(b.T,within=pyo.NonNegativeReals)            #H2 from Electrolyser to storage  
+    b.H2_EL_PIPE_h = pyo.Var(b.T,within=pyo.NonNegativeReals)            #H2 from electrolyser to CMP--> to pipe
+    b.H2_STO_PIPE_h = pyo.Var(b.T,within=pyo.NonNegativeReals)           #H2 from Buffer/Storage to pipe
+    if not compact:
+        b.H2_Export_h = pyo.Var(b.T,within=pyo.NonNegativeReals)
+
+    b.h2Storage = pyo.Var(b.T,within=pyo.NonNegativeReals)              # H2 Storage
+    if not compact:
+        b.Electricity_export = pyo.Var(b.T,within=pyo.NonNegativeReals)  
+
+        b.variation = pyo.Var(b.T, within=pyo.Reals)
+    
+    else:
+        #Compact formulation: the flows defined by an equality row are expressions (the row is substituted out), in the order they depend on each other.
+        #Their non-negativity follows from the other variables, except ECurtailed_h >= 0 (ccurtailment); variation keeps its limits (cvariation)
+        b.EPV_h = pyo.Expression(b.T, rule=lambda b, t: model.x1*EPV_profile[t-1])                                            #electricity1
+        b.EW_h = pyo.Expression(b.T, rule=lambda b, t: model.x2*EWind_profile[t-1])                                           #electricity2
+        b.EH2_Compressor_h = pyo.Expression(b.T, rule=lambda b, t: b.PIPEECompressor_h[t] + b.STOECompressor_h[t])             #compressor0
+        b.EUsed_H2_h = pyo.Expression(b.T, rule=lambda b, t: b.EH2_Electrolyser_h[t] + b.EH2_Compressor_h[t])                  #hydrogen0
+        b.EUsed_h = pyo.Expression(b.T, rule=lambda b, t: b.EUsed_Grid_h[t] + b.EUsed_Battery_h[t] + b.EUsed_H2_h[t])          #electricity4
+        b.ECurtailed_h = pyo.Expression(b.T, rule=lambda b, t: b.EPV_h[t] + b.EW_h[t] - b.EUsed_h[t])                          #electricity3
+        b.EElectrolyser_h = pyo.Expression(b.T, rule=lambda b, t: b.EH2_Electrolyser_h[t] + b.EBattery_Electrolyser_h[t])     #electrolyser0
+        b.ECompressor_PIPE_h = pyo.Expression(b.T, rule=lambda b, t: b.PIPEECompressor_h[t] + b.PIPEEBattery_Compressor_h[t]) #compressor4
+        b.ECompressor_STO_h = pyo.Expression(b.T, rule=lambda b, t: b.STOECompressor_h[t] + b.STOEBattery_Compressor_h[t])    #compressor5
+        b.E_H2_Total_h = pyo.Expression(b.T, rule=lambda b, t: b.ECompressor_PIPE_h[t] + b.ECompressor_STO_h[t] + b.EElectrolyser_h[t])   #H2_electricity_total
+        b.H2_flow_h = pyo.Expression(b.T, rule=lambda b, t: b.EElectrolyser_h[t]/model.electrolyser_efficiency)               #electrolyser4
+        b.H2_Export_h = pyo.Expression(b.T, rule=lambda b, t: b.H2_EL_PIPE_h[t] + b.H2_STO_PIPE_h[t])                         #balanceH21
+        b.Electricity_export = pyo.Expression(b.T, rule=lambda b, t: b.EUsed_Grid_h[t] + b.EBattery_Grid_h[t])                #balance0
+        b.variation = pyo.Expression(b.T, rule=lambda b, t: 0 if t == 1 and initial is None else b.EElectrolyser_h[t] - prev(b.EElectrolyser_h, t))   #electrolyser1
+    
+    #Revenues of the horizon (not discounted): H2 and electricity exported
+    def revenue (b):
+        return sum(b.H2_Export_h[t]*model.H2_price*hour_weight[t-1] for t in b.T) + sum(b.Electricity_export[t]*(electricity_price[t-1]*hour_weight[t-1]) for t in b.T)
+    b.revenue = pyo.Expression(rule=revenue)
+
+# Electricity Equations      
+    #"EPV_h: Total energy generated by PV"    
+    def electricity1 (b, t):
+        return b.EPV_h[t] == model.x1*EPV_profile[t-1]
+    #"EW_h: Total energy generated by Wind"
+    def electricity2 (b, t):
+        return b.EW_h[t] == model.x2*EWind_profile[t-1]
+    #"Total Used energy is equal to the total generated by PV and Wind minus the energy cutailed"
+    def electricity3 (b, t):
+        return b.EUsed_h[t] == (b.EPV_h[t] + b.EW_h[t]) - b.ECurtailed_h[t] 
+    #"Total Used energy is equal to energy used to the Grid, plus Battery plus Hydrogen production"
+    def electricity4 (b, t):
+        return b.EUsed_h[t] == b.EUsed_Grid_h[t] + b.EUsed_Battery_h[t] + b.EUsed_H2_h[t]         
+      
+#SoC Equations 
+    #"SoC1: At every hour h, the storage is equal to the storage level at the previous hour plus te charging flows multipliied by the charge rate miinus the discharging flows"
+    def SoC1 (b, t):
+        # if t == 0:
+        if t == 1 and initial is None:
+            return  pyo.Constraint.Skip # SoC_h[1] is fixed to 0 below (first block). If initial storage is not enough for the sum of the demand in the first hours without irradiance, then the model does not work! in this case the sum is 136.9 kWh #+ (b.charge_flow[t]*df_technical_data.loc['charge_rate','Input']) - (b.discharge_flow[t]/df_technical_data.loc['discharge_rate','Input'])
+        else:
+            return  b.SoC_h[t] ==  (prev(b.SoC_h, t)*self_discharge) + (b.EUsed_Battery_h[t]*model.charge_rate) - ((b.EBattery_Grid_h[t]+b.EBattery_Electrolyser_h[t]+b.PIPEEBattery_Compressor_h[t]+b.STOEBattery_Compressor_h[t])/model.discharge_rate)
+
+#"SoC2: At every hour the storage level has to be lower or equal than the maxium (X3)"
+# To avoid degradation, teh DoD is 80%, then the battery opperates between 90% and 10% of total capacity
+    def SoC2 (b, t):
+        return b.SoC_h[t] <= model.x3*0.90    
+    def SoC3 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.SoC_h[t] >= model.x3*0.10 
+
+    
+    #"SoC3: The discharge flow cannot be higher than the storage level at h-1 (previous hour)"    
+    def SoC4 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return (b.EBattery_Grid_h[t] + b.EBattery_Electrolyser_h[t] + b.PIPEEBattery_Compressor_h[t]+b.STOEBattery_Compressor_h[t])/model.discharge_rate <= prev(b.SoC_h, t)
+    #"SoC4: The charge flow cannot be higher than the the maximum capaacity minus SoC prevoius hour"    
+    def SoC5 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.EUsed_Battery_h[t]*model.charge_rate <= model.x3*0.90 - prev(b.SoC_h, t)    
+    def SoC6 (b, t):
+        return (b.EUsed_Battery_h[t]*model.charge_rate) <= model.x3*charge_discharge_power
+    def SoC7 (b, t):
+        return ((b.EBattery_Grid_h[t] + b.EBattery_Electrolyser_h[t] + b.PIPEEBattery_Compressor_h[t] + b.STOEBattery_Compressor_h[t])/model.discharge_rate) <= model.x3*charge_discharge_power
+ 
+            
+#Balance Electricity 
+    def balance0 (b, t):    
+        return b.Electricity_export[t] == b.EUsed_Grid_h[t] + b.EBattery_Grid_h[t]    
+
+# Hydrogen Equations
+# Total Electricity to Hydrogen production goes to Electrolyser or Compressor
+    def hydrogen0 (b, t):
+        return  b.EUsed_H2_h[t] == b.EH2_Electrolyser_h[t] + b.EH2_Compressor_h[t]
+
+# Electrolyser Equations
+# Total Electricity Consumption Electrolyser
+    def electrolyser0 (b, t):
+        return  b.EElectrolyser_h[t] == b.EH2_Electrolyser_h[t] + b.EBattery_Electrolyser_h[t]
+
+
+########### OPTIONAL ##########
+# Management electricity to electrolyser equations, limit the diffefrent in load between hours. 
+    def electrolyser1 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.variation[t] == b.EElectrolyser_h[t] - prev(b.EElectrolyser_h, t)        
+    def electrolyser2 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.variation[t] <= 10 
+    def electrolyser3 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.variation[t] >= -10         
+########### OPTIONAL ##########  
+
+# Total Hydrogen Production
+    def electrolyser4 (b, t):
+        return b.H2_flow_h[t] == b.EElectrolyser_h[t]/model.electrolyser_efficiency #kg H2
+# Total H2 produced goes to the storage meduim or to the compressor to be exported
+    def electrolyser5 (b, t):
+        return b.H2_flow_h[t] == b.H2_EL_STO_h[t] + b.H2_EL_PIPE_h[t] 
+# Electrolyser Capacity
+    def electrolyser6 (b, t):
+        return b.EElectrolyser_h[t] <= model.x4
+
+#Hydrogen Storage
+    def h2Storage1 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.h2Storage[t] == prev(b.h2Storage, t) + b.H2_EL_STO_h[t] - b.H2_STO_PIPE_h[t]
+    def h2Storage2 (b, t):
+        return b.h2Storage[t] <= model.x6
+    def h2Storage3 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.H2_STO_PIPE_h[t] <= prev(b.h2Storage, t)
+    def h2Storage4 (b, t):
+        if t == 1 and initial is None:
+            return pyo.Constraint.Skip
+        else:
+            return b.H2_EL_STO_h[t] <= model.x6 - prev(b.h2Storage, t)        
+
+# Balance Hydrogen    
+    def balanceH21 (b, t):
+        return b.H2_Export_h[t] == (b.H2_EL_PIPE_h[t] + b.H2_STO_PIPE_h[t]) 
+    def balanceH22 (b, t):
+        return b.H2_Export_h[t] <= 0.85*model.pipe_capacity #max utilisation is 85%
+   
+    
+   
+# compressor Pipe
+# Compressor Equations
+    def compressor0 (b, t):
+        return b.EH2_Compressor_h[t] ==  b.PIPEECompressor_h[t] + b.STOECompressor_h[t] #electricity from PV and wind goind directly to compressor
+
+    def compressor4 (b, t):
+       return  b.ECompressor_PIPE_h[t] == b.PIPEECompressor_h[t] + b.PIPEEBattery_Compressor_h[t] #total electricity consumed to compress H2 to pipe, it comes from PV+W directly + battery
+ 
+    def compressor5 (b, t):
+        return  b.ECompressor_STO_h[t] ==  b.STOECompressor_h[t] + b.STOEBattery_Compressor_h[t] # same but for storage H2
+    
+    # def compressor1 (b, t):
+    #     return  b.PIPEECompressor_h[t] == (b.H2_EL_PIPE_h[t]*model.compressor_power_94bar)
+    def compressor1 (b, t):
+        return  b.ECompressor_PIPE_h[t] == (b.H2_EL_PIPE_h[t]*model.compressor_power_94bar)
+  
+    
+#  Electricity Consumption Compressor for hydrogen from electrolyser to STORAGE directly"
+    # def compressor2 (b, t):
+    #     return  b.STOECompressor_h[t] ==  (b.H2_EL_STO_h[t]*model.compressor_power_200bar) 
+    def compressor2 (b, t):
+        return  b.ECompressor_STO_h[t] ==  (b.H2_EL_STO_h[t]*model.compressor_power_200bar)     
+# Compressor Capacity"
+    def compressor3 (b, t):
+        return b.ECompressor_PIPE_h[t] <= model.x5
+
+# Compressor Capacity"
+    def compressor6 (b, t):
+        return b.ECompressor_STO_h[t] <= model.x5b
+
+#Total electricity consumption Hydrogen production
+    def H2_electricity_total (b, t):
+        return b.E_H2_Total_h[t] == b.ECompressor_PIPE_h[t] +b.ECompressor_STO_h[t]+ b.EElectrolyser_h[t]
+
+
+
+    #Initial conditions at t = 1 are variable fixings, not repeated equality rows in SoC1, SoC3-5, electrolyser1-3 and h2Storage1,3,4
+    if initial is None:
+        b.SoC_h[b.T.first()].fix(0)
+        b.h2Storage[b.T.first()].fix(0)
+        if not compact:
+            b.variation[b.T.first()].fix(0)
+
+    #compact: the equality rows of the expressions are not added, electricity1-4 become ccurtailment and electrolyser1-3 cvariation
+    if not compact:
+        b.celectricity1 = pyo.Constraint(b.T, rule=electricity1)
+        b.celectricity2 = pyo.Constraint(b.T, rule=electricity2)
+        b.celectricity3 = pyo.Constraint(b.T, rule=electricity3)
+        b.celectricity4 = pyo.Constraint(b.T, rule=electricity4)
+    else:
+        b.ccurtailment = pyo.Constraint(b.T, rule=lambda b, t: b.EUsed_h[t] <= b.EPV_h[t] + b.EW_h[t])
+        b.cvariation = pyo.Constraint(b.T, rule=lambda b, t: pyo.Constraint.Skip if t == 1 and initial is None else pyo.inequality(-10, b.variation[t], 10))
+    b.cSoC1 = pyo.Constraint(b.T, rule=SoC1)
+    b.cSoC2 = pyo.Constraint(b.T, rule=SoC2)
+    b.cSoC3 = pyo.Constraint(b.T, rule=SoC3)
+    b.cSoC4 = pyo.Constraint(b.T, rule=SoC4)
+    b.cSoC5 = pyo.Constraint(b.T, rule=SoC5)
+    b.cSoC6 = pyo.Constraint(b.T, rule=SoC6)        
+    b.cSoC7 = pyo.Constraint(b.T, rule=SoC7) 
+    if not compact:
+        b.cbalance0 = pyo.Constraint(b.T, rule=balance0)
+        b.chydrogen0 = pyo.Constraint(b.T, rule=hydrogen0)
+        b.celectrolyser0 = pyo.Constraint(b.T, rule=electrolyser0)
+        ########### OPTIONAL ##########
+        b.celectrolyser1 = pyo.Constraint(b.T, rule=electrolyser1) 
+        b.celectrolyser2 = pyo.Constraint(b.T, rule=electrolyser2)    
+        b.celectrolyser3 = pyo.Constraint(b.T, rule=electrolyser3)   
+        ########### OPTIONAL ##########
+        b.celectrolyser4 = pyo.Constraint(b.T, rule=electrolyser4)
+    b.celectrolyser5 = pyo.Constraint(b.T, rule=electrolyser5) 
+    b.celectrolyser6 = pyo.Constraint(b.T, rule=electrolyser6)
+    b.ch2Storage1 = pyo.Constraint(b.T, rule=h2Storage1) 
+    b.ch2Storage2 = pyo.Constraint(b.T, rule=h2Storage2)
+    b.ch2Storage3 = pyo.Constraint(b.T, rule=h2Storage3)
+    b.ch2Storage4 = pyo.Constraint(b.T, rule=h2Storage4)
+    if not compact:
+        b.ccompressor0 = pyo.Constraint(b.T, rule=compressor0)
+    b.ccompressor1 = pyo.Constraint(b.T, rule=compressor1)
+    b.ccompressor2 = pyo.Constraint(b.T, rule=compressor2)
+    b.ccompressor3 = pyo.Constraint(b.T, rule=compressor3)
+    if not compact:
+        b.ccompressor4 = pyo.Constraint(b.T, rule=compressor4)    
+        b.ccompressor5 = pyo.Constraint(b.T, rule=compressor5)
+    b.ccompressor6 = pyo.Constraint(b.T, rule=compressor6)
+    if not compact:
+        b.cbalanceH21 = pyo.Constraint(b.T, rule=balanceH21)
+    b.cbalanceH22 = pyo.Constraint(b.T, rule=balanceH22)
+    if not compact:
+        b.cH2_electricity_total = pyo.Constraint(b.T, rule=H2_electricity_total)
+
+    
+    return b
+
+"Multi-year model: design + one operation block per weather year (model.year[y]). The hourly data is streamed from timeseries_file one year at a time"
+"(timeseries.iter_years), the DataFrames of a year are released once its block is built. The levels of SoC_h, h2Storage and EElectrolyser_h at the end"
+"of a year are the initial levels of the next year. Weather year y is used for the project years y+1, y+1+n_years, ... (cyclic over the lifetime),"
+"its revenues are discounted with the sum of the discount factors of those years (same total as the annuity factor)"
+def CreateMultiYearModel (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, timeseries_file, hours_per_year=8760, columns=None, compact=False):
+    n_years = -(-count_hours(timeseries_file)//hours_per_year)
+    model = pyo.ConcreteModel(name='HPP - Model Optimisation (multi-year)')
+    AddDesign(model, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen)
+    
+    model.Y = pyo.RangeSet(0, n_years-1)
+    model.year = pyo.Block(model.Y)
+    initial = None
+    for y, (df_EWind_y, df_EPV_y, df_prices_y) in enumerate(iter_years(timeseries_file, hours_per_year, columns)):
+        b = model.year[y]
+        AddOperation(b, df_storage, df_Hydrogen, df_EWind_y, df_EPV_y, df_prices_y, initial=initial, compact=compact)
+        last = b.T.last()
+        initial = {'SoC_h': b.SoC_h[last], 'h2Storage': b.h2Storage[last], 'EElectrolyser_h': b.EElectrolyser_h[last]}
+        if len(df_EPV_y) < hours_per_year:                                    #not scaled to a full year, the storage would shift production into the scaled hours
+            print('\n Multi-year model: the last block has only %i hours, its revenues are not a full year' %len(df_EPV_y))
+    
+    lifetime = int(df_general.loc['system_lifetime','Input'])
+    discount = discount_factors(lifetime, df_general.loc['discount_rate','Input'])[1:]
+    year_weight = np.bincount(np.arange(lifetime) % n_years, weights=discount, minlength=n_years)
+    model.year_weight = pyo.Param(model.Y, initialize=dict(enumerate(year_weight)))
+    
+# OBJECTIVE FUNCTION
+    def OF (model):                                                           #discounted revenues of every weather year, minus CAPEX and NPC of the OPEX
+        return sum(model.year_weight[y]*model.year[y].revenue for y in model.Y) - model.costs
+    model.ObjFunction = pyo.Objective(rule=OF, sense = pyo.maximize)
+    
+    return model
+
+"Elastic operating limits for the decomposed models (rolling horizon, Benders): the electrolyser ramp limit (electrolyser2-3) and, with soc_min,"
+"the minimum SoC (SoC3) get a violation variable, so a window or block is feasible for any initial levels and design. Returns the total violation,"
+"to be penalised in the objective"
+def AddElasticLimits (b, soc_min=False):
+    model = b.model()
+    if is_compact(b):
+        b.cvariation.deactivate()
+    else:
+        b.celectrolyser2.deactivate()
+        b.celectrolyser3.deactivate()
+    b.ramp_violation = pyo.Var(b.T, within=pyo.NonNegativeReals)
+    b.cramp_up = pyo.Constraint(b.T, rule=lambda b, t: b.variation[t] <= 10 + b.ramp_violation[t])
+    b.cramp_down = pyo.Constraint(b.T, rule=lambda b, t: b.variation[t] >= -10 - b.ramp_violation[t])
+    violation = pyo.quicksum(b.ramp_violation.values())
+    if soc_min:
+        b.cSoC3.deactivate()
+        b.SoC_violation = pyo.Var(b.T, within=pyo.NonNegativeReals)
+        b.cSoC_min = pyo.Constraint(b.T, rule=lambda b, t: b.SoC_h[t] + b.SoC_violation[t] >= model.x3*0.10 if t > 1 or not b.SoC_h[t].fixed else pyo.Constraint.Skip)
+        violation = violation + pyo.quicksum(b.SoC_violation.values())
+    return violation
+
+
+"Two-stage stochastic design: x1-x6 shared by all the weather/price scenarios, one dispatch block per scenario (flows indexed by scenario and hour)."
+"Extensive form: all the scenarios in one model, objective = expected revenues - costs. For many scenarios progressive hedging (progressive_hedging.py)"
+"solves one model per scenario in parallel workers instead, driving the scenario designs to one design"
+def CreateStochasticModel (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, scenarios, probabilities=None, compact=False):
+    #scenarios = [(df_EWind_h, df_EPV_h, df_electricity_prices), ...] (e.g. the years of iter_years), probabilities default equal
+    n_scenarios = len(scenarios)
+    model = pyo.ConcreteModel(name='HPP - Model Optimisation (stochastic, extensive form)')
+    AddDesign(model, df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen)
+    
+    model.S = pyo.RangeSet(0, n_scenarios-1)
+    model.probability = pyo.Param(model.S, initialize=dict(enumerate(probabilities or [1/n_scenarios]*n_scenarios)))
+    model.scenario = pyo.Block(model.S)
+    for s, (df_EWind_s, df_EPV_s, df_prices_s) in enumerate(scenarios):
+        AddOperation(model.scenario[s], df_storage, df_Hydrogen, df_EWind_s, df_EPV_s, df_prices_s, compact=compact)
+    
+# OBJECTIVE FUNCTION
+    def OF (model):                                                           #expected revenues, minus CAPEX and NPC of the OPEX
+        return model.annuity_factor*sum(model.probability[s]*model.scenario[s].revenue for s in model.S) - model.costs
+    model.ObjFunction = pyo.Objective(rule=OF, sense = pyo.maximize)
+    
+    return model
+
+"Representative days: CreateModel on the reduced profiles of aggregation.aggregate_profiles (with hour_weights), then the storage is linked over the original days"
+"SoC_h and h2Storage become intra-day levels relative to the start of each representative day. The level at the start of every original day (SoC_day, h2_day)"
+"follows the sequence of original days: level[d+1] = level[d] + change over the representative day of d. The capacity limits are applied to level[d] plus the"
+"max/min intra-day level of its representative day (Kotzur et al., 2018). SoC4, SoC5, h2Storage3, h2Storage4 (limits on the previous hour level) are not used."
+def LinkRepresentativeDays (model, aggregation, df_storage):
+    P = aggregation['period_length']
+    assignment = aggregation['assignment']
+    n_rep = len(aggregation['medoids'])
+    starts = [c*P + 1 for c in range(n_rep)]
+    ends = [(c+1)*P for c in range(n_rep)]
+    self_discharge = float(df_storage.loc['Self_discharge','Input'])
+    
+    model.C = pyo.RangeSet(0, n_rep-1)                                          #representative days
+    model.D = pyo.RangeSet(0, len(assignment)-1)                                #original days
+    model.CT = pyo.Set(initialize=[(c, t) for c in range(n_rep) for t in range(starts[c], ends[c]+1)], dimen=2)
+    
+    #Intra-day levels, relative (can be negative), every representative day starts from 0
+    for t in model.T:
+        model.SoC_h[t].domain = pyo.Reals
+        model.h2Storage[t].domain = pyo.Reals
+    model.SoC_h[1].unfix()
+    model.h2Storage[1].unfix()
+    for block in [model.cSoC2, model.cSoC3, model.cSoC4, model.cSoC5, model.ch2Storage2, model.ch2Storage3, model.ch2Storage4]:
+        block.deactivate()
+    for t in starts[1:]:
+        model.cSoC1[t].deactivate()
+        model.ch2Storage1[t].deactivate()
+        if is_compact(model):
+            model.cvariation[t].deactivate()
+        else:
+            model.celectrolyser1[t].deactivate()
+            model.celectrolyser2[t].deactivate()
+            model.celectrolyser3[t].deactivate()
+            model.variation[t].fix(0)
+    #Electrolyser load variation limit between the last hour of a day and the first hour of the next one, for every pair of consecutive representative days in the original sequence
+    model.transitions = pyo.Set(initialize=sorted(set(zip(assignment[:-1].tolist(), assignment[1:].tolist()))), dimen=2)
+    def electrolyser_transition (model, c, c_next):
+        return pyo.inequality(-10, model.EElectrolyser_h[starts[c_next]] - model.EElectrolyser_h[ends[c]], 10)
+    model.celectrolyser_transition = pyo.Constraint(model.transitions, rule=electrolyser_transition)
+    def SoC_start (model, c):
+        t = starts[c]
+        return model.SoC_h[t] == (model.EUsed_Battery_h[t]*model.charge_rate) - ((model.EBattery_Grid_h[t]+model.EBattery_Electrolyser_h[t]+model.PIPEEBattery_Compressor_h[t]+model.STOEBattery_Compressor_h[t])/model.discharge_rate)
+    def h2Storage_start (model, c):
+        t = starts[c]
+        return model.h2Storage[t] == model.H2_EL_STO_h[t] - model.H2_STO_PIPE_h[t]
+    model.cSoC_start = pyo.Constraint(model.C, rule=SoC_start)
+    model.ch2Storage_start = pyo.Constraint(model.C, rule=h2Storage_start)
+    
+    #Max and min intra-day level of every representative day
+    model.SoC_max = pyo.Var(model.C, within=pyo.Reals)
+    model.SoC_min = pyo.Var(model.C, within=pyo.Reals)
+    model.h2_max = pyo.Var(model.C, within=pyo.Reals)
+    model.h2_min = pyo.Var(model.C, within=pyo.Reals)
+    model.cSoC_max = pyo.Constraint(model.CT, rule=lambda model, c, t: model.SoC_h[t] <= model.SoC_max[c])
+    model.cSoC_min = pyo.Constraint(model.CT, rule=lambda model, c, t: model.SoC_h[t] >= model.SoC_min[c])
+    model.ch2_max = pyo.Constraint(model.CT, rule=lambda model, c, t: model.h2Storage[t] <= model.h2_max[c])
+    model.ch2_min = pyo.Constraint(model.CT, rule=lambda model, c, t: model.h2Storage[t] >= model.h2_min[c])
+    
+    #Level at the start of every original day (and at the end of the last one), starting empty as in the full model
+    model.SoC_day = pyo.Var(pyo.RangeSet(0, len(assignment)), within=pyo.NonNegativeReals)
+    model.h2_day = pyo.Var(pyo.RangeSet(0, len(assignment)), within=pyo.NonNegativeReals)
+    model.SoC_day[0].fix(0)
+    model.h2_day[0].fix(0)
+    def SoC_link (model, d):
+        return model.SoC_day[d+1] == model.SoC_day[d]*self_discharge**P + model.SoC_h[ends[assignment[d]]]
+    def h2Storage_link (model, d):
+        return model.h2_day[d+1] == model.h2_day[d] + model.h2Storage[ends[assignment[d]]]
+    def SoC_upper (model, d):
+        return model.SoC_day[d] + model.SoC_max[assignment[d]] <= model.x3*0.90
+    def SoC_lower (model, d):
+        return model.SoC_day[d] + model.SoC_min[assignment[d]] >= model.x3*0.10
+    def h2Storage_upper (model, d):
+        return model.h2_day[d] + model.h2_max[assignment[d]] <= model.x6
+    def h2Storage_lower (model, d):
+        return model.h2_day[d] + model.h2_min[assignment[d]] >= 0
+    model.cSoC_link = pyo.Constraint(model.D, rule=SoC_link)
+    model.ch2Storage_link = pyo.Constraint(model.D, rule=h2Storage_link)
+    model.cSoC_upper = pyo.Constraint(model.D, rule=SoC_upper)
+    model.cSoC_lower = pyo.Constraint(model.D, rule=SoC_lower)
+    model.ch2Storage_upper = pyo.Constraint(model.D, rule=h2Storage_upper)
+    model.ch2Storage_lower = pyo.Constraint(model.D, rule=h2Storage_lower)
+    return model
+
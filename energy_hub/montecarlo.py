@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Monte-Carlo driver with an on-disk results store and checkpoint/resume.
+
+Sample i is drawn with its own random generator (seed, i), so the draws do not depend on the order in which the
+samples are solved, and a resumed run draws exactly the same values. The samples are solved in a local process pool
+(forked workers: evaluate can be a closure, e.g. uncertainty.MonteCarloEvaluator, and it can keep its models between
+samples). Every finished sample is committed to a SQLite table (inputs and results, one row per sample) as soon as it
+arrives: after a crash or restart, run_montecarlo with the same store only solves the samples that are not in it.
+"""
+import os
+import json
+import time
+import sqlite3
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+
+_state = {}                                                     #sample_fn, evaluate and seed of the worker process
+
+
+def draw(rng, spec):
+    """
+    One value of the distribution spec = ('triangular', low, mode, high), ('uniform', low, high), ('normal', mean, sd),
+    ('choice', [values]) or a constant.
+    """
+    if not isinstance(spec, tuple):
+        return spec
+    kind = spec[0]
+    if kind == 'triangular':
+        return float(rng.triangular(*spec[1:]))
+    if kind == 'uniform':
+        return float(rng.uniform(*spec[1:]))
+    if kind == 'normal':
+        return float(rng.normal(*spec[1:]))
+    if kind == 'choice':
+        return spec[1][int(rng.integers(len(spec[1])))]
+    raise ValueError('Unknown distribution %r' %(kind,))
+
+
+def sample_inputs(distributions, seed, i):
+    "Inputs of sample i: one draw of every distribution, with the generator of (seed, i)"
+    rng = np.random.default_rng([seed, i])
+    return {name: draw(rng, spec) for name, spec in distributions.items()}
+
+
+def _init_worker(distributions, evaluate, seed):
+    _state.update(distributions=distributions, evaluate=evaluate, seed=seed)
+
+
+def _run_sample(i):
+    inputs = sample_inputs(_state['distributions'], _state['seed'], i)
+    start = time.perf_counter()
+    try:
+        results = _state['evaluate'](inputs)
+        error = None
+    except Exception as err:                                    # stored as failed, retried when the run is resumed
+        results = {}
+        error = repr(err)
+    return i, os.getpid(), time.perf_counter() - start, inputs, results, error
+
+
+def _connect(store):
+    os.makedirs(os.path.dirname(os.path.abspath(store)), exist_ok=True)
+    con = sqlite3.connect(store)
+    con.execute('PRAGMA journal_mode=WAL')                     #a row is on disk once committed, readers do not block the run
+    con.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+    con.execute('CREATE TABLE IF NOT EXISTS samples (sample INTEGER PRIMARY KEY, worker INTEGER, solve_time_s REAL, inputs TEXT, results TEXT)')
+    con.execute('CREATE TABLE IF NOT EXISTS failed (sample INTEGER PRIMARY KEY, error TEXT)')
+    return con
+
+
+def run_montecarlo(distributions, evaluate, n_samples, store, seed=0, workers=None):
+    """
+    Solves samples 0..n_samples-1 not yet in store (SQLite file).
+    distributions = {input name: spec} (see draw), evaluate(inputs) -> {result name: value}.
+    A store can only be resumed with the same seed and distributions. Returns load_results(store).
+    """
+    con = _connect(store)
+    config = json.dumps({'seed': seed, 'distributions': distributions}, sort_keys=True, default=str)
+    stored = con.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+    if stored is None:
+        con.execute("INSERT INTO meta VALUES ('config', ?)", (config,))
+        con.commit()
+    elif stored[0] != config:
+        raise ValueError('%s was created with another seed or other distributions, use a new store' %store)
+    done = {row[0] for row in con.execute('SELECT sample FROM samples')}
+    todo = [i for i in range(n_samples) if i not in done]
+    print('\n Monte-Carlo: %i samples, %i already in %s, %i to solve' %(n_samples, len(done & set(range(n_samples))), store, len(todo)))
+
+    def save(row):
+        i, worker, solve_time, inputs, results, error = row
+        if error is None:
+            con.execute('INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?)', (i, worker, solve_time, json.dumps(inputs), json.dumps(results)))
+            con.execute('DELETE FROM failed WHERE sample = ?', (i,))
+        else:
+            con.execute('INSERT OR REPLACE INTO failed VALUES (?, ?)', (i, error))
+            print('\n Monte-Carlo sample %i failed: %s' %(i, error))
+        con.commit()
+
+    try:
+        if todo:
+            if 'fork' in mp.get_all_start_methods():
+                workers = min(workers or os.cpu_count() or 1, len(todo))
+                with mp.get_context('fork').Pool(workers, initializer=_init_worker, initargs=(distributions, evaluate, seed)) as pool:
+                    for row in pool.imap_unordered(_run_sample, todo):
+                        save(row)
+            else:
+                print('\n fork not available, the Monte-Carlo samples are solved in the main process')
+                _init_worker(distributions, evaluate, seed)
+                for i in todo:
+                    save(_run_sample(i))
+    finally:
+        con.close()
+    return load_results(store)
+
+
+def load_results(store):
+    "DataFrame indexed by sample: inputs, results, worker and solve time of every finished sample"
+    con = sqlite3.connect(store)
+    try:
+        rows = con.execute('SELECT sample, worker, solve_time_s, inputs, results FROM samples ORDER BY sample').fetchall()
+    finally:
+        con.close()
+    records = [{'sample': i, 'worker': worker, 'solve_time_s': solve_time, **json.loads(inputs), **json.loads(results)}
+               for i, worker, solve_time, inputs, results in rows]
+    return pd.DataFrame(records, columns=None if records else ['sample']).set_index('sample')
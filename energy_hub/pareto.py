@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Pareto front of the NPV against a second metric (curtailment, LCOH proxy, electrolyser capacity) by epsilon-constraint.
+
+The NPV stays the objective, the second metric gets a constraint with a mutable Param as limit (model.epsilon):
+    metric <= epsilon (metric minimised, e.g. curtailment) or metric >= epsilon (maximised, e.g. x4)
+A ratio metric numerator/denominator (LCOH proxy = H2 costs / discounted H2 production) is limited by the linear row
+numerator - epsilon*denominator <= 0. The ends of the front are two anchor solves: the NPV optimum (the metric it gives)
+and the best metric with the NPV at least npv_floor (Dinkelbach iterations for a ratio, a few solves). The points
+between them are a parameter sweep of epsilon (sweep.py): contiguous chunks solved in parallel worker processes, every
+point warm started from the solution of its neighbour, rows written to the table as they finish and stored in the
+result cache. The cost of a 20-point front is the two anchors plus 20 warm-started solves spread over the cores.
+
+    df_front = pareto_front(inputs, 'curtailment', n_points=20, out_file='output/pareto_curtailment.csv')
+"""
+import os
+import numpy as np
+import pyomo.environ as pyo
+from .inputs import INPUT_NAMES
+from .model import CreateModel
+from .solvers import make_solver
+from .sweep import run_sweep, DESIGN_VARIABLES
+
+
+def h2_costs (model):
+    #CAPEX + NPC of the OPEX of the hydrogen chain (electrolyser and stack replacements, compressors, H2 storage, pipe), without the electricity
+    return (model.x4*(model.CAPEX_electrolyser + model.OPEX_electrolyser) + (model.x5+model.x5b)*(model.CAPEX_compressor + model.OPEX_compressor)
+            + model.x6*(model.CAPEX_h2_storage + model.OPEX_h2_storage) + model.H2_Pipe + model.CAPEX_pipe)
+
+#name -> sense of the metric, numerator (and denominator of a ratio) as expressions of a CreateModel, label of the table column
+METRICS = {
+    'curtailment': dict(sense='min', label='Curtailed electricity [kWh]', numerator=lambda model: sum(model.ECurtailed_h[t] for t in model.T)),
+    'lcoh': dict(sense='min', label='LCOH proxy [EUR/kg]', numerator=h2_costs, denominator=lambda model: model.annuity_factor*sum(model.H2_flow_h[t] for t in model.T)),
+    'x4': dict(sense='max', label='Electrolyser capacity [kW]', numerator=lambda model: model.x4),
+}
+
+
+def AddEpsilonConstraint (model, metric):
+    #metric (METRICS) as model.metric_numerator/model.metric_denominator, limited by the mutable Param model.epsilon (row model.cepsilon)
+    spec = METRICS[metric]
+    model.metric_numerator = pyo.Expression(expr=spec['numerator'](model))
+    model.metric_denominator = pyo.Expression(expr=spec['denominator'](model) if 'denominator' in spec else 1)
+    model.epsilon = pyo.Param(initialize=0, mutable=True)
+    if spec['sense'] == 'min':
+        model.cepsilon = pyo.Constraint(expr=model.metric_numerator - model.epsilon*model.metric_denominator <= 0)
+    else:
+        model.cepsilon = pyo.Constraint(expr=model.metric_numerator - model.epsilon*model.metric_denominator >= 0)
+    return model
+
+def ParetoModel (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, metric, compact=False):
+    #model factory of the sweep: CreateModel + the epsilon constraint of metric (metric and compact are part of the result cache key)
+    model = CreateModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, compact=compact)
+    return AddEpsilonConstraint(model, metric)
+
+
+def metric_value(model):
+    "Value of the metric of a solved ParetoModel, inf (nan for 0/0) when a ratio has no denominator (e.g. LCOH without H2)"
+    numerator, denominator = pyo.value(model.metric_numerator), pyo.value(model.metric_denominator)
+    if abs(denominator) < 1e-6:
+        return float(np.copysign(np.inf, numerator)) if abs(numerator) >= 1e-6 else float('nan')
+    return numerator/denominator
+
+
+def anchors(inputs, metric, solver=None, profile='default', npv_floor=0, compact=False, max_iterations=10, rtol=1e-4):
+    """
+    Ends of the front: (metric at the NPV optimum, best metric with NPV >= npv_floor, design of the NPV optimum).
+    The best ratio is found by Dinkelbach iterations: optimise numerator - ratio*denominator, ratio = value of the last solution,
+    starting from the NPV optimum or, when the NPV optimum gives no denominator (inf, no H2), from the most H2 with NPV >= npv_floor.
+    ValueError when no solution with NPV >= npv_floor has a denominator (the ratio is undefined on the whole front).
+    """
+    args = [inputs[name] for name in INPUT_NAMES]
+    model = ParetoModel(*args, metric, compact)
+    model.cepsilon.deactivate()
+    make_solver(solver, profile).solve(model)
+    npv_optimum = metric_value(model)
+    design = {name: pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES}
+
+    sense = METRICS[metric]['sense']
+    ratio = 'denominator' in METRICS[metric]
+    model.cnpv_floor = pyo.Constraint(expr=model.ObjFunction.expr >= npv_floor)
+    model.ObjFunction.deactivate()
+    opt = make_solver(solver, profile)
+    start = npv_optimum if ratio else 0
+    if ratio and not np.isfinite(npv_optimum):
+        model.denominator_objective = pyo.Objective(expr=model.metric_denominator, sense=pyo.maximize)
+        opt.solve(model)
+        if not opt.optimal():
+            raise RuntimeError('Largest denominator of %s with NPV >= %g: %s' %(metric, npv_floor, opt.stats['termination']))
+        start = metric_value(model)
+        if not np.isfinite(start):
+            raise ValueError('Front of %s undefined: no solution with NPV >= %g has a denominator (no H2 produced)' %(metric, npv_floor))
+        model.denominator_objective.deactivate()
+    model.ratio = pyo.Param(initialize=start, mutable=True)
+    model.metric_objective = pyo.Objective(expr=model.metric_numerator - model.ratio*model.metric_denominator, sense=pyo.minimize if sense == 'min' else pyo.maximize)
+    best = start
+    for iteration in range(max_iterations):
+        opt.solve(model)
+        if not opt.optimal():
+            raise RuntimeError('Best %s with NPV >= %g: %s, give the range of the front (bounds)' %(metric, npv_floor, opt.stats['termination']))
+        if ratio and not np.isfinite(metric_value(model)):
+            break                                               #optimum without denominator: no solution better than ratio
+        best = metric_value(model)
+        if not ratio or abs(pyo.value(model.metric_objective)) <= rtol*abs(pyo.value(model.ratio)*pyo.value(model.metric_denominator)):
+            break
+        model.ratio.set_value(best)
+    return npv_optimum, best, design
+
+
+def pareto_front(inputs, metric, n_points=20, bounds=None, solver=None, profile='default', npv_floor=0, compact=False, workers=None, out_file=None, cache_dir=None):
+    """
+    Pareto front of NPV vs metric (METRICS) in n_points epsilon-constraint solves between bounds = (from, to) of the metric
+    (one point when the anchors are equal, e.g. no curtailment at the NPV optimum),
+    default the anchors (NPV optimum, best metric with NPV >= npv_floor). Returns a DataFrame indexed by epsilon with the NPV,
+    the metric and the design of every point, and pareto_optimal = False for the points dominated by another point
+    (a MIP gap can leave some). Written to out_file (csv) when given.
+    """
+    start_values = None
+    if bounds is None:
+        npv_optimum, best, start_values = anchors(inputs, metric, solver, profile, npv_floor, compact)
+        bounds = (npv_optimum, best)
+        if not np.isfinite(npv_optimum):
+            raise ValueError('Front of %s undefined at the NPV optimum (no H2 produced), give the range of the front (bounds), best with NPV >= %4.2f: %4.4g' %(metric, npv_floor, best))
+        print('\n Pareto front %s: from %4.4g (NPV optimum) to %4.4g (best with NPV >= %4.2f)' %(metric, npv_optimum, best, npv_floor))
+    label = METRICS[metric]['label']
+
+    def front_results(model):
+        return {'NPV': pyo.value(model.ObjFunction), label: metric_value(model)}
+
+    df_front = run_sweep(ParetoModel, tuple(inputs[name] for name in INPUT_NAMES) + (metric, compact), 'epsilon', list(np.unique(np.linspace(bounds[0], bounds[1], n_points))),
+                         result_fn=front_results, solver=solver, profile=profile, workers=workers, out_file=out_file, start_values=start_values, cache_dir=cache_dir)
+    npv = df_front['NPV'].to_numpy()
+    value = df_front[label].to_numpy()*(1 if METRICS[metric]['sense'] == 'max' else -1)      #higher is better for both
+    df_front['pareto_optimal'] = [not np.isnan(npv[i]) and not np.any((npv >= npv[i]) & (value >= value[i]) & ((npv > npv[i]) | (value > value[i])))
+                                  for i in range(len(df_front))]           #NaN = point not solved to optimality
+    if out_file is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(out_file)), exist_ok=True)
+        df_front.to_csv(out_file)
+    return df_front
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent solver mode (Pyomo APPSI interface).
+
+With SolverFactory('gurobi') every solve writes the whole model to an LP file and the solver reads it again.
+A persistent solver keeps the model in memory: after the first solve, changing a mutable Param
+(H2_price, PV_CAPEX, W_CAPEX, CAPEX_Storage, CAPEX_electrolyser, electrolyser_efficiency...) only updates
+the coefficients that depend on it, and Gurobi re-optimises from the previous solution.
+Gurobi is used when installed and licensed, HiGHS (highspy) is the local fallback.
+"""
+from pyomo.contrib import appsi
+
+PERSISTENT_SOLVERS = {'gurobi': appsi.solvers.Gurobi, 'highs': appsi.solvers.Highs}
+
+
+def make_persistent_solver(preferred=('gurobi', 'highs'), options=None, tee=False, params_only=True):
+    """
+    Returns the first available persistent solver of preferred.
+    options = solver options (e.g. {'Threads': 4}), passed as gurobi_options or highs_options.
+    params_only = True: only the mutable Params are checked for changes between solves (new constraints,
+    variables or bound changes are not), which is what the what-if and sensitivity runs need.
+    """
+    for name in preferred:
+        opt = PERSISTENT_SOLVERS[name]()
+        if not opt.available():
+            continue
+        opt.config.stream_solver = tee
+        solver_options = opt.gurobi_options if name == 'gurobi' else opt.highs_options
+        solver_options.update(options or {})
+        if params_only:
+            for key in ['check_for_new_or_removed_constraints', 'check_for_new_or_removed_vars', 'check_for_new_or_removed_params',
+                        'check_for_new_objective', 'update_constraints', 'update_vars', 'update_named_expressions', 'update_objective']:
+                setattr(opt.update_config, key, False)
+        return opt
+    raise RuntimeError('No persistent solver available, install gurobipy (with licence) or highspy')
+
+
+def resolve(opt, model, **params):
+    "What-if solve: sets the mutable Params by name (resolve(opt, model, H2_price=6)) and solves again"
+    for name, value in params.items():
+        getattr(model, name).set_value(value)
+    return opt.solve(model)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Entry points of one run: load_inputs (inputs.py) -> build_model -> solve -> postprocess.
+
+    inputs = load_inputs()
+    model = build_model(inputs)
+    solve_stats = solve(model, inputs, solver='highs', profile='fast')
+    results = postprocess(model, inputs)
+
+Nothing here plots or parses the command line (plots.py, cli.py), so the functions can be used from worker
+processes and services. solve looks the solution up in the result cache (result_cache.py) when cache_dir is given.
+"""
+import pyomo.environ as pyo
+from .model import CreateModel, is_compact
+from .solvers import make_solver, profile_settings, solver_name
+from .rounding import solve_lp_rounding
+from .results import extract_timeseries, solution_arrays, load_solution
+from .result_cache import cache_key, model_params, load_result, save_result, DEFAULT_MAX_BYTES
+from .sweep import DESIGN_VARIABLES
+from .finance import np_calculator, costs_production_flow, cost_flow, levelised_cost, irr
+from .inputs import INPUT_NAMES
+from .profiling import phase
+
+
+def build_model(inputs, hour_weights=None, compact=False, mutable_profiles=False):
+    """
+    CreateModel of inputs ({name: DataFrame}, see load_inputs), compact: alias flows as expressions, mutable_profiles: hourly
+    profiles as mutable Params (model.AddOperation)
+    """
+    with phase('build_model', hours=len(inputs['df_EPV_h']), compact=compact):
+        return CreateModel(**inputs, hour_weights=hour_weights, compact=compact, mutable_profiles=mutable_profiles)
+
+
+def result_key(model, inputs, profile='default', rounding_gap=None, solver=None):
+    "Key of the solution of model in the result cache: input data, mutable Params, solver (solver_name), profile (and LP rounding gap)"
+    method = () if rounding_gap is None else ({'lp_rounding': rounding_gap},)
+    return cache_key(*[inputs[name] for name in INPUT_NAMES], 'CreateCompactModel' if is_compact(model) else 'CreateModel', model_params(model), solver_name(solver),
+                     profile_settings(profile), *method)
+
+
+def solve(model, inputs, solver=None, profile='default', tee=False, cache_dir=None, rounding_gap=None):
+    """
+    Solves model with make_solver(solver, profile), or loads the solution from the result cache in cache_dir
+    (same input data, mutable Params, solver and profile). rounding_gap: fast path of rounding.py instead of the MILP
+    (LP relaxation, floor/ceil of x2, MILP only above this relative gap). Returns the solve statistics
+    (solvers.Solver.stats) with cached = True/False.
+    """
+    with phase('result_cache_lookup') as record:
+        key = result_key(model, inputs, profile, rounding_gap, solver) if cache_dir else None
+        cached = load_result(cache_dir, key) if cache_dir else None
+        record['hit'] = cached is not None
+    if cached is not None:
+        load_solution(model, cached[0])
+        solve_stats = {**cached[1]['solve_stats'], 'cached': True}
+        print('\n Solution loaded from the result cache (key %s), solved by %s in %4.2f s' %(key[:12], solve_stats['solver'], solve_stats['wall_time_s']))
+        return solve_stats
+    if rounding_gap is not None:
+        stats = solve_lp_rounding(model, solver, profile, rounding_gap, tee=tee)
+        print('\n LP rounding: %s, LP bound %4.2f, x2 %4.2f -> %s, gap = %s, %4.2f s (LP %4.2f s, rounding %4.2f s)' %(stats['method'], stats['lp_bound'], stats['relaxed_x2'],
+              stats['rounded'], stats['gap'], stats['wall_time_s'], stats['lp_time_s'], stats['rounding_time_s']))
+        return {**stats, 'cached': False}
+    opt = make_solver(solver, profile, tee=tee)                                #'persistent': model kept in the solver memory, re-solve with resolve(opt.opt, model, H2_price=...)
+    opt.solve(model)
+    print('\n Solver: %s, profile %s %s, termination condition: %s, %4.2f s, gap = %s' %(opt.stats['solver'], opt.stats['profile'], opt.stats['settings'], opt.stats['termination'],
+                                                                                       opt.stats['wall_time_s'], opt.stats['gap']))
+    return {**opt.stats, 'cached': False}
+
+
+def cache_results(cache_dir, model, inputs, results, solve_stats, profile='default', max_bytes=DEFAULT_MAX_BYTES, rounding_gap=None, solver=None):
+    "Stores the solution of model with its KPIs (postprocess) and solve statistics in the result cache"
+    kpis = {name: results[name] for name in ['NPV', 'IRR', 'LCOE', 'LCOH']}
+    save_result(cache_dir, result_key(model, inputs, profile, rounding_gap, solver), solution_arrays(model),
+                {**kpis, **{name: pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES}, 'solve_stats': {key: val for key, val in solve_stats.items() if key != 'cached'}},
+                max_bytes=max_bytes)
+
+
+def postprocess(model, inputs):
+    """
+    KPIs of a solved model: installed capacities, CAPEX and OPEX per asset, curtailment, LCOE [EUR/MWh], LCOH [EUR/kg],
+    net cash flow, NPV and IRR. Returns a dict, with the hourly solution in 'df_results' (results.extract_timeseries).
+    """
+    df_general, df_economic, df_solar, df_wind, df_Hydrogen = [inputs[name] for name in ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_Hydrogen']]
+    lifetime = int(df_general.loc['system_lifetime','Input'])
+    r = df_general.loc['discount_rate','Input']
+    x1, x2, x3, x4, x5, x5b, x6 = [pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES]
+
+    installed_power_PV = x1*df_solar.loc['FPV_kWpm2','Input']
+    res = {'installed_power_PV': installed_power_PV,
+           'area_PV': (installed_power_PV*df_solar.loc['area_FPV','Input'])/1000000,
+           'turbines': x2,
+           'area_wind': x2*df_wind.loc['required_area_turbine','Input'],
+           'installed_power_wind': x2*df_wind.loc['P_turbine','Input'],
+           'battery_capacity': x3, 'electrolyser_capacity': x4, 'compressor_capacity': x5 + x5b, 'h2_storage_capacity': x6}
+    res['total_area'] = res['area_PV'] + res['area_wind']
+
+    res['PV_CAPEX'] = installed_power_PV*pyo.value(model.PV_CAPEX)
+    res['PV_OPEX'] = installed_power_PV*df_economic.loc['OPEX_solar_total','Input']
+    res['OffshoreWind_CAPEX'] = x2*pyo.value(model.W_CAPEX)
+    res['OffshoreWind_OPEX'] = x2*df_economic.loc['OPEX_wind','Input']
+    res['Storage_CAPEX'] = x3*pyo.value(model.CAPEX_Storage)
+    res['Storage_OPEX'] = x3*df_economic.loc['OPEX_battery','Input']
+    res['Electrolyser_CAPEX'] = x4*pyo.value(model.CAPEX_electrolyser)
+    res['Electrolyser_OPEX'] = x4*df_economic.loc['OPEX_Electrolysis','Input']
+    res['Compressor_CAPEX'] = (x5 + x5b)*pyo.value(model.CAPEX_compressor)
+    res['Compressor_OPEX'] = (x5 + x5b)*df_economic.loc['OPEX_compressor','Input']
+    res['H2_Storage_CAPEX'] = x6*df_economic.loc['CAPEX_H2_storage','Input']
+    res['H2_Storage_OPEX'] = x6*df_economic.loc['OPEX_H2_storage','Input']
+
+    #Solution time series: every hourly variable in one DataFrame (results.py), index = hour, the postprocessing uses its columns as numpy arrays
+    with phase('extract_timeseries'):
+        df_results = extract_timeseries(model)
+    electricity_price_h = inputs['df_electricity_prices']['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float)
+    AEP_h = df_results['EW_h'].to_numpy() + df_results['EPV_h'].to_numpy()   #Total Electricity Produced
+    E_H2_Total = df_results['E_H2_Total_h'].to_numpy()                       #total electricity used for H2 to be accounted in OPEX!
+
+    # Totals coud be find using also: Variable = df_results['EPV_h'].sum() + df_results['EW_h'].sum()
+    #% Curtailed
+    res['curtailed_percentage'] = df_results['ECurtailed_h'].sum()/AEP_h.sum()*100
+
+    #LCOE
+    AEused = df_results['EUsed_h'].sum()                                     #yearly production!
+    LCOE_OPEX = res['PV_OPEX'] + res['OffshoreWind_OPEX'] + res['Storage_OPEX'] #+ Electrolyser_OPEX + Compressor_OPEX
+    LCOE_CAPEX = res['PV_CAPEX'] + res['OffshoreWind_CAPEX'] + res['Storage_CAPEX'] #+ Electrolyser_CAPEX + Compressor_CAPEX
+    res['LCOE'] = levelised_cost(LCOE_CAPEX, LCOE_OPEX, AEused/1000, lifetime, r) #EUR/MWh
+
+    #LCOH
+    AH2P = df_results['H2_flow_h'].sum() #kg, yearly production!
+    LCOH_OPEX = res['Electrolyser_OPEX'] + res['Compressor_OPEX'] + res['H2_Storage_OPEX'] + df_Hydrogen.loc['OPEX_pipe','Input'] + (E_H2_Total.sum()*(res['LCOE']/1000))
+    LCOH_CAPEX = res['Electrolyser_CAPEX'] + res['Compressor_CAPEX'] + res['H2_Storage_CAPEX'] + df_Hydrogen.loc['CAPEX_pipe','Input']
+    #Investment costs of the stack over the lifetime as replacements
+    stack = (df_Hydrogen.loc['lifetime_stack','Input'], df_Hydrogen.loc['CAPEX_stack','Input']*x4)
+    res['LCOH'] = levelised_cost(LCOH_CAPEX, LCOH_OPEX, AH2P, lifetime, r, *stack)
+
+    #Cashflows
+    total_revenue_year = df_results['H2_Export_h'].sum()*pyo.value(model.H2_price) + df_results['Electricity_export'].to_numpy() @ electricity_price_h
+    revenue_flow = costs_production_flow(total_revenue_year, lifetime)
+    total_opex_year = LCOE_OPEX + LCOH_OPEX - (E_H2_Total.sum()*(res['LCOE']/1000))
+    total_costs_flow = cost_flow(LCOE_CAPEX + LCOH_CAPEX, total_opex_year, lifetime, *stack)
+
+    res['net_cashflow'] = revenue_flow - total_costs_flow
+    res['IRR'] = irr(res['net_cashflow'])
+    res['NPV'] = np_calculator(res['net_cashflow'], r)
+    res['objective'] = pyo.value(model.ObjFunction)
+    res['df_results'] = df_results
+    return res
+
+
+def print_results(res):
+    print('\n ---------------------------------------------------')
+    print('\n Decision Variables: ')
+    print('\n Total area FPV = %4.2f [km2]' %(res['area_PV']))
+    print('\n Total number of turbines = ', res['turbines'])
+    print('\n Total area wind farm = %4.2f [km2]' %(res['area_wind']))
+    print('\n Total Baterry capacity [kWh] = ', res['battery_capacity'])
+    print('\n Electrolyser Capacity [kW] = ', res['electrolyser_capacity'])
+    print('\n Compressor Capacity [kW]= ', res['compressor_capacity'])
+    print('\n H2 Storage Capacity - Salt Caverns [kg]= ', res['h2_storage_capacity'])
+
+    print('\n ---------------------------------------------------')
+    print('\n Results: ')
+    print("\n Total Area System = %4.2f [km2]" %(res['total_area']))
+    print("\n PV Installed Capacity = %4.2f [kWp]" %(res['installed_power_PV']))
+    print("\n PV CAPEX = %4.2f [EUR]" %(res['PV_CAPEX']))
+    print("\n PV OPEX = %4.2f [EUR/year]" %(res['PV_OPEX']))
+    print("\n Offshore Wind Installed Capacity = %4.2f [kW]" %(res['installed_power_wind']))
+    print("\n Offshore Wind CAPEX = %4.2f [EUR]" %(res['OffshoreWind_CAPEX']))
+    print("\n Offshore Wind OPEX = %4.2f [EUR/year]" %(res['OffshoreWind_OPEX']))
+    print("\n Storage CAPEX = %4.2f [EUR]" %(res['Storage_CAPEX']))
+    print("\n Storage OPEX = %4.2f [EUR/year]" %(res['Storage_OPEX']))
+    print("\n Electrolyzer CAPEX = %4.2f [EUR]" %(res['Electrolyser_CAPEX']))
+    print("\n Electrolyzer OPEX = %4.2f [EUR/year]" %(res['Electrolyser_OPEX']))
+    print("\n Compressor CAPEX = %4.2f [EUR]" %(res['Compressor_CAPEX']))
+    print("\n Compressor OPEX = %4.2f [EUR/year]" %(res['Compressor_OPEX']))
+    print("\n H2 Storage CAPEX = %4.2f [EUR]" %(res['H2_Storage_CAPEX']))
+    print("\n H2 Storage OPEX = %4.2f [EUR/year]" %(res['H2_Storage_OPEX']))
+    print('\n Percentage Curtailed = %4.2f' %(res['curtailed_percentage']),'%')
+    print('\n LCoE = %4.2f EUR/MWh' %(res['LCOE']))
+    print('\n LCoH = %4.2f EUR/kg' %(res['LCOH']))
+    print('\n NPV = %4.2f' %(res['NPV']))
+    print('\n IRR = %4.2f' %(res['IRR']))
+    print('\n NPV Check (Objective Function = %4.2f' %(res['objective']))
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Figures of a solved run (hourly flows, storage levels, H2 production) and of the sensitivity sweep.
+
+Every figure is described once in FIGURES (series drawn as lines or as filled bands between two series) and drawn
+by draw_figure on any matplotlib Axes: plot_results shows them in pyplot windows (Spyder/IPython, --show-plots),
+report.py renders them off-screen to files. matplotlib is imported when a plot is made, not when the package is
+imported: runs without plots (workers, batch runs, --no-plots) never load it.
+"""
+from pandas.api.types import is_numeric_dtype
+
+FONT_SIZE = 20
+FIGSIZE = (12, 6)
+ZOOM = (3500, 4000)                                             #Time frame analysed in the second set of figures
+
+#name, title, ylabel, window (hours, None = all), lines [(series, style, {kwargs})], fills [(upper, lower or None, {kwargs})],
+#optional: x (series of the x axis, default 'hour'), xlabel, figsize, font_size (None = matplotlib default), legend, xticks (a tick at every x)
+_PRODUCTION = dict(title="Total Production EWind & EPV", lines=[('EPV', '-', dict(label='PV', color='#f1c232')), ('EW', '-', dict(label='Wind', color='#2f3c68'))])
+_PRODUCED = dict(title="Produced Electricity Distribution", ylabel="Energy [kWh]", lines=[('AEP_h', 'k', dict(label='_nolegend_'))],
+                 fills=[('EUsed_Grid_h', None, dict(color='#012d7f', label='Export Cable')),
+                        ('EUsed_Grid_H2', 'EUsed_Grid_h', dict(color='#38761d', label='Hydrogen Production')),
+                        ('E_used', 'EUsed_Grid_H2', dict(color='gold', label='Battery')),
+                        ('AEP_h', 'E_used', dict(color='red', label='Curtailed'))])
+_USED = dict(title="Used Electricity Distribution", ylabel="Energy [kWh]", lines=[('E_Total_Consumed', 'k', dict(label='Total Electricity Used'))],
+             fills=[('EUsed_Grid_h', None, dict(color='#012d7f', alpha=0.2, label='Export Cable')),
+                    ('AE_Export', 'EUsed_Grid_h', dict(color='#012d7f', label='From Battery to Cable')),
+                    ('E_Export_H2', 'EUsed_Grid_h', dict(color='#38761d', alpha=0.2, label='Consumed Hydrogen')),
+                    ('E_Total_Consumed', 'E_Export_H2', dict(color='#38761d', label='From Battery to Hydrogen'))])
+_H2 = dict(title="H2 Production and Exported", ylabel="Hydrogen [kg]", lines=[('H2_flow', '--', dict(color='#38761d', alpha=0.3, label='Total Hydrogen Produced'))],
+           fills=[('H2_EL_PIPE', None, dict(color='#38761d', alpha=0.2, label='from Electrolyser')),
+                  ('H2_Export', 'H2_EL_PIPE', dict(color='#38761d', label='from Storage'))])
+_SOC = dict(title="State of Charge", ylabel="SoC [kWh]", lines=[('SoC', 'r--', dict(label='State of Charge'))])
+_SOC_H2 = dict(title="Hydrogen Storage Level", ylabel="Hydrogen Storage [kg]", lines=[('SoC_H2', 'r--', dict(label='Hydrogen Storage'))])
+
+FIGURES = [
+    dict(_PRODUCTION, name='production', ylabel="Power [kWh]", window=(0, 8759)),
+    dict(_SOC_H2, name='h2_storage', window=(0, 8759)),
+    dict(_PRODUCED, name='electricity_produced', window=(0, 8759)),
+    dict(_USED, name='electricity_used', window=(0, 8759)),
+    dict(_H2, name='h2_production', window=(0, 8759)),
+    dict(_SOC, name='soc', window=(0, 8759)),
+    dict(_PRODUCTION, name='production_zoom', ylabel="Power [1e6, kWh]", window=ZOOM),
+    dict(_PRODUCED, name='electricity_produced_zoom', window=ZOOM),
+    dict(_USED, name='electricity_used_zoom', window=ZOOM),
+    dict(_H2, name='h2_production_zoom', window=ZOOM),
+    dict(_SOC, name='soc_zoom', window=ZOOM),
+    dict(_SOC_H2, name='h2_storage_zoom', window=ZOOM),
+    ]
+
+SENSITIVITY_FIGURES = [
+    dict(name='sensitivity_electrolyser', x='H2_price', xlabel='Hydrogen Price [EUR/kg]', ylabel='Installed Capacity [MW]', figsize=(6.4, 4.8), font_size=None, legend=False, xticks=True,
+         lines=[('Installed Capacity Electrolyser [MW]', '-', {})]),
+    dict(name='sensitivity_FPV_area', x='H2_price', xlabel='Hydrogen Price [EUR/kg]', ylabel='FPV Area [km2]', figsize=(6.4, 4.8), font_size=None, legend=False, xticks=True,
+         lines=[('FPV Area [km2]', '-', {})]),
+    ]
+
+
+def plot_series(df_results):
+    "{series name: array} of the hourly solution (postprocess()['df_results']) used by FIGURES, 'hour' = x axis"
+    EPV = df_results['EPV_h'].to_numpy()                        #Total PV production
+    EW = df_results['EW_h'].to_numpy()                          #Total Wind Production
+    EUsed_Grid_h = df_results['EUsed_Grid_h'].to_numpy()        #Used to Grid Directly
+    EUsed_H2_h = df_results['EUsed_H2_h'].to_numpy()            #Used to H2 Directly
+    AE_Export = df_results['EBattery_Grid_h'].to_numpy() + EUsed_Grid_h
+    E_Export_H2 = EUsed_H2_h + AE_Export                        #(for filling graphs) electricity to grid direct and from battery plus electricity direct to hydrogen production
+    return {'hour': df_results.index.to_numpy(),                # time varialbe for the plots 0 to 8759
+            'EPV': EPV, 'EW': EW,
+            'AEP_h': EW + EPV,                                  #Total Electricity Produced
+            'E_used': df_results['EUsed_h'].to_numpy(),         #Total Electricity Used
+            'EUsed_Grid_h': EUsed_Grid_h,
+            'EUsed_Grid_H2': EUsed_Grid_h + EUsed_H2_h,         #Used Grid and H2 (for filling graphs)
+            'AE_Export': AE_Export,
+            'E_Export_H2': E_Export_H2,
+            'E_Total_Consumed': df_results['E_H2_Total_h'].to_numpy() + AE_Export,     #(for filling graphs) electricity direct to grid and H2 production + electricity from battery to to grid + CMP + EL
+            'H2_flow': df_results['H2_flow_h'].to_numpy(),      #Total h2 production
+            'H2_Export': df_results['H2_Export_h'].to_numpy(),
+            'H2_EL_PIPE': df_results['H2_EL_PIPE_h'].to_numpy(),
+            'SoC': df_results['SoC_h'].to_numpy(),
+            'SoC_H2': df_results['h2Storage'].to_numpy()}
+
+
+def sensitivity_series(df_sensitivity):
+    "{series name: array} of the H2 price sweep (sweep.run_sweep, indexed by price) used by SENSITIVITY_FIGURES"
+    return {'H2_price': df_sensitivity.index.to_numpy(dtype=float), **{column: df_sensitivity[column].to_numpy(dtype=float) for column in df_sensitivity.columns
+                                                                        if is_numeric_dtype(df_sensitivity[column])}}
+
+
+def figure_series(spec):
+    "Names of the series drawn by the figure spec (x axis first)"
+    names = [spec.get('x', 'hour')] + [name for name, style, kwargs in spec.get('lines', [])]
+    names = names + [name for upper, lower, kwargs in spec.get('fills', []) for name in (upper, lower) if name is not None]
+    return list(dict.fromkeys(names))
+
+
+def draw_figure(ax, spec, series):
+    "Draws the figure spec on ax, series = {name: array} already cut to the window of the figure"
+    font_size = spec.get('font_size', FONT_SIZE)
+    x = series[spec.get('x', 'hour')]
+    for name, style, kwargs in spec.get('lines', []):
+        ax.plot(x, series[name], style, **kwargs)
+    for upper, lower, kwargs in spec.get('fills', []):
+        if lower is None:
+            ax.fill_between(x, series[upper], **kwargs)
+        else:
+            ax.fill_between(x, series[upper], series[lower], **kwargs)
+    if 'title' in spec:
+        ax.set_title(spec['title'], fontsize=font_size)
+    ax.set_xlabel(spec.get('xlabel', "Hours [h]"), fontsize=font_size)
+    ax.set_ylabel(spec['ylabel'], fontsize=font_size)
+    if font_size:
+        ax.tick_params(labelsize=font_size)
+    if spec.get('xticks'):
+        ax.set_xticks(x)
+    ax.grid(True)
+    if spec.get('legend', True):
+        ax.legend()
+
+
+def cut_window(spec, series):
+    "series of the figure spec, cut to its window of hours"
+    names = figure_series(spec)
+    window = spec.get('window')
+    if window is None:
+        return {name: series[name] for name in names}
+    return {name: series[name][window[0]:window[1]] for name in names}
+
+
+def plot_results(df_results):
+    "FIGURES of the hourly solution in pyplot windows"
+    import matplotlib.pyplot as plt
+
+    series = plot_series(df_results)
+    for spec in FIGURES:
+        fig, ax = plt.subplots(figsize=spec.get('figsize', FIGSIZE))
+        draw_figure(ax, spec, cut_window(spec, series))
+        plt.show()
+
+
+def plot_sensitivity(df_sensitivity):
+    "SENSITIVITY_FIGURES of the H2 price sweep in pyplot windows"
+    import matplotlib.pyplot as plt
+
+    series = sensitivity_series(df_sensitivity)
+    for spec in SENSITIVITY_FIGURES:
+        fig, ax = plt.subplots(figsize=spec.get('figsize', FIGSIZE))
+        draw_figure(ax, spec, series)
+        plt.show()
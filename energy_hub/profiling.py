@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of a run: wall time, CPU time and memory of every phase, size of the models, optional cProfile.
+
+The pipeline marks its phases with phase(name) (reading the inputs, design constants, building the model, solving,
+postprocessing, report...). Outside of a RunProfile phase() does nothing, so the hooks cost nothing in normal runs
+and in worker processes. Inside `with RunProfile() as run_profile:` every phase is recorded with its wall and CPU time,
+the RSS at its end and the peak RSS of the process (high-water mark: a phase that raises it shows a peak_rss_increase),
+nested phases as 'build_model/design_constants'. run_profile.add_model(name, model) records the number of variables,
+constraints and nonzeros of the model per constraint block (cSoC1, ccompressor2...), run_profile.write(file) the JSON.
+
+    with RunProfile(cprofile=True) as run_profile:
+        inputs = load_inputs()
+        model = build_model(inputs)
+        run_profile.add_model('base', model)
+    run_profile.write('output/run_profile.json')          # + output/run_profile.prof (python -m pstats output/run_profile.prof)
+"""
+import os
+import sys
+import time
+import json
+import platform
+import contextlib
+import pyomo
+import pyomo.environ as pyo
+from pyomo.core.expr.visitor import identify_variables
+
+try:
+    import resource                                             #not on Windows: psutil if installed, else no memory figures
+except ImportError:
+    resource = None
+
+_active = []                                                    #the RunProfile being recorded (at most one)
+_stack = []                                                     #names of the open phases
+
+
+def rss_mb():
+    "(current RSS, peak RSS) of the process [MB], None where not available"
+    current = peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/(1024*1024 if sys.platform == 'darwin' else 1024)     #bytes on macOS, kB on Linux
+        try:
+            with open('/proc/self/statm') as f:
+                current = int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')/1024**2
+        except (OSError, ValueError):
+            pass
+    else:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            current, peak = info.rss/1024**2, getattr(info, 'peak_wset', info.rss)/1024**2
+        except ImportError:
+            pass
+    return current, peak
+
+
+@contextlib.contextmanager
+def phase(name, **info):
+    """
+    Marks a phase of the run: with phase('solve') as record: ... record['key'] = value adds to the record of the phase.
+    Does nothing (record is a throwaway dict) when no RunProfile is active.
+    """
+    if not _active:
+        yield dict(info)
+        return
+    _stack.append(name)
+    record = {'phase': '/'.join(_stack), **info}
+    peak_before = rss_mb()[1]
+    start, cpu_start = time.perf_counter(), time.process_time()
+    record['start_s'] = start - _active[0].start                #from the start of the run
+    try:
+        yield record
+    finally:
+        record['wall_time_s'] = time.perf_counter() - start
+        record['cpu_time_s'] = time.process_time() - cpu_start
+        record['rss_mb'], record['peak_rss_mb'] = rss_mb()
+        record['peak_rss_increase_mb'] = record['peak_rss_mb'] - peak_before if peak_before is not None else None
+        _stack.pop()
+        if _active:
+            _active[0].phases.append(record)
+
+
+def model_size(model):
+    """
+    Size of a Pyomo model: variables (binary, integer), constraints and nonzeros in total and per constraint block.
+    Blocks are the Constraint components by name, summed over the blocks of the model (year[1].cSoC1, year[2].cSoC1 -> cSoC1).
+    Nonzeros = free variables in the constraint, fixed variables are constants. Takes a few seconds on 8760 hours.
+    """
+    variables = {}
+    for var in model.component_data_objects(pyo.Var, descend_into=True):
+        if not var.fixed:
+            counts = variables.setdefault(var.parent_component().local_name, {'variables': 0, 'binary': 0, 'integer': 0})
+            counts['variables'] += 1
+            counts['binary'] += var.is_binary()
+            counts['integer'] += var.is_integer() and not var.is_binary()
+    blocks = {}
+    for con in model.component_data_objects(pyo.Constraint, active=True, descend_into=True):
+        counts = blocks.setdefault(con.parent_component().local_name, {'constraints': 0, 'nonzeros': 0})
+        counts['constraints'] += 1
+        counts['nonzeros'] += sum(1 for var in identify_variables(con.body, include_fixed=False))
+    objective_nonzeros = sum(sum(1 for var in identify_variables(obj.expr, include_fixed=False))
+                             for obj in model.component_data_objects(pyo.Objective, active=True, descend_into=True))
+    return {'n_variables': sum(counts['variables'] for counts in variables.values()),
+            'n_binary': sum(counts['binary'] for counts in variables.values()),
+            'n_integer': sum(counts['integer'] for counts in variables.values()),
+            'n_constraints': sum(counts['constraints'] for counts in blocks.values()),
+            'n_nonzeros': sum(counts['nonzeros'] for counts in blocks.values()),
+            'objective_nonzeros': objective_nonzeros,
+            'constraint_blocks': blocks, 'variable_blocks': variables}
+
+
+class RunProfile:
+    "Phases and model sizes of a run (see the module docstring), with cprofile=True the run is also profiled by cProfile"
+
+    def __init__(self, cprofile=False, **info):
+        self.info = {'started': time.strftime('%Y-%m-%d %H:%M:%S'), 'argv': sys.argv, 'python': platform.python_version(), 'pyomo': pyomo.__version__,
+                     'platform': platform.platform(), 'cpu_count': os.cpu_count(), **info}
+        self.phases = []
+        self.models = {}
+        self.profiler = None
+        if cprofile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        if _active:
+            raise RuntimeError('A RunProfile is already being recorded')
+        _active.append(self)
+        self.start = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.info['wall_time_s'] = time.perf_counter() - self.start
+        self.info['peak_rss_mb'] = rss_mb()[1]
+        _active.remove(self)
+        return False
+
+    def add_model(self, name, model):
+        "Records the model_size of model as name (not profiled by cProfile)"
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.models[name] = model_size(model)
+        if self.profiler is not None and _active:
+            self.profiler.enable()
+        return self.models[name]
+
+    def to_dict(self):
+        return {'run': self.info, 'phases': self.phases, 'models': self.models}
+
+    def write(self, path):
+        "Writes the JSON to path, and the cProfile statistics to path with .prof instead of .json. Returns the files written"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1, default=str)
+        paths = [path]
+        if self.profiler is not None:
+            paths.append(os.path.splitext(path)[0] + '.prof')
+            self.profiler.dump_stats(paths[-1])
+        return paths
+
+    def summary(self):
+        "Console lines of the phases in the order they started, nested phases indented"
+        lines = []
+        for record in sorted(self.phases, key=lambda record: record['start_s']):
+            depth = record['phase'].count('/')
+            peak = '%8.1f MB' %record['peak_rss_mb'] if record['peak_rss_mb'] is not None else ''
+            lines.append('%-40s %9.3f s %s' %('  '*depth + record['phase'].split('/')[-1], record['wall_time_s'], peak))
+        return lines
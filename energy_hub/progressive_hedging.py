@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Progressive hedging (PH) for the two-stage stochastic design problem.
+
+Every scenario is a full design + dispatch model with its own copy of the design variables. PH solves the scenarios
+separately and drives the copies to one design: with xbar = probability-weighted mean of the scenario designs and
+the multipliers w_s, scenario s maximises
+    ObjFunction_s - w_s*x_s - rho*|x_s - xbar|
+The proximal term is the absolute deviation instead of the square of the original method, so a scenario stays a
+MILP (x2 is integer) that any of the solvers handles. rho and w are prices per unit of the design variable: rho is a
+share of the cost coefficient of the variable, and w_s += rho*(x_s - xbar)/|xbar| every iteration (relative deviation).
+
+The scenario models are built once in worker processes (a group of scenarios per worker) and solved in parallel,
+only the mutable Params w, rho and xbar change between iterations: the memory grows with the scenarios of one worker,
+not with all the scenarios as the extensive form. Where fork is not available they are solved in the main process.
+"""
+import os
+import time
+import multiprocessing as mp
+import pandas as pd
+import pyomo.environ as pyo
+from pyomo.repn import generate_standard_repn
+from .solvers import make_solver, default_threads
+
+
+def _add_ph_terms(sub, names):
+    "PH objective next to ObjFunction (deactivated), with the mutable Params ph_w, ph_rho and ph_xbar"
+    x = {name: sub.find_component(name) for name in names}
+    repn = generate_standard_repn(sub.ObjFunction.expr)
+    coefs = {id(var): coef for var, coef in zip(repn.linear_vars, repn.linear_coefs)}
+    sub.ph_cost = {name: abs(coefs.get(id(x[name]), 0)) or 1 for name in names}     #EUR per unit of every design variable, scales rho
+    sub.ph_N = pyo.Set(initialize=names, ordered=True)
+    sub.ph_w = pyo.Param(sub.ph_N, initialize=0, mutable=True)
+    sub.ph_rho = pyo.Param(sub.ph_N, initialize=0, mutable=True)
+    sub.ph_xbar = pyo.Param(sub.ph_N, initialize=0, mutable=True)
+    sub.ph_dev_up = pyo.Var(sub.ph_N, within=pyo.NonNegativeReals)
+    sub.ph_dev_down = pyo.Var(sub.ph_N, within=pyo.NonNegativeReals)
+    sub.ph_cdev = pyo.Constraint(sub.ph_N, rule=lambda sub, n: x[n] - sub.ph_xbar[n] == sub.ph_dev_up[n] - sub.ph_dev_down[n])
+    sub.ObjFunction.deactivate()
+    sub.ph_objective = pyo.Objective(expr=sub.ObjFunction.expr - sum(sub.ph_w[n]*x[n] + sub.ph_rho[n]*(sub.ph_dev_up[n] + sub.ph_dev_down[n]) for n in names),
+                                     sense=pyo.maximize)
+    return x
+
+
+def _build_scenarios(build_scenario, scenarios, names, solver, profile, settings, solver_options):
+    subs = {s: build_scenario(s) for s in scenarios}
+    xs = {s: _add_ph_terms(sub, names) for s, sub in subs.items()}
+    if solver == 'persistent':                                  #one solver per scenario, each keeps its model in memory
+        opts = {s: make_solver(solver, profile, options=solver_options, **settings) for s in subs}
+    else:
+        opts = dict.fromkeys(subs, make_solver(solver, profile, options=solver_options, **settings))
+    return subs, xs, opts
+
+
+def _solve_scenarios(subs, xs, opts, message):
+    """
+    message = {'xbar': None} (first iteration, no PH terms), {'xbar': {name: value}, 'rho': r} (PH iteration)
+    or {'design': {name: value}} (design fixed, original objective). Returns [(s, ObjFunction_s, {name: x_s})]
+    """
+    rows = []
+    for s, sub in subs.items():
+        x = xs[s]
+        opt = opts[s]
+        if 'design' in message:
+            for name, var in x.items():
+                value = min(max(message['design'][name], var.lb if var.lb is not None else -float('inf')), var.ub if var.ub is not None else float('inf'))   #solver noise
+                var.fix(round(value) if var.is_integer() else value)
+            sub.ph_objective.deactivate()
+            sub.ObjFunction.activate()
+            if opt.persistent:                                          #the persistent solver only follows Param changes (params_only)
+                opt.opt.update_variables(list(x.values()))
+                opt.opt.set_objective(sub.ObjFunction)
+        elif message['xbar'] is not None:
+            for name in sub.ph_N:
+                sub.ph_rho[name] = message['rho']*sub.ph_cost[name]
+                sub.ph_w[name] = pyo.value(sub.ph_w[name]) + pyo.value(sub.ph_rho[name])*(pyo.value(x[name]) - message['xbar'][name])/max(abs(message['xbar'][name]), 1)
+                sub.ph_xbar[name] = message['xbar'][name]
+        opt.solve(sub)
+        if not opt.optimal():
+            raise RuntimeError('%s is %s' %(sub.name, opt.stats['termination']))
+        rows.append((s, pyo.value(sub.ObjFunction.expr), {name: pyo.value(var) for name, var in x.items()}))
+    return rows
+
+
+def _worker(conn, build_scenario, scenarios, names, solver, profile, settings, solver_options):
+    try:
+        state = _build_scenarios(build_scenario, scenarios, names, solver, profile, settings, solver_options)
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            conn.send(_solve_scenarios(*state, message))
+    except Exception as err:                                    # reported to the main process, which stops PH
+        conn.send(('error', repr(err)))
+    finally:
+        conn.close()
+
+
+def solve_progressive_hedging(build_scenario, n_scenarios, names, probabilities=None, rho=2, solver=None, profile='default', solver_options=None,
+                              workers=None, tol=1e-4, max_iter=100):
+    """
+    build_scenario(s) -> Pyomo model of scenario s with a maximised ObjFunction and the design variables names (first stage).
+    probabilities = one per scenario (default equal). rho = penalty per unit of deviation from xbar, as a share of the cost
+    coefficient of the variable in ObjFunction. solver, profile = see solvers.make_solver (solver can be 'persistent').
+    Stops when the mean relative deviation of the scenario designs from xbar is <= tol. The design (xbar, integer variables
+    rounded, clipped to the bounds) is then fixed in every scenario and evaluated.
+    Returns (design, expected ObjFunction of the design, DataFrame with every iteration). The first iteration (no PH terms)
+    gives the expected value of the wait-and-see solutions, an upper bound of the stochastic problem.
+    """
+    probabilities = list(probabilities or [1/n_scenarios]*n_scenarios)
+    workers = min(workers or os.cpu_count() or 1, n_scenarios)
+    settings = default_threads(profile, workers)
+    groups = [list(range(w, n_scenarios, workers)) for w in range(workers)]
+
+    fork = 'fork' in mp.get_all_start_methods()
+    conns = []
+    procs = []
+    if fork:
+        ctx = mp.get_context('fork')
+        for group in groups:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(child, build_scenario, group, names, solver, profile, settings, solver_options))
+            proc.start()
+            child.close()
+            conns.append(parent)
+            procs.append(proc)
+    else:
+        print('\n fork not available, the PH scenarios are solved in the main process')
+        state = _build_scenarios(build_scenario, range(n_scenarios), names, solver, profile, settings, solver_options)
+
+    def solve_all(message):
+        if not fork:
+            return _solve_scenarios(*state, message)
+        for conn in conns:
+            conn.send(message)
+        rows = []
+        for conn in conns:
+            reply = conn.recv()
+            if isinstance(reply, tuple) and reply[0] == 'error':
+                raise RuntimeError('PH worker failed: %s' %reply[1])
+            rows.extend(reply)
+        return rows
+
+    history = []
+    xbar = None
+    try:
+        for iteration in range(max_iter + 1):
+            start = time.perf_counter()
+            rows = solve_all({'xbar': xbar, 'rho': rho})
+            xbar = {name: sum(probabilities[s]*x[name] for s, obj, x in rows) for name in names}
+            convergence = sum(probabilities[s]*abs(x[name] - xbar[name])/max(abs(xbar[name]), 1) for s, obj, x in rows for name in names)/len(names)
+            expected = sum(probabilities[s]*obj for s, obj, x in rows)
+            history.append({'iteration': iteration, 'convergence': convergence, 'expected_objective': expected, 'time_s': time.perf_counter() - start, **xbar})
+            print('\n PH iteration %i: convergence = %8.6f, expected objective of the scenario designs = %4.2f (%4.2f s)' %(iteration, convergence, expected, time.perf_counter() - start))
+            if convergence <= tol:
+                break
+
+        rows = solve_all({'design': xbar})
+        design = rows[0][2]
+        objective = sum(probabilities[s]*obj for s, obj, x in rows)
+    finally:
+        for conn in conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for proc in procs:
+            proc.join()
+    return design, objective, pd.DataFrame(history).set_index('iteration')
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Headless report: the figures of plots.py rendered to PNG/SVG files in parallel worker processes.
+
+The figures are drawn with the Agg canvas (matplotlib.figure.Figure, no pyplot and no window), so rendering never
+blocks and works without a display. Long hourly series are reduced by min/max decimation before they are sent to
+a worker: the hours are split in buckets and only the first/last hour and the hours of the minimum and maximum of
+every series in every bucket are kept, so peaks and troughs stay visible with a few thousand points instead of 8760
+(or 70k for several years). One report holds the figures of one run or of many runs (e.g. the points of a sweep),
+all of them rendered by the same pool. With background=True the pool renders while the caller goes on solving.
+"""
+import os
+import time
+import multiprocessing as mp
+import numpy as np
+from .profiling import phase
+from .plots import FIGURES, SENSITIVITY_FIGURES, FIGSIZE, plot_series, sensitivity_series, cut_window, draw_figure
+
+MAX_POINTS = 2000                                               #points per figure after decimation (about)
+
+
+def minmax_indices(series, max_points=MAX_POINTS):
+    "Indices kept by min/max decimation of the arrays series (same length): first, last, and argmin/argmax of every array in every bucket"
+    n = len(series[0])
+    if n <= max_points:
+        return np.arange(n)
+    n_buckets = max(1, max_points//(2*len(series)))
+    size = -(-n//n_buckets)
+    keep = [np.array([0, n-1])]
+    offsets = np.arange(n_buckets)*size
+    for y in series:
+        y = np.nan_to_num(np.asarray(y, dtype=float))
+        y = np.pad(y, (0, n_buckets*size - n), mode='edge').reshape(n_buckets, size)
+        keep.append(offsets + y.argmin(axis=1))
+        keep.append(offsets + y.argmax(axis=1))
+    return np.unique(np.minimum(np.concatenate(keep), n-1))
+
+
+def decimate(series, x='hour', max_points=MAX_POINTS):
+    "series ({name: array}) at the minmax_indices of all the arrays but the x axis"
+    index = minmax_indices([y for name, y in series.items() if name != x], max_points)
+    return {name: np.asarray(y)[index] for name, y in series.items()}
+
+
+def _render(task):
+    spec, series, base, formats, dpi = task
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=spec.get('figsize', FIGSIZE))
+    FigureCanvasAgg(fig)
+    draw_figure(fig.add_subplot(), spec, series)
+    fig.tight_layout()
+    paths = []
+    for fmt in formats:
+        fig.savefig(base + '.' + fmt, dpi=dpi)
+        paths.append(base + '.' + fmt)
+    return paths
+
+
+def report_tasks(runs, report_dir, sensitivity=None, formats=('png',), max_points=MAX_POINTS, dpi=100):
+    """
+    Rendering tasks of the FIGURES of every run and of the SENSITIVITY_FIGURES, the series already cut and decimated.
+    runs = {run name: df_results} (files in report_dir/<run name>/) or one df_results (files in report_dir/).
+    """
+    if not isinstance(runs, dict):
+        runs = {'': runs}
+    tasks = []
+    for name, df_results in runs.items():
+        folder = os.path.join(report_dir, str(name))
+        os.makedirs(folder, exist_ok=True)
+        series = plot_series(df_results)
+        for spec in FIGURES:
+            tasks.append((spec, decimate(cut_window(spec, series), max_points=max_points), os.path.join(folder, spec['name']), formats, dpi))
+    if sensitivity is not None:
+        os.makedirs(report_dir, exist_ok=True)
+        series = sensitivity_series(sensitivity)
+        for spec in SENSITIVITY_FIGURES:
+            tasks.append((spec, cut_window(spec, series), os.path.join(report_dir, spec['name']), formats, dpi))
+    return tasks
+
+
+class ReportJob:
+    "Figures being rendered by a process pool (pool None: already rendered): wait() returns the files written"
+
+    def __init__(self, pool, result, start):
+        self.pool = pool
+        self.result = result                                    #AsyncResult of the pool, or the files of every task
+        self.start = start
+        self.paths = None
+        self.time_s = None                                      #from the start of the report to the end of wait()
+
+    def wait(self):
+        if self.paths is None:
+            groups = self.result.get() if self.pool is not None else self.result
+            self.paths = [path for group in groups for path in group]
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+            self.time_s = time.perf_counter() - self.start
+        return self.paths
+
+
+def render_report(runs, report_dir, sensitivity=None, formats=('png',), max_points=MAX_POINTS, dpi=100, workers=None, background=False):
+    """
+    Renders the report of runs (see report_tasks) to report_dir with workers processes (default one per core).
+    Returns the files written, or with background=True a ReportJob (job.wait() returns them). Where fork is not
+    available the figures are rendered in the main process.
+    """
+    start = time.perf_counter()
+    with phase('report_tasks'):
+        tasks = report_tasks(runs, report_dir, sensitivity, formats, max_points, dpi)
+    if tasks and 'fork' in mp.get_all_start_methods():
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        pool = mp.get_context('fork').Pool(workers)
+        job = ReportJob(pool, pool.map_async(_render, tasks, chunksize=max(1, len(tasks)//(4*workers))), start)
+    else:
+        job = ReportJob(None, [_render(task) for task in tasks], start)
+    return job if background else job.wait()
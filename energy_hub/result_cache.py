@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of solved results.
+
+A result (solution arrays and KPIs) is stored under the SHA-256 hash of everything that defines it: the input
+DataFrames, the values of the mutable Params of the built model and the model/solver options. Re-running a case
+that was already solved (same workbook, same Params, same options) loads the solution instead of solving again.
+Every entry is <key>.npz (arrays) + <key>.json (KPIs) in the cache folder. The folder is bounded in size: when it
+grows above max_bytes the least recently used entries (access time = mtime of the json, updated on every hit)
+are deleted.
+"""
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+DEFAULT_MAX_BYTES = 1 << 30                                     #1 GB
+
+
+def _update(sha, part):
+    if isinstance(part, (pd.DataFrame, pd.Series)):
+        sha.update(json.dumps([str(c) for c in (part.columns if isinstance(part, pd.DataFrame) else [part.name])]).encode())
+        sha.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+    elif isinstance(part, np.ndarray):
+        sha.update(str((part.dtype, part.shape)).encode())
+        sha.update(np.ascontiguousarray(part).tobytes())
+    else:
+        sha.update(json.dumps(part, sort_keys=True, default=str).encode())
+
+
+def cache_key(*parts):
+    "SHA-256 of parts (DataFrames, arrays, dicts/lists/scalars that json can write, e.g. another key)"
+    sha = hashlib.sha256()
+    for part in parts:
+        _update(sha, part)
+        sha.update(b'|')
+    return sha.hexdigest()
+
+
+def model_params(model):
+    "{name: value} of the mutable Params of model (indexed Params as {index: value}), part of the key of a model"
+    return {p.name: ({str(k): v for k, v in p.extract_values().items()} if p.is_indexed() else pyo.value(p))
+            for p in model.component_objects(pyo.Param, descend_into=True) if p.mutable}
+
+
+def load_result(cache_dir, key):
+    "(arrays, kpis) of key, or None if the cache has no entry for it"
+    base = os.path.join(cache_dir, key)
+    try:
+        with open(base + '.json') as f:
+            kpis = json.load(f)
+        with np.load(base + '.npz') as npz:
+            arrays = {name: npz[name] for name in npz.files}
+    except (OSError, ValueError):
+        return None
+    now = time.time()
+    os.utime(base + '.json', (now, now))                        #most recently used
+    return arrays, kpis
+
+
+def save_result(cache_dir, key, arrays, kpis, max_bytes=DEFAULT_MAX_BYTES):
+    "Stores arrays ({name: array}) and kpis (dict json can write) under key, then evicts the LRU entries above max_bytes"
+    os.makedirs(cache_dir, exist_ok=True)
+    base = os.path.join(cache_dir, key)
+    tmp = '.%i.tmp' %os.getpid()                                #written under a temporary name, a reader never sees half an entry
+    with open(base + '.npz' + tmp, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    with open(base + '.json' + tmp, 'w') as f:
+        json.dump(kpis, f, indent=1, default=float)
+    os.replace(base + '.npz' + tmp, base + '.npz')             #json last: an entry with a json is complete
+    os.replace(base + '.json' + tmp, base + '.json')
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    "Deletes the least recently used entries until the folder is at most max_bytes, returns the number of entries deleted"
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.json'):
+            key = name[:-5]
+            paths = [os.path.join(cache_dir, key + ext) for ext in ('.json', '.npz')]
+            try:
+                entries.append((os.path.getmtime(paths[0]), sum(os.path.getsize(p) for p in paths if os.path.exists(p)), paths))
+            except OSError:                                     #deleted by another process
+                continue
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, paths in entries:
+        if total <= max_bytes:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total = total - size
+        deleted = deleted + 1
+    return deleted
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk extraction of the solution time series.
+
+pyo.value(model.X[t]) for every variable and hour is slow (one call per hour and variable, then Python lists).
+extract_timeseries reads every hourly Var of a model (or block) in one pass into a NumPy column, and returns one
+DataFrame indexed by hour, used for all the KPIs, cash flows and graphs. solution_arrays/load_solution save and restore
+the values of every Var of a model (result_cache.py).
+"""
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+
+def hourly_variables(b):
+    "Names of the Vars (and Expressions: flows of the compact formulation, see model.AddOperation) of b indexed by the hours b.T"
+    return [var.local_name for var in b.component_objects((pyo.Var, pyo.Expression), descend_into=False) if var.is_indexed() and var.index_set() is b.T]
+
+
+def _values(var):
+    "Values of the indices of an indexed Var in one extract_values call, None (no value) as NaN"
+    return np.array(list(var.extract_values().values()), dtype=float)
+
+
+def extract_timeseries(b, names=None):
+    """
+    DataFrame with one column per hourly Var of b (default all of them, see hourly_variables), index = hour (b.T).
+    Variables without value (not used by any constraint) are NaN. Expressions are evaluated, NaN where a variable has no value.
+    """
+    if names is None:
+        names = hourly_variables(b)
+    hours = np.fromiter(b.T, dtype=int, count=len(b.T))
+    data = {}
+    for name in names:
+        component = getattr(b, name)
+        if component.ctype is pyo.Var:
+            data[name] = _values(component)
+        else:                                                   #compact flows: sums of Vars, evaluated hour by hour
+            data[name] = np.array([pyo.value(e, exception=False) for e in component.values()], dtype=float)
+    return pd.DataFrame(data, index=pd.Index(hours, name='hour'))
+
+
+def solution_arrays(model):
+    "{Var name: array of the values of its indices} for every Var of model (and of its blocks), None values as NaN"
+    return {var.name: _values(var) for var in model.component_objects(pyo.Var, descend_into=True)}
+
+
+def load_solution(model, arrays):
+    "Sets the Vars of model (built as the model of solution_arrays) to the values of arrays"
+    for var in model.component_objects(pyo.Var, descend_into=True):
+        for v, value in zip(var.values(), arrays[var.name]):
+            v.set_value(None if np.isnan(value) else float(value), skip_validation=True)
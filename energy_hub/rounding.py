@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Fast path for the integer turbine count: LP relaxation, then floor and ceil of x2 as two LPs, MILP only when needed.
+
+x2 (number of wind turbines) is the only integer variable of the model, but it makes every solve a branch and bound
+over the hourly LP. solve_lp_rounding:
+1. solves the LP relaxation (x2 continuous): its objective is an upper bound of the MILP optimum (maximised NPV).
+   When x2 is already integral (e.g. the turbines fill the hub area) the LP solution is the MILP optimum, done
+2. fixes x2 to floor and to ceil of the relaxed value and solves the two LPs, the better one is a feasible MILP solution
+3. certified gap = (LP bound - best rounded NPV)/|best rounded NPV|. Above gap_tol the MILP is solved after all,
+   with the rounded solution as MIP start
+The relaxation is solved by barrier with crossover (LP_SETTINGS, unless the profile sets a method): on a year of hours
+about half the time of the simplex, and the crossover leaves a basis. With a persistent solver (solver='persistent', or
+None when Gurobi or HiGHS has one) the LP and this basis stay in the solver memory: fixing x2 is a bound change and the
+simplex starts from the basis, a fraction of the LP time (cold, the two LPs would each cost as much as the relaxation
+and the fast path would be slower than the MILP). The two LPs are then solved one after the other in the main process:
+a live Gurobi/HiGHS instance must not be forked. With a solver run through a file the LPs are solved cold, in parallel
+(forked worker processes that inherit the built model, each with its own solver), one after the other without fork
+(Windows) or in a pool worker (site screening). When HiGHS finds the MILP optimum at the root node the fast path gains
+less (LP vs MILP time).
+The solution is loaded in the model, the statistics have the same keys as solvers.Solver.stats (bound = LP bound unless
+the MILP was solved) with lp_bound, the method used and the time of every step.
+
+    stats = solve_lp_rounding(model, gap_tol=0.01)                     #or solve(model, inputs, rounding_gap=0.01)
+"""
+import math
+import time
+import multiprocessing as mp
+import pyomo.environ as pyo
+from .solvers import make_solver, default_threads, available, profile_settings, solver_options, SOLVERS
+from .persistent_solver import PERSISTENT_SOLVERS
+from .results import solution_arrays, load_solution
+
+INTEGER_VARIABLE = 'x2'
+LP_SETTINGS = {'method': 'barrier', 'crossover': True}          #relaxation, the rounding LPs are simplex from its basis
+
+_state = {}                                                     #model and solver of _solve_fixed (inherited by the forked workers)
+
+
+def _solve_fixed(value):
+    #LP with the integer variable fixed to value, in a worker process or in the main process (the variable is freed again)
+    model, opt = _state['model'], _state['opt']
+    var = getattr(model, INTEGER_VARIABLE)
+    var.fix(value)
+    try:
+        if opt.persistent:                                      #bound change of the LP in the solver, warm started from its basis
+            opt.opt.update_variables([var])
+            results = opt.solve(model)
+            if opt.optimal():
+                results.solution_loader.load_vars()
+        else:                                                   #an infeasible rounding (x2 above the hub area) must not raise either
+            opt = make_solver(_state['solver'], _state['profile'], **_state['settings'])
+            results = opt.solve(model, load_solutions=False)
+            if opt.optimal():
+                model.solutions.load_from(results)
+        if not opt.optimal():
+            return value, None, None
+        return value, float(pyo.value(model.ObjFunction)), solution_arrays(model)
+    finally:
+        var.unfix()
+
+
+def solve_lp_rounding(model, solver=None, profile='default', gap_tol=0.01, tee=False, **overrides):
+    """
+    Solves model (maximised NPV, x2 the only integer variable) by LP relaxation and rounding of x2, see the module docstring.
+    gap_tol = relative gap accepted without MILP (0.01 = 1 %), overrides = settings of make_solver (threads=2...).
+    Returns the statistics of the solve.
+    """
+    start = time.perf_counter()
+    persistent = solver == 'persistent' or (solver is None and any(available(name, persistent=True) for name in SOLVERS if name in PERSISTENT_SOLVERS))
+    var = getattr(model, INTEGER_VARIABLE)
+    domain = var.domain
+    lp_settings = {} if 'method' in {**profile_settings(profile), **overrides} else LP_SETTINGS
+    var.domain = pyo.NonNegativeReals
+    try:
+        opt = make_solver('persistent' if persistent else solver, profile, tee=tee, **{**lp_settings, **overrides})
+        opt.solve(model)
+        if not opt.optimal():
+            raise RuntimeError('LP relaxation: %s' %opt.stats['termination'])
+        bound, relaxed = opt.stats['objective'], pyo.value(var)
+        lp_time = time.perf_counter() - start
+        stats = {**opt.stats, 'method': 'lp_rounding', 'relaxed_' + INTEGER_VARIABLE: relaxed, 'lp_time_s': lp_time, 'rounding_time_s': 0}
+
+        candidates = sorted({math.floor(relaxed + 1e-6), math.ceil(relaxed - 1e-6)})
+        if len(candidates) == 1:                                #integral: the LP solution is the MILP optimum
+            var.set_value(candidates[0])
+            stats.update(rounded={str(candidates[0]): bound}, gap=0)
+        else:
+            if persistent:
+                opt.opt.config.load_solution = False            #an infeasible rounding must not raise
+                if lp_settings:
+                    (opt.opt.gurobi_options if opt.name == 'gurobi' else opt.opt.highs_options).update(solver_options(opt.name, {'method': 'simplex'}))
+            #a pool worker (sites.py) cannot fork, a persistent solver is not forked (solver library state) and warm starts from its basis anyway
+            fork = not persistent and 'fork' in mp.get_all_start_methods() and not mp.current_process().daemon
+            _state.update(model=model, opt=opt, solver=solver, profile=profile, settings={**default_threads(profile, len(candidates)), **lp_settings, **overrides} if fork else {**lp_settings, **overrides})
+            try:
+                if fork:
+                    with mp.get_context('fork').Pool(len(candidates)) as pool:
+                        rounded = pool.map(_solve_fixed, candidates)
+                else:
+                    rounded = [_solve_fixed(value) for value in candidates]
+            finally:
+                _state.clear()
+            feasible = [r for r in rounded if r[1] is not None]
+            stats.update(rounded={str(value): objective for value, objective, _ in rounded}, rounding_time_s=time.perf_counter() - start - lp_time)
+            if feasible:
+                value, objective, arrays = max(feasible, key=lambda r: r[1])
+                load_solution(model, arrays)
+                stats.update(objective=objective, gap=(bound - objective)/max(abs(objective), 1e-10))
+            else:
+                stats.update(objective=None, gap=None)
+    finally:
+        var.domain = domain
+    stats.update(bound=bound, lp_bound=bound)
+
+    if stats['gap'] is None or stats['gap'] > gap_tol:          #not certified: MILP, from the rounded solution if there is one
+        print('\n LP rounding gap %s above %s, solving the MILP' %(stats['gap'], gap_tol))
+        opt = make_solver('persistent' if persistent else solver, profile, tee=tee, **overrides)      #new solver: the LP settings are not for the MILP
+        if persistent:
+            opt.opt.config.warmstart = stats['gap'] is not None
+            opt.solve(model)
+        elif stats['gap'] is not None and getattr(opt.opt, 'warm_start_capable', lambda: False)():
+            opt.solve(model, warmstart=True)
+        else:
+            opt.solve(model)
+        stats = {**stats, **opt.stats, 'method': 'lp_rounding+milp', 'milp_time_s': opt.stats['wall_time_s']}
+    stats['wall_time_s'] = time.perf_counter() - start
+    return stats
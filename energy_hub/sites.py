@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Screening of candidate hub locations: the model of every site of a site table solved in a process pool, ranked by NPV.
+
+The site table (csv or xlsx, one row per site) holds what changes from one site to the other:
+- site: name of the site
+- profiles: hourly wind/solar/price file of the site (timeseries.py format, csv or parquet, path relative to the table),
+  its first hours as many as the input profiles. Empty: the profiles of the input workbook
+- any parameter of the General, Economic, Solar, Wind, Storage or Hydrogen sheet (shore_distance, area_hub, CAPEX_pipe,
+  OPEX_pipe, export_pressure, pipe_capacity...) replaces the input value at the site, empty cells keep it
+site_inputs applies a row to the inputs, the site specific constants (NPC of the pipe OPEX, compressor power of the
+export pressure...) are then computed once per site by design_constants when the model of the site is built.
+
+    sites = read_sites('input/sites.csv')
+    df_ranking = run_sites(inputs, sites, cache_dir='output/.cache', memory_mb=4000)
+
+Every site is solved by a new worker process (maxtasksperchild=1: the memory of a site goes back to the system when it
+finishes). memory_mb limits the memory a worker can allocate (address space above the one inherited from the main
+process: a site above it fails alone, with a MemoryError) and the number of workers to what fits in the RAM. With a cache_dir every solved site is stored in the result cache
+(result_cache.py) under the hash of its inputs and solver profile: running the batch again only solves the sites that
+are new or changed. Without fork (Windows) the sites are solved in the main process, without memory limit.
+"""
+import os
+import multiprocessing as mp
+import pandas as pd
+import pyomo.environ as pyo
+from .inputs import INPUT_NAMES
+from .pipeline import build_model, postprocess
+from .solvers import make_solver, default_threads, profile_settings, solver_name
+from .results import solution_arrays
+from .rounding import solve_lp_rounding
+from .result_cache import cache_key, load_result, save_result, DEFAULT_MAX_BYTES
+from .sweep import DESIGN_VARIABLES
+from .timeseries import iter_years
+
+PARAMETER_SHEETS = ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen']
+KPIS = ['NPV', 'LCOH', 'LCOE', 'IRR', 'total_area', 'curtailed_percentage']
+
+_state = {}                                                     #solver, profile, settings and cache of the worker process
+
+
+def read_sites(path):
+    "Site table of path (csv, or first sheet of an xlsx) indexed by site, the profiles paths made absolute"
+    df = pd.read_excel(path) if path.endswith(('.xlsx', '.xls')) else pd.read_csv(path)
+    df['site'] = df['site'].astype(str)
+    df = df.set_index('site')
+    if 'profiles' in df:
+        folder = os.path.dirname(os.path.abspath(path))
+        df['profiles'] = [os.path.join(folder, p) if isinstance(p, str) and p else None for p in df['profiles']]
+    return df
+
+
+def site_inputs(inputs, site):
+    "inputs ({name: DataFrame}) with the values of site (a row of read_sites), the DataFrames of inputs are not changed"
+    inputs = dict(inputs)
+    copied = set()
+    for name, value in site.items():
+        if name == 'profiles' or pd.isna(value):
+            continue
+        df_name = next((df_name for df_name in PARAMETER_SHEETS if name in inputs[df_name].index), None)
+        if df_name is None:
+            raise ValueError('Site table column %r is not a parameter of the input sheets' %name)
+        if df_name not in copied:
+            inputs[df_name] = inputs[df_name].copy()
+            copied.add(df_name)
+        inputs[df_name].loc[name, 'Input'] = float(value)
+    if isinstance(site.get('profiles'), str):
+        hours = len(inputs['df_EPV_h'])
+        profiles = next(iter_years(site['profiles'], hours))
+        if len(profiles[1]) < hours:
+            raise ValueError('%s has %i hours, the input profiles %i' %(site['profiles'], len(profiles[1]), hours))
+        inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'] = profiles
+    return inputs
+
+
+def site_key(inputs, profile, rounding_gap=None, solver=None):
+    "Key of a site in the result cache: its inputs, the solver (solver_name), the solver profile (and the LP rounding gap)"
+    method = () if rounding_gap is None else ({'lp_rounding': rounding_gap},)
+    return cache_key(*[inputs[name] for name in INPUT_NAMES], 'site', solver_name(solver), profile_settings(profile), *method)
+
+
+def _init_worker(solver, profile, settings, cache_dir, max_bytes, memory_mb, rounding_gap=None):
+    _state.update(solver=solver, profile=profile, settings=settings, cache_dir=cache_dir, max_bytes=max_bytes, rounding_gap=rounding_gap)
+    if memory_mb:                                               #on top of the address space inherited from the main process (pyarrow alone reserves about 1 GB)
+        import resource
+        try:
+            with open('/proc/self/statm') as f:
+                inherited = int(f.read().split()[0])*os.sysconf('SC_PAGE_SIZE')
+        except OSError:
+            inherited = 0
+        limit = inherited + int(memory_mb*1024**2)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _solve_site(task):
+    name, inputs, key = task
+    try:
+        model = build_model(inputs)
+        if _state['rounding_gap'] is None:
+            opt = make_solver(_state['solver'], _state['profile'], **_state['settings'])
+            opt.solve(model)
+            stats = {**opt.stats, 'method': 'milp'}
+        else:                                                   #LP relaxation and rounding of x2, the two LPs one after the other in the worker
+            stats = solve_lp_rounding(model, _state['solver'], _state['profile'], _state['rounding_gap'], **_state['settings'])
+        results = postprocess(model, inputs)
+        row = {'site': name, **{kpi: float(results[kpi]) for kpi in KPIS}, **{var: pyo.value(getattr(model, var)) for var in DESIGN_VARIABLES},
+               'solver': stats['solver'], 'method': stats['method'], 'termination': stats['termination'], 'gap': stats['gap'], 'solve_time_s': stats['wall_time_s'],
+               'worker': os.getpid(), 'cached': False}
+        if _state['cache_dir']:
+            save_result(_state['cache_dir'], key, solution_arrays(model), {'row': row}, max_bytes=_state['max_bytes'])
+        return row
+    except MemoryError:
+        return {'site': name, 'error': 'MemoryError (memory limit of the worker)'}
+    except Exception as err:                                    # reported in the table, the other sites go on
+        return {'site': name, 'error': repr(err)}
+
+
+def run_sites(inputs, sites, solver=None, profile='default', workers=None, memory_mb=None, rounding_gap=None, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, out_file=None):
+    """
+    Solves the model of inputs at every site of sites (read_sites), workers processes (default one per core, fewer when
+    memory_mb is given). rounding_gap: LP relaxation and rounding of x2 (rounding.py) instead of the MILP. Returns the DataFrame indexed by site, ranked by NPV (rank 1 = best) with the KPIS and the design,
+    failed sites last with their error. Also written to out_file (csv) when given.
+    """
+    rows, tasks = [], []
+    for name, site in sites.iterrows():
+        try:
+            inputs_site = site_inputs(inputs, site)
+        except Exception as err:                                # unreadable profiles file, unknown parameter: reported in the table
+            rows.append({'site': name, 'error': repr(err)})
+            continue
+        key = site_key(inputs_site, profile, rounding_gap, solver)
+        cached = load_result(cache_dir, key) if cache_dir else None
+        if cached is not None:
+            rows.append({**cached[1]['row'], 'cached': True})
+        else:
+            tasks.append((name, inputs_site, key))
+    print('\n Site screening: %i sites, %i in the result cache, %i to solve' %(len(sites), len(rows), len(tasks)))
+
+    if tasks:
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if memory_mb:
+            workers = max(1, min(workers, int(os.sysconf('SC_PHYS_PAGES')*os.sysconf('SC_PAGE_SIZE')/1024**2//memory_mb)))
+        settings = default_threads(profile, workers)            #do not oversubscribe the cores
+        if 'fork' in mp.get_all_start_methods():
+            with mp.get_context('fork').Pool(workers, initializer=_init_worker, initargs=(solver, profile, settings, cache_dir, max_bytes, memory_mb, rounding_gap), maxtasksperchild=1) as pool:
+                for row in pool.imap_unordered(_solve_site, tasks):
+                    rows.append(row)
+                    print('\n Site %s: %s' %(row['site'], row['error'] if 'error' in row else 'NPV = %4.2f, LCoH = %4.2f EUR/kg' %(row['NPV'], row['LCOH'])))
+        else:
+            print('\n fork not available, the sites are solved in the main process')
+            _init_worker(solver, profile, settings, cache_dir, max_bytes, None, rounding_gap)
+            rows.extend(_solve_site(task) for task in tasks)
+
+    columns = list(dict.fromkeys(['site'] + KPIS + DESIGN_VARIABLES + [key for row in rows for key in row]))      #also when every site failed
+    df = pd.DataFrame(rows, columns=columns).set_index('site')
+    df = df.sort_values('NPV', ascending=False, na_position='last')
+    df.insert(0, 'rank', range(1, len(df) + 1))
+    if out_file is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(out_file)), exist_ok=True)
+        df.to_csv(out_file)
+    return df
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Solver selection and performance profiles.
+
+Not every machine has a Gurobi licence: the model is solved with the first available of Gurobi, HiGHS, CBC and GLPK
+(or the solver asked for, when it is installed). A profile sets the performance options in solver-independent terms
+(threads, relative MIP gap, presolve, time limit, LP method, crossover), translated to the option names of each solver.
+make_solver returns a Solver: Solver.solve(model) works as opt.solve(model) and records the solver, the profile and the
+statistics of the solve (termination, time, objective, bound, gap, model size) in Solver.stats, stored with the results
+so runs on different machines can be compared.
+"""
+import os
+import time
+import pyomo.environ as pyo
+from pyomo.common.timing import HierarchicalTimer
+from .persistent_solver import PERSISTENT_SOLVERS, make_persistent_solver
+from .profiling import phase
+
+SOLVERS = ['gurobi', 'highs', 'cbc', 'glpk']                    #order of preference
+FACTORY_NAMES = {'gurobi': 'gurobi', 'highs': 'appsi_highs', 'cbc': 'cbc', 'glpk': 'glpk'}
+
+#threads, mip_gap (relative), presolve ('off', 'auto', 'aggressive'), time_limit [s], method ('auto', 'simplex', 'barrier'), crossover (True/False)
+PROFILES = {
+    'default': {},                                              #solver defaults
+    'fast': {'mip_gap': 0.01, 'presolve': 'aggressive', 'time_limit': 600},     #screening: 1 % gap, at most 10 minutes per solve
+    'exact': {'mip_gap': 0.0},
+    'lp': {'method': 'barrier', 'crossover': False},            #LPs (dispatch with fixed design, LP relaxation): barrier, no basis needed
+}
+
+#profile key -> (option name, value translation) of every solver, keys without an entry are not supported by the solver
+OPTION_NAMES = {
+    'gurobi': {'threads': ('Threads', int), 'mip_gap': ('MIPGap', float), 'time_limit': ('TimeLimit', float),
+               'presolve': ('Presolve', {'off': 0, 'auto': -1, 'aggressive': 2}.get),
+               'method': ('Method', {'auto': -1, 'simplex': 1, 'barrier': 2}.get), 'crossover': ('Crossover', {True: -1, False: 0}.get)},
+    'highs': {'threads': ('threads', int), 'mip_gap': ('mip_rel_gap', float), 'time_limit': ('time_limit', float),
+              'presolve': ('presolve', {'off': 'off', 'auto': 'choose', 'aggressive': 'on'}.get),
+              'method': ('solver', {'auto': 'choose', 'simplex': 'simplex', 'barrier': 'ipm'}.get), 'crossover': ('run_crossover', {True: 'on', False: 'off'}.get)},
+    'cbc': {'threads': ('threads', int), 'mip_gap': ('ratioGap', float), 'time_limit': ('seconds', float),
+            'presolve': ('presolve', {'off': 'off', 'auto': 'on', 'aggressive': 'more'}.get)},
+    'glpk': {'mip_gap': ('mipgap', float), 'time_limit': ('tmlim', int)},
+}
+
+_available = {}
+_warned = set()
+
+
+def available(name, persistent=False):
+    "True if solver name (gurobi, highs, cbc, glpk) is installed and licensed"
+    key = (name, persistent)
+    if key not in _available:
+        if persistent:
+            _available[key] = name in PERSISTENT_SOLVERS and bool(PERSISTENT_SOLVERS[name]().available())
+        else:
+            _available[key] = bool(pyo.SolverFactory(FACTORY_NAMES.get(name, name)).available(exception_flag=False))
+    return _available[key]
+
+
+def select_solver(preferred=None, persistent=False):
+    "preferred if available, else the first available of SOLVERS (of PERSISTENT_SOLVERS when persistent)"
+    candidates = [name for name in SOLVERS if not persistent or name in PERSISTENT_SOLVERS]
+    if preferred is not None:
+        if available(preferred, persistent):
+            return preferred
+        if preferred not in _warned:
+            print('\n Solver %s not available, using the first available of %s' %(preferred, candidates))
+            _warned.add(preferred)
+    for name in candidates:
+        if available(name, persistent):
+            return name
+    raise RuntimeError('No solver available, install gurobipy (with licence), highspy, cbc or glpk')
+
+
+def profile_settings(profile):
+    "Settings of profile, a name in PROFILES or a dict of settings"
+    return dict(PROFILES[profile] if isinstance(profile, str) else profile)
+
+
+def default_threads(profile, workers):
+    "{'threads': cores per worker} for the processes of a parallel run, unless profile sets the threads"
+    return {} if 'threads' in profile_settings(profile) else {'threads': max(1, (os.cpu_count() or 1)//workers)}
+
+
+def solver_options(name, profile):
+    "Options of solver name for profile (dict with the keys of PROFILES), unsupported keys are left out"
+    options = {}
+    for key, value in profile.items():
+        if value is not None and key in OPTION_NAMES.get(name, {}):
+            option, translate = OPTION_NAMES[name][key]
+            options[option] = translate(value)
+    return options
+
+
+class Solver:
+    "Solver with a profile: solve() as opt.solve(), with the statistics of the last solve in stats"
+
+    def __init__(self, name, profile_name, profile, persistent=False, tee=False, options=None):
+        self.name = name
+        self.profile_name = profile_name
+        self.profile = profile
+        self.persistent = persistent
+        self.tee = tee
+        self.options = {**solver_options(name, profile), **(options or {})}
+        if persistent:
+            self.opt = make_persistent_solver(preferred=(name,), options=self.options, tee=tee)
+        else:
+            self.opt = pyo.SolverFactory(FACTORY_NAMES.get(name, name))
+            for key, val in self.options.items():
+                self.opt.options[key] = val
+        self.stats = {}
+
+    def solve(self, model, **kwargs):
+        #profiling.phase 'solver': a persistent solver splits its time in model transfer (set_instance/update), optimize and load solution,
+        #a solver run through a file (LP file written, solver run, solution read) reports its own time when the Pyomo plugin reads it
+        with phase('solver', solver=self.name) as record:
+            start = time.perf_counter()
+            if self.persistent:
+                timer = HierarchicalTimer()
+                results = self.opt.solve(model, timer=timer, **kwargs)
+                record['timers_s'] = {name: t.total_time for name, t in timer.timers.items()}
+            else:
+                results = self.opt.solve(model, tee=self.tee, **kwargs)
+                solver_time = getattr(results.solver, 'wall_time', None) or getattr(results.solver, 'time', None)
+                if isinstance(solver_time, (int, float)):
+                    record['timers_s'] = {'solver': solver_time, 'interface (model file, solution)': time.perf_counter() - start - solver_time}
+            wall_time = time.perf_counter() - start
+        if self.persistent:
+            termination = results.termination_condition.name
+            objective, bound = results.best_feasible_objective, results.best_objective_bound
+        else:
+            termination = str(results.solver.termination_condition)
+            maximise = next(model.component_data_objects(pyo.Objective, active=True)).sense == pyo.maximize
+            objective, bound = (results.problem.lower_bound, results.problem.upper_bound) if maximise else (results.problem.upper_bound, results.problem.lower_bound)
+        objective, bound = [float(v) if v is not None and abs(float(v)) != float('inf') else None for v in (objective, bound)]
+        self.stats = {'solver': self.name + (' (persistent)' if self.persistent else ''), 'profile': self.profile_name, 'settings': dict(self.profile), 'options': dict(self.options),
+                      'termination': termination, 'wall_time_s': wall_time, 'objective': objective, 'bound': bound,
+                      'gap': abs(bound - objective)/max(abs(objective), 1e-10) if objective is not None and bound is not None else None,
+                      'n_variables': model.nvariables(), 'n_constraints': model.nconstraints()}
+        return results
+
+    def optimal(self):
+        return self.stats.get('termination') == 'optimal'
+
+
+def solver_name(solver=None):
+    "Name of the solver make_solver(solver) runs (e.g. None -> 'highs' when Gurobi is not installed), part of the result cache keys"
+    if solver == 'persistent':
+        return select_solver(None, persistent=True)
+    return select_solver(solver) if solver is None or solver in SOLVERS else solver
+
+
+def make_solver(solver=None, profile='default', tee=False, options=None, **overrides):
+    """
+    solver = 'gurobi', 'highs', 'cbc', 'glpk' (first available of SOLVERS when it is not installed), None (first available),
+    'persistent' (persistent_solver.py, Gurobi or HiGHS) or any other SolverFactory name.
+    profile = name in PROFILES or dict of settings, overrides = settings (e.g. time_limit=60, threads=2), options = raw solver options.
+    """
+    persistent = solver == 'persistent'
+    name = solver_name(solver)
+    settings = {**profile_settings(profile), **{key: val for key, val in overrides.items() if val is not None}}
+    return Solver(name, profile if isinstance(profile, str) else 'custom', settings, persistent=persistent, tee=tee, options=options)
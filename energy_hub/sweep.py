@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel, warm-started parameter sweep (e.g. the H2 price sensitivity analysis).
+
+The sweep values are sorted and split in contiguous chunks, one chunk per worker process. Every worker builds
+its own model instance once, then solves its chunk in order changing only the mutable Param: the solution of
+the previous (neighbouring) value is still loaded in the model and is passed to the solver as MIP start.
+Results are sent back through a queue and written to the output table (csv) as soon as each point finishes.
+
+Workers are forked, so build_model and result_fn can be closures (e.g. result_fn in cli.py). Where fork is not
+available (Windows) the sweep runs in the main process, with the same warm starts. With a cache_dir, every point
+is looked up in the result cache (result_cache.py) first and only the points not solved before are solved.
+A point that is not solved to optimality (infeasible, time limit) gives a row with its termination and NaN objective
+and design; it is not cached and the worker goes on with the next value.
+"""
+import os
+import csv
+import queue
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from .solvers import make_solver, default_threads, profile_settings
+from .results import solution_arrays
+from .result_cache import cache_key, model_params, load_result, save_result
+
+DESIGN_VARIABLES = ['x1', 'x2', 'x3', 'x4', 'x5', 'x5b', 'x6']
+ROW_COLUMNS = ['worker', 'solve_time_s', 'solver', 'profile', 'termination', 'gap', 'cached', 'objective'] + DESIGN_VARIABLES
+
+
+def _solve_chunk(worker, build_model, build_args, param_name, values, result_fn, solver, profile, settings, solver_options, start_values, results_queue, cache_dir):
+    try:
+        model = build_model(*build_args)
+        opt = make_solver(solver, profile, options=solver_options, **settings)
+        base_key = cache_key(*build_args, build_model.__name__, opt.name, profile_settings(profile)) if cache_dir else None
+        if opt.persistent:                                      #model kept in memory by the solver, only H2_price is updated between points
+            opt.opt.config.warmstart = True
+            opt.opt.config.load_solution = False                #an infeasible point (or time limit) must not raise and end the chunk
+        warmstart = not opt.persistent and getattr(opt.opt, 'warm_start_capable', lambda: False)()
+        if start_values:                                         #MIP start of the first point, e.g. the base case solution
+            for name, val in start_values.items():
+                getattr(model, name).set_value(val, skip_validation=True)
+        for i, value in enumerate(values):
+            getattr(model, param_name).set_value(value)
+            if cache_dir:
+                key = cache_key(base_key, model_params(model))
+                cached = load_result(cache_dir, key)
+                if cached is not None:
+                    results_queue.put({**cached[1]['row'], 'worker': worker, 'cached': True})
+                    continue
+            kwargs = {} if opt.persistent else {'load_solutions': False}
+            if warmstart and (i > 0 or start_values):
+                kwargs['warmstart'] = True
+            results = opt.solve(model, **kwargs)
+            row = {param_name: value, 'worker': worker, 'solve_time_s': opt.stats['wall_time_s'], 'solver': opt.stats['solver'], 'profile': opt.stats['profile'],
+                   'termination': opt.stats['termination'], 'gap': opt.stats['gap'], 'cached': False}
+            if not opt.optimal():                               #the model still holds the previous point: no values, not cached
+                row.update({name: np.nan for name in ['objective'] + DESIGN_VARIABLES})
+                results_queue.put(row)
+                continue
+            if opt.persistent:
+                results.solution_loader.load_vars()
+            else:
+                model.solutions.load_from(results)
+            row['objective'] = pyo.value(model.ObjFunction)
+            row.update({name: pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES})
+            if result_fn is not None:
+                row.update(result_fn(model))
+            if cache_dir:
+                save_result(cache_dir, key, solution_arrays(model), {'row': row})
+            results_queue.put(row)
+    except Exception as err:                                    # reported as a row, the other workers continue
+        results_queue.put({'worker': worker, 'error': repr(err)})
+    finally:
+        results_queue.put(None)
+
+
+def run_sweep(build_model, build_args, param_name, values, result_fn=None, solver=None, profile='default', solver_options=None,
+              workers=None, out_file=None, start_values=None, cache_dir=None):
+    """
+    Solves build_model(*build_args) for every value of the mutable Param param_name.
+    solver, profile = see solvers.make_solver ('persistent' for the in-memory APPSI solver, persistent_solver.py).
+    result_fn(model) -> dict of extra columns for the table (optional).
+    start_values = {'x1': .., ..} MIP start for the first point of every chunk (optional).
+    cache_dir = result cache folder (optional): points already solved with the same inputs, Params and profile are read from it.
+    Returns a DataFrame indexed by the Param value, the same rows are written to out_file while the sweep runs.
+    """
+    values = sorted(values)
+    workers = min(workers or os.cpu_count() or 1, len(values))
+    settings = default_threads(profile, workers)                #do not oversubscribe the cores
+    chunks = [[values[i] for i in idx] for idx in np.array_split(np.arange(len(values)), workers) if len(idx)]
+
+    fork = 'fork' in mp.get_all_start_methods()
+    ctx = mp.get_context('fork') if fork else None
+    results_queue = ctx.Queue() if fork else queue.Queue()
+    if fork:
+        procs = [ctx.Process(target=_solve_chunk, args=(w, build_model, build_args, param_name, chunk, result_fn, solver, profile, settings, solver_options, start_values, results_queue, cache_dir))
+                 for w, chunk in enumerate(chunks)]
+        for p in procs:
+            p.start()
+    else:
+        print('\n fork not available, the sweep runs in the main process')
+        for w, chunk in enumerate(chunks):
+            _solve_chunk(w, build_model, build_args, param_name, chunk, result_fn, solver, profile, settings, solver_options, start_values, results_queue, cache_dir)
+        procs = []
+
+    rows = []
+    writer = None
+    f = None
+    if out_file is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(out_file)), exist_ok=True)
+        f = open(out_file, 'w', newline='')
+    try:
+        finished = 0
+        while finished < len(chunks):
+            try:
+                row = results_queue.get(timeout=1)
+            except queue.Empty:
+                if procs and not any(p.is_alive() for p in procs) and results_queue.empty():
+                    print('\n sweep workers exited without reporting all points')
+                    break
+                continue
+            if row is None:
+                finished = finished + 1
+                continue
+            if 'error' in row:
+                print('\n sweep worker %i failed: %s' %(row['worker'], row['error']))
+                continue
+            rows.append(row)
+            if f is not None:
+                if writer is None:                              #the columns of result_fn are known from the first row only
+                    fieldnames = [param_name] + ROW_COLUMNS
+                    writer = csv.DictWriter(f, fieldnames=fieldnames + [k for k in row if k not in fieldnames], restval='', extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(row)
+                f.flush()
+    finally:
+        if f is not None:
+            f.close()
+        for p in procs:
+            p.join()
+    if not rows:
+        return pd.DataFrame(columns=[param_name]).set_index(param_name)
+    df = pd.DataFrame(rows).set_index(param_name).sort_index()
+    if writer is not None and len(df.columns) + 1 > len(writer.fieldnames):     #columns missing from the first row (e.g. it was infeasible): the table is written again
+        df.to_csv(out_file)
+    return df
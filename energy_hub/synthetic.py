@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic input data: the sheets of input_file.xlsx with made-up but plausible values, for any number of hours.
+
+The input workbook is not shared, so benchmarks and examples run on synthetic_inputs(hours) instead: the same
+{name: DataFrame} as load_inputs, with the parameter sheets (General, Economic, Solar, Wind, Storage, Hydrogen) and
+hourly Wind_Power_Data, Solar_Power_Data and price sheets of `hours` hours (168 hours to several years).
+The profiles are generated from a seed, so the same hours and seed always give the same data:
+- wind: capacity factor of a 15 MW turbine from an autocorrelated (AR(1), about 1 day) weather signal, higher in winter
+- solar: clear sky output of the day length and sun height of every day of the year, times an autocorrelated cloudiness
+- price: daily and seasonal shape, lower when it is windy, plus noise (a few negative hours)
+The model counts the revenues of its horizon as the revenues of one year, so the costs are scaled by hours/8760:
+the optimal design is about the same at every horizon length and the benchmarks measure the same problem.
+write_workbook saves the inputs as an input_file.xlsx that load_inputs (and the command line) can read.
+"""
+import numpy as np
+import pandas as pd
+
+#Parameters per year (scaled by hours/8760 where marked in SCALED)
+GENERAL = {'shore_distance': 85, 'area_hub': 100, 'system_lifetime': 25, 'discount_rate': 0.07}
+ECONOMIC = {'CAPEX_FPV': 2500, 'OPEX_solar_total': 15, 'CAPEX_wind': 3e7, 'OPEX_wind': 6e5, 'CAPEX_battery': 300, 'OPEX_battery': 5,
+            'CAPEX_Electrolysis': 1000, 'OPEX_Electrolysis': 20, 'CAPEX_compressor': 3000, 'OPEX_compressor': 60,
+            'CAPEX_H2_storage': 10, 'OPEX_H2_storage': 0.2}
+SOLAR = {'FPV_kWpm2': 0.2, 'area_FPV': 5}
+WIND = {'required_area_turbine': 1.5, 'P_turbine': 15000}
+STORAGE = {'charge_rate': 0.95, 'discharge_rate': 0.95, 'Self_discharge': 0.9999, 'charge_discharge_power': 0.5}
+HYDROGEN = {'export_pressure': 94, 'output_pressure': 30, 'lifetime_stack': 10, 'CAPEX_stack': 300, 'OPEX_pipe': 1e6, 'CAPEX_pipe': 5e7,
+            'pipe_capacity': 50000, 'Electrolysis_Efficiency': 55}
+SCALED = set(ECONOMIC) | {'CAPEX_stack', 'OPEX_pipe', 'CAPEX_pipe'}
+
+#sheet names of input_file.xlsx (inputs.readExcel) of every input
+SHEET_NAMES = {'df_general': 'General', 'df_economic': 'Economic', 'df_solar': 'Solar', 'df_wind': 'Wind', 'df_storage': 'Storage', 'df_Hydrogen': 'Hydrogen',
+               'df_EWind_h': 'Wind_Power_Data', 'df_EPV_h': 'Solar_Power_Data', 'df_electricity_prices': 'Day-ahead Prices_2015-2022'}
+
+
+def _ar1(rng, n, correlation):
+    "Autocorrelated standard normal series"
+    noise = rng.standard_normal(n)*np.sqrt(1 - correlation**2)
+    y = np.empty(n)
+    y[0] = rng.standard_normal()
+    for t in range(1, n):
+        y[t] = correlation*y[t-1] + noise[t]
+    return y
+
+
+def synthetic_profiles(hours, seed=0):
+    "(wind capacity factor, solar capacity factor, electricity price [EUR/kWh]) arrays of hours hours, starting on the 1st of January"
+    rng = np.random.default_rng(seed)
+    h = np.arange(hours)
+    day = (h//24) % 365
+    hour = h % 24
+    winter = np.cos(2*np.pi*day/365)                            #1 in January, -1 in July
+
+    weather = _ar1(rng, hours, 0.96) + 0.4*winter               #about one day of memory
+    wind_cf = 1/(1 + np.exp(-1.6*weather))
+    wind_cf = np.where(weather > 2.8, 0, wind_cf)               #cut-out at storm wind speeds
+
+    declination = -23.44*np.cos(2*np.pi*(day + 10)/365)         #sun at latitude 54 N (North Sea)
+    latitude = 54
+    hour_angle = 15*(hour + 0.5 - 12)
+    sin_height = (np.sin(np.radians(latitude))*np.sin(np.radians(declination))
+                  + np.cos(np.radians(latitude))*np.cos(np.radians(declination))*np.cos(np.radians(hour_angle)))
+    cloudiness = 1/(1 + np.exp(-(_ar1(rng, hours, 0.97) - 0.3*winter)))
+    solar_cf = np.clip(sin_height, 0, None)*(1 - 0.75*cloudiness)
+
+    price = (0.06 + 0.015*np.sin(2*np.pi*(hour - 13)/24) + 0.01*winter - 0.04*(wind_cf - 0.5)
+             + 0.012*rng.standard_normal(hours))
+    return wind_cf, solar_cf, price
+
+
+def _parameters(values, scale, unit=True):
+    df = pd.DataFrame({'Input': [value*scale if name in SCALED else value for name, value in values.items()]},
+                      index=pd.Index(list(values), name='Parameter'))
+    if unit:
+        df['Unit'] = '-'
+    return df
+
+
+def synthetic_inputs(hours=8760, seed=0):
+    "{name in INPUT_NAMES: DataFrame} as load_inputs returns, with synthetic sheets of hours hours (see the module docstring)"
+    wind_cf, solar_cf, price = synthetic_profiles(hours, seed)
+    scale = hours/8760
+    h = np.arange(hours)
+    return {'df_general': _parameters(GENERAL, scale),
+            'df_economic': _parameters(ECONOMIC, scale),
+            'df_solar': _parameters(SOLAR, scale),
+            'df_wind': _parameters(WIND, scale, unit=False),
+            'df_storage': _parameters(STORAGE, scale),
+            'df_Hydrogen': _parameters(HYDROGEN, scale),
+            'df_EWind_h': pd.DataFrame({'Hour': h, 'Wind_Power_1': WIND['P_turbine']*wind_cf, 'CF': wind_cf}),
+            'df_EPV_h': pd.DataFrame({'Hour': h, 'Power_Output[kWh/m2]': SOLAR['FPV_kWpm2']*solar_cf, 'CF': solar_cf}),
+            'df_electricity_prices': pd.DataFrame({'Hour': h, 'Average_2015_2022_[EUR/kWh]': price})}
+
+
+def synthetic_scenarios(hours, n_scenarios, seed=0):
+    "[(df_EWind_h, df_EPV_h, df_electricity_prices), ...] of n_scenarios synthetic weather years (CreateStochasticModel), seeds seed, seed+1..."
+    scenarios = []
+    for s in range(n_scenarios):
+        inputs = synthetic_inputs(hours, seed + s)
+        scenarios.append((inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices']))
+    return scenarios
+
+
+def write_workbook(path, inputs):
+    "Writes inputs ({name: DataFrame}, e.g. synthetic_inputs) as an input workbook with the sheets read by load_inputs"
+    with pd.ExcelWriter(path) as writer:
+        for name, sheet in SHEET_NAMES.items():
+            df = inputs[name]
+            df.to_excel(writer, sheet_name=sheet, index=df.index.name == 'Parameter')
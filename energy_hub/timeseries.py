@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Hourly time series of several years (wind, solar, electricity price) streamed from disk.
+
+A multi-year study (e.g. 2015-2022, about 70k hours) is not read into DataFrames as a whole: the series are kept in
+one CSV or Parquet file and read one block (a year) at a time, with the column names of the input sheets, so every
+block goes straight into AddOperation. Only one block of input data is in memory at a time.
+"""
+import pandas as pd
+
+#column names used by the model (input sheets Wind_Power_Data, Solar_Power_Data and Day-ahead Prices)
+COLUMNS = {'wind': 'Wind_Power_1', 'solar': 'Power_Output[kWh/m2]', 'price': 'Average_2015_2022_[EUR/kWh]'}
+
+
+def _is_parquet(path):
+    return path.endswith('.parquet') or path.endswith('.pq')
+
+
+def _chunks(path, usecols, chunk_size):
+    "DataFrames of at most chunk_size rows, in file order"
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=usecols):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=usecols, chunksize=chunk_size)
+
+
+def count_hours(path):
+    "Number of hours in the file (Parquet metadata, or one streaming pass over the CSV)"
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=1 << 16))
+
+
+def _split(df, columns):
+    "One block -> (df_EWind_h, df_EPV_h, df_electricity_prices) with the column names of the input sheets"
+    df = df.reset_index(drop=True)
+    return tuple(df[[columns[key]]].rename(columns={columns[key]: COLUMNS[key]}) for key in ['wind', 'solar', 'price'])
+
+
+def iter_years(path, hours_per_year=8760, columns=None):
+    """
+    Yields (df_EWind_h, df_EPV_h, df_electricity_prices) for every block of hours_per_year hours, the last block
+    can be shorter. columns = {'wind':.., 'solar':.., 'price':..} column names in the file, default COLUMNS.
+    """
+    columns = {**COLUMNS, **(columns or {})}
+    usecols = list(dict.fromkeys(columns[key] for key in ['wind', 'solar', 'price']))
+    buffer = []
+    n = 0
+    for chunk in _chunks(path, usecols, hours_per_year):
+        buffer.append(chunk)
+        n = n + len(chunk)
+        while n >= hours_per_year:                              #Parquet batches stop at row group boundaries, blocks are re-cut here
+            df = pd.concat(buffer, ignore_index=True)
+            yield _split(df.iloc[:hours_per_year], columns)
+            buffer = [df.iloc[hours_per_year:]]
+            n = len(buffer[0])
+    if n:
+        yield _split(pd.concat(buffer, ignore_index=True), columns)
+
+
+def iter_windows(source, window=168, overlap=24, columns=None):
+    """
+    Overlapping windows for the rolling horizon: yields (start, df_EWind_h, df_EPV_h, df_electricity_prices) for windows
+    of window hours starting every window-overlap hours (start = hours before the window). The last window is shorter
+    and ends with the data. source = file path (streamed) or (df_EWind_h, df_EPV_h, df_electricity_prices) in memory.
+    """
+    step = window - overlap
+    if isinstance(source, str):
+        columns = {**COLUMNS, **(columns or {})}
+        chunks = _chunks(source, list(dict.fromkeys(columns[key] for key in ['wind', 'solar', 'price'])), step)
+    else:
+        columns = COLUMNS
+        df_all = pd.concat([df[[COLUMNS[key]]].reset_index(drop=True) for key, df in zip(['wind', 'solar', 'price'], source)], axis=1)
+        chunks = (df_all.iloc[i:i+step] for i in range(0, len(df_all), step))
+    start = 0
+    df = None
+    for chunk in chunks:
+        df = chunk if df is None else pd.concat([df, chunk], ignore_index=True)
+        while len(df) >= window:
+            yield (start,) + _split(df.iloc[:window], columns)
+            df = df.iloc[step:].reset_index(drop=True)
+            start = start + step
+    if df is not None and len(df):
+        yield (start,) + _split(df, columns)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Uncertain inputs of the energy hub model: cost, H2 price and efficiency distributions and the Monte-Carlo evaluator.
+
+The samples are drawn and solved by montecarlo.py, this module maps a sample to the Params of the model and
+computes the cash flow of the solved design.
+"""
+import itertools
+import pyomo.environ as pyo
+from .model import CreateModel
+from .solvers import make_solver
+from .timeseries import iter_years
+from .results import extract_timeseries
+from .sweep import DESIGN_VARIABLES
+from .finance import np_calculator, costs_production_flow, add_replacements, cost_flow, irr
+
+"Monte-Carlo (montecarlo.py): df_economic entries --> cost Params of AddDesign, CAPEX per unit as is, OPEX per unit and year as NPC over the lifetime"
+"(as design_constants in model.py). Every sample sets these Params, H2_price and electrolyser_efficiency in a model kept per weather year and solves again"
+ECONOMIC_PARAMS = {'CAPEX_FPV': 'PV_CAPEX', 'OPEX_solar_total': 'PV_OPEX', 'CAPEX_wind': 'W_CAPEX', 'OPEX_wind': 'W_OPEX',
+                   'CAPEX_battery': 'CAPEX_Storage', 'OPEX_battery': 'OPEX_Storage', 'CAPEX_Electrolysis': 'CAPEX_electrolyser', 'OPEX_Electrolysis': 'OPEX_electrolyser',
+                   'CAPEX_compressor': 'CAPEX_compressor', 'OPEX_compressor': 'OPEX_compressor', 'CAPEX_H2_storage': 'CAPEX_h2_storage', 'OPEX_H2_storage': 'OPEX_h2_storage'}
+
+def SetEconomicParams (model, economic, df_general, df_Hydrogen):
+    #economic = {df_economic entry: value}
+    lifetime = int(df_general.loc['system_lifetime','Input'])
+    for key, value in economic.items():
+        if key.startswith('OPEX'):
+            flow = costs_production_flow(value, lifetime)
+            if key == 'OPEX_Electrolysis':                                     #stack replacements, as the electrolyser OPEX of design_constants
+                add_replacements(flow, df_Hydrogen.loc['lifetime_stack','Input'], df_Hydrogen.loc['CAPEX_stack','Input'], until=lifetime)
+            value = np_calculator(flow, df_general.loc['discount_rate','Input'])
+        getattr(model, ECONOMIC_PARAMS[key]).set_value(float(value))
+
+def ProjectCashFlow (model, economic, df_general, df_solar, df_wind, df_Hydrogen, electricity_price):
+    #Yearly net cash flow of a solved model as in the postprocessing (CAPEX in year 0, OPEX and revenues from year 1, stack replacements), economic = all df_economic entries
+    x1, x2, x3, x4, x5, x5b, x6 = [pyo.value(getattr(model, name)) for name in DESIGN_VARIABLES]
+    PV_kWp = x1*df_solar.loc['FPV_kWpm2','Input']
+    capex = PV_kWp*economic['CAPEX_FPV'] + x2*economic['CAPEX_wind'] + x3*economic['CAPEX_battery'] + x4*economic['CAPEX_Electrolysis'] + (x5+x5b)*economic['CAPEX_compressor'] + x6*economic['CAPEX_H2_storage'] + df_Hydrogen.loc['CAPEX_pipe','Input']
+    opex = PV_kWp*economic['OPEX_solar_total'] + x2*economic['OPEX_wind'] + x3*economic['OPEX_battery'] + x4*economic['OPEX_Electrolysis'] + (x5+x5b)*economic['OPEX_compressor'] + x6*economic['OPEX_H2_storage'] + df_Hydrogen.loc['OPEX_pipe','Input']
+    df_flows = extract_timeseries(model, ['H2_Export_h', 'Electricity_export'])
+    revenue = df_flows['H2_Export_h'].sum()*pyo.value(model.H2_price) + df_flows['Electricity_export'].to_numpy() @ electricity_price
+    lifetime = int(df_general.loc['system_lifetime','Input'])
+    return costs_production_flow(revenue, lifetime) - cost_flow(capex, opex, lifetime, df_Hydrogen.loc['lifetime_stack','Input'], df_Hydrogen.loc['CAPEX_stack','Input']*x4)
+
+def MonteCarloDistributions (df_economic, df_Hydrogen, n_weather_years=0):
+    #CAPEX -20%/+30% and OPEX -20%/+20% around the input values (triangular), H2 price 5-15 EUR/kg, electrolyser efficiency +-3% (1 sd), weather year of the --multi-year file
+    distributions = {}
+    for key in ECONOMIC_PARAMS:
+        base = float(df_economic.loc[key,'Input'])
+        distributions[key] = ('triangular', 0.8*base, base, (1.3 if key.startswith('CAPEX') else 1.2)*base) if base > 0 else base
+    distributions['H2_price'] = ('triangular', 5, 10, 15)
+    efficiency = float(df_Hydrogen.loc['Electrolysis_Efficiency','Input'])
+    distributions['electrolyser_efficiency'] = ('normal', efficiency, 0.03*efficiency)
+    if n_weather_years:
+        distributions['weather_year'] = ('choice', list(range(n_weather_years)))
+    return distributions
+
+def MonteCarloEvaluator (df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, df_EWind_h, df_EPV_h, df_electricity_prices, timeseries_file=None, hours_per_year=8760, solver=None, profile='default'):
+    #evaluate(inputs) for run_montecarlo, one model (and solver) per weather year is built in every worker and re-used by its next samples
+    models = {}
+    def evaluate (inputs):
+        year = inputs.get('weather_year')
+        if year not in models:
+            if year is None:
+                profiles = (df_EWind_h, df_EPV_h, df_electricity_prices)
+            else:
+                profiles = next(itertools.islice(iter_years(timeseries_file, hours_per_year), year, None))
+            model_mc = CreateModel(df_general, df_economic, df_solar, df_wind, df_storage, df_Hydrogen, *profiles)
+            opt = make_solver(solver, profile)
+            if opt.persistent:
+                opt.opt.config.warmstart = True
+            models[year] = (model_mc, opt, profiles[2]['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float))
+        model_mc, opt, electricity_price = models[year]
+        
+        economic = {key: inputs[key] for key in ECONOMIC_PARAMS if key in inputs}
+        SetEconomicParams(model_mc, economic, df_general, df_Hydrogen)
+        model_mc.H2_price.set_value(inputs['H2_price'])
+        model_mc.electrolyser_efficiency.set_value(inputs['electrolyser_efficiency'])
+        opt.solve(model_mc)
+        
+        cash_flow = ProjectCashFlow(model_mc, {**df_economic['Input'].to_dict(), **economic}, df_general, df_solar, df_wind, df_Hydrogen, electricity_price)
+        row = {'solver': opt.stats['solver'], 'profile': opt.stats['profile'], 'termination': opt.stats['termination'], 'gap': opt.stats['gap'], 'NPV': pyo.value(model_mc.ObjFunction), 'NPV_cash_flow': float(np_calculator(cash_flow, df_general.loc['discount_rate','Input'])), 'IRR': float(irr(cash_flow))}
+        row.update({name: pyo.value(getattr(model_mc, name)) for name in DESIGN_VARIABLES})
+        return row
+    return evaluate
+
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures: one week of synthetic hourly data (synthetic.py, the input workbook is not shared) and HiGHS.
+The tests that solve a model are skipped when HiGHS (highspy) is not installed.
+"""
+import pytest
+import pyomo.environ as pyo
+from energy_hub.synthetic import synthetic_inputs
+from energy_hub.solvers import available
+from energy_hub.sweep import DESIGN_VARIABLES
+
+HOURS = 168
+
+requires_highs = pytest.mark.skipif(not available('highs'), reason='HiGHS (highspy) is not installed')
+
+
+@pytest.fixture
+def inputs():
+    "{name: DataFrame} of one synthetic week, new for every test (the tests may change parameters)"
+    return synthetic_inputs(HOURS)
+
+
+def assert_same_solution(a, b):
+    "Same optimum (active objective, rel 1e-6) and same design x1-x6 (rel 1e-4, abs 1e-3: alternative optima of the MIP gap) of the solved models a and b"
+    objective_a, objective_b = [pyo.value(next(model.component_data_objects(pyo.Objective, active=True))) for model in (a, b)]
+    assert objective_a == pytest.approx(objective_b, rel=1e-6)
+    for name in DESIGN_VARIABLES:
+        assert pyo.value(getattr(a, name)) == pytest.approx(pyo.value(getattr(b, name)), rel=1e-4, abs=1e-3), name
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Representative days: k-medoids on separable data, the reduced profiles of aggregate_profiles and LinkRepresentativeDays
+with one representative per day (identity assignment) against the full model.
+"""
+import numpy as np
+import pytest
+import pyomo.environ as pyo
+from energy_hub.aggregation import kmedoids, aggregate_profiles
+from energy_hub.model import CreateModel, AddDesign, AddOperation, LinkRepresentativeDays
+from energy_hub.solvers import make_solver
+from energy_hub.sweep import DESIGN_VARIABLES
+from conftest import requires_highs, HOURS
+
+PARAMETERS = ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen']
+
+
+def test_kmedoids_separable_clusters():
+    rng = np.random.default_rng(3)
+    centres = np.array([[0, 0], [10, 0], [0, 10]])
+    X = np.vstack([centre + rng.normal(scale=0.5, size=(20, 2)) for centre in centres])
+    medoids, labels = kmedoids(X, 3, seed=1)
+    assert sorted(labels[medoids]) == [0, 1, 2]
+    assert sorted(labels.reshape(3, 20)[:, 0]) == [0, 1, 2]                    #one cluster per centre
+    assert (labels.reshape(3, 20) == labels.reshape(3, 20)[:, :1]).all()
+    for c, medoid in enumerate(medoids):
+        members = np.flatnonzero(labels == c)
+        distances = np.linalg.norm(X[members][:, None] - X[members][None, :], axis=2).sum(axis=1)
+        assert medoid == members[distances.argmin()]                            #medoid = member closest to the others
+    again, _ = kmedoids(X, 3, seed=1)
+    assert np.array_equal(again, medoids)
+
+
+def test_aggregate_profiles(inputs):
+    aggregation = aggregate_profiles(inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'], 3)
+    medoids, assignment, P = aggregation['medoids'], aggregation['assignment'], aggregation['period_length']
+    assert list(medoids) == sorted(medoids)
+    assert len(assignment) == HOURS//P
+    assert list(assignment[medoids]) == list(range(len(medoids)))             #every medoid represents its own day
+    assert aggregation['hour_weights'].sum() == pytest.approx(HOURS)
+    assert np.array_equal(aggregation['hour_weights'], np.repeat(np.bincount(assignment), P))
+    for c, day in enumerate(medoids):                                          #the reduced profiles are the medoid days
+        reduced = aggregation['df_EPV_h']['Power_Output[kWh/m2]'].to_numpy()[c*P:(c+1)*P]
+        assert np.array_equal(reduced, inputs['df_EPV_h']['Power_Output[kWh/m2]'].to_numpy()[day*P:(day+1)*P])
+
+
+@requires_highs
+@pytest.mark.parametrize('compact', [False, True])
+def test_link_representative_days_one_per_day(inputs, compact):
+    #full model with the storage empty before hour 1: CreateModel skips the storage balances at t = 1, LinkRepresentativeDays starts
+    #every original day from the linked level with the balances, so hour 1 is compared from the same empty start
+    full = pyo.ConcreteModel()
+    AddDesign(full, *[inputs[name] for name in PARAMETERS])
+    full.EElectrolyser_0 = pyo.Var(within=pyo.NonNegativeReals)                #load variation free at t = 1, as in CreateModel
+    AddOperation(full, inputs['df_storage'], inputs['df_Hydrogen'], inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'],
+                 initial={'SoC_h': 0, 'h2Storage': 0, 'EElectrolyser_h': full.EElectrolyser_0})
+    full.ObjFunction = pyo.Objective(expr=full.annuity_factor*full.revenue - full.costs, sense=pyo.maximize)
+    make_solver('highs', 'exact').solve(full)
+
+    aggregation = aggregate_profiles(inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'], HOURS//24)
+    assert list(aggregation['assignment']) == list(range(HOURS//24))
+    model = CreateModel(*[inputs[name] for name in PARAMETERS], aggregation['df_EWind_h'], aggregation['df_EPV_h'], aggregation['df_electricity_prices'],
+                        hour_weights=aggregation['hour_weights'], compact=compact)
+    LinkRepresentativeDays(model, aggregation, inputs['df_storage'])
+    make_solver('highs', 'exact').solve(model)
+    #not equal: SoC4-5 are not used (relaxation) and the self-discharge within a day is not applied to the level at its start (restriction)
+    assert pyo.value(model.ObjFunction) == pytest.approx(pyo.value(full.ObjFunction), rel=1e-3)
+    for name in DESIGN_VARIABLES:
+        assert pyo.value(getattr(model, name)) == pytest.approx(pyo.value(getattr(full, name)), rel=1e-3, abs=1), name
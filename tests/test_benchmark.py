@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark history: baseline of the comparable runs, regressions of a run, and a recorded run of the smallest case.
+"""
+import json
+import pytest
+from energy_hub.benchmark import baseline, find_regressions, main
+from conftest import requires_highs
+
+MACHINE = {'node': 'ci', 'processor': 'x86_64', 'cpu_count': 4, 'python': '3.11'}
+
+
+def run(build, solver=10.0, objective=100.0, accepted=False, regressions=(), machine=MACHINE):
+    return {'machine': machine, 'solver': 'highs', 'profile': 'fast', 'seed': 0, 'accepted': accepted, 'regressions': list(regressions),
+            'results': {'h168': {'times_s': {'build_model': build, 'solver': solver}, 'objective': objective, 'gap': 0.0}}}
+
+
+def test_baseline_of_comparable_runs():
+    other_machine = dict(MACHINE, node='laptop')
+    history = [run(9.0), run(1.0, accepted=True), run(1.2), run(5.0, regressions=[{'case': 'h168'}]), run(1.4), run(0.1, machine=other_machine)]
+    base = baseline(history, run(1.0), 'h168')
+    assert base['n_runs'] == 3                                              #from the accepted run, without the regression and the other machine
+    assert base['times_s']['build_model'] == 1.2
+    assert baseline(history, run(1.0), 'h168', window=2)['times_s']['build_model'] == pytest.approx(1.3)
+    assert baseline(history, run(1.0, machine=dict(MACHINE, node='new')), 'h168') is None
+
+
+def test_regressions():
+    history = [run(1.0), run(1.0)]
+    assert find_regressions(history, run(1.2)) == []                        #within the threshold (25 %)
+    assert find_regressions([run(0.01)], run(0.05)) == []                   #below min_seconds
+    slow, = find_regressions(history, run(1.5))
+    assert (slow['phase'], slow['baseline'], slow['value']) == ('build_model', 1.0, 1.5)
+    changed, = find_regressions(history, run(1.0, objective=100.1))
+    assert changed['phase'] == 'objective'
+    assert find_regressions([], run(5.0)) == []
+
+
+@requires_highs
+def test_recorded_run(tmp_path):
+    path = str(tmp_path/'history.json')
+    assert main(['--cases', 'h168', '--solver', 'highs', '--history', path]) == 0
+    with open(path) as f:
+        history = json.load(f)
+    entry, = history
+    assert entry['regressions'] == [] and entry['results']['h168']['termination'] == 'optimal'
+    assert set(entry['results']['h168']['times_s']) == {'build_model', 'solver', 'postprocess'}
+    assert main(['--cases', 'h168', '--solver', 'highs', '--compare-compact']) == 0
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+Compact formulation (alias flows as expressions, model.AddOperation compact=True) against the full formulation:
+same optimum and design, fewer variables and rows.
+"""
+from energy_hub.model import CreateModel, is_compact
+from energy_hub.solvers import make_solver
+from conftest import requires_highs, assert_same_solution
+
+pytestmark = requires_highs
+
+
+def test_compact_formulation_same_optimum_smaller_model(inputs):
+    full = CreateModel(**inputs, compact=False)
+    compact = CreateModel(**inputs, compact=True)
+    assert not is_compact(full) and is_compact(compact)
+    assert compact.nvariables() < full.nvariables()
+    assert compact.nconstraints() < full.nconstraints()
+
+    make_solver('highs').solve(full)
+    make_solver('highs').solve(compact)
+    assert_same_solution(compact, full)
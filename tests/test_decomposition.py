@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Benders decomposition and rolling horizon dispatch against the full model of the synthetic week.
+"""
+import pytest
+import pyomo.environ as pyo
+from energy_hub.decomposition import BendersDecomposition, RollingHorizonDispatch
+from energy_hub.inputs import INPUT_NAMES
+from energy_hub.pipeline import build_model
+from energy_hub.solvers import make_solver, available
+from energy_hub.sweep import DESIGN_VARIABLES
+from conftest import requires_highs, HOURS
+
+pytestmark = requires_highs
+
+
+@pytest.fixture
+def optimum(inputs):
+    model = build_model(inputs)
+    make_solver('highs', 'exact').solve(model)
+    return model
+
+
+def test_benders_bounds_and_design(inputs, optimum):
+    if not available('highs', persistent=True):
+        pytest.skip('no persistent HiGHS')
+    tol = 1e-4
+    master, history = BendersDecomposition(*[inputs[name] for name in INPUT_NAMES], block_hours=56, solver='persistent', workers=2, tol=tol)
+    objective = pyo.value(optimum.ObjFunction)
+    lower, upper = history['lower_bound'].iloc[-1], history['upper_bound'].iloc[-1]
+    assert (upper - lower)/abs(upper) <= tol
+    assert lower <= objective*(1 + 1e-6)
+    assert upper >= objective*(1 - 1e-6)
+    for name in DESIGN_VARIABLES:                           #within tol of the optimum: the storage sizes by less than 0.1 %
+        assert pyo.value(getattr(master, name)) == pytest.approx(pyo.value(getattr(optimum, name)), rel=1e-3, abs=1), name
+
+
+def test_rolling_horizon_revenue_below_full_model(inputs, optimum):
+    design = {name: pyo.value(getattr(optimum, name)) for name in DESIGN_VARIABLES}
+    source = (inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'])
+    parameters = [inputs[name] for name in ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen']]
+    with pytest.warns(RuntimeWarning, match='ramp limit violated'):      #12 h of overlap are too short for the ramp limit on this week
+        dispatch = RollingHorizonDispatch(*parameters, source, design, window=48, overlap=12, solver='highs')
+    assert dispatch['ramp_violation'].sum() > 0
+    assert list(dispatch.index) == list(range(1, HOURS + 1))
+    #same design, the windows do not see the later hours: at most the revenue of the full model
+    assert dispatch['revenue'].sum() <= pyo.value(optimum.revenue)*(1 + 1e-9)
+
+
+def test_rolling_horizon_max_violation(inputs, optimum):
+    design = {name: pyo.value(getattr(optimum, name)) for name in DESIGN_VARIABLES}
+    source = (inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'])
+    parameters = [inputs[name] for name in ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen']]
+    with pytest.raises(RuntimeError, match='max_violation'):
+        RollingHorizonDispatch(*parameters, source, design, window=48, overlap=12, solver='highs', max_violation=100)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Cash-flow functions (finance.py): known values of np_calculator and irr, batches of scenarios against row-by-row calls
+and the years of add_replacements at the end of the lifetime.
+"""
+import numpy as np
+import pytest
+from energy_hub.finance import np_calculator, costs_production_flow, add_replacements, cost_flow, levelised_cost, irr
+
+
+def test_np_calculator_known_values():
+    assert np_calculator([-100, 110], 0.1) == pytest.approx(0, abs=1e-9)
+    assert np_calculator([5, 1, 1], 0) == pytest.approx(7)
+    assert np_calculator(costs_production_flow(1, 3), 0.05) == pytest.approx((1 - 1.05**-3)/0.05, rel=1e-12)    #annuity factor
+    assert np_calculator([0, 0, 121], 0.1) == pytest.approx(100)
+
+
+def test_irr_known_values():
+    assert irr([-100, 110]) == pytest.approx(0.1, abs=1e-9)
+    assert irr([-100, 0, 121]) == pytest.approx(0.1, abs=1e-9)
+    rate = irr([-1000, 300, 400, 500])
+    assert np_calculator([-1000, 300, 400, 500], rate) == pytest.approx(0, abs=1e-6)
+    assert 0.08 < rate < 0.09
+    assert np.isnan(irr([100, 10, 10]))                                         #no sign change of the NPV
+
+
+def test_batch_matches_rows():
+    rng = np.random.default_rng(0)
+    flows = np.hstack([-rng.uniform(500, 1500, (5, 1)), rng.uniform(50, 300, (5, 20))])
+    rates = rng.uniform(0.02, 0.1, 5)
+    assert np.allclose(np_calculator(flows, rates), [np_calculator(row, rate) for row, rate in zip(flows, rates)], rtol=1e-12)
+    assert np.allclose(np_calculator(flows, 0.05), [np_calculator(row, 0.05) for row in flows], rtol=1e-12)
+    assert np.allclose(irr(flows), [irr(row) for row in flows], atol=1e-9, equal_nan=True)
+
+    capex, opex = np.array([100., 200., 300.]), np.array([10., 20., 30.])
+    batch = cost_flow(capex, opex, 10, 4, capex/2)
+    for k in range(3):
+        assert np.array_equal(batch[k], cost_flow(capex[k], opex[k], 10, 4, capex[k]/2))
+    assert np.allclose(levelised_cost(capex, opex, 50, 10, 0.05, 4, capex/2),
+                       [levelised_cost(capex[k], opex[k], 50, 10, 0.05, 4, capex[k]/2) for k in range(3)], rtol=1e-12)
+
+
+@pytest.mark.parametrize('interval, until, years', [
+    (5, None, [5, 10, 15]),                                                     #default: years < lifetime, none in the last year
+    (5, 20, [5, 10, 15, 20]),                                                   #until = lifetime: the last year included (<=)
+    (5, 19, [5, 10, 15]),
+    (7, None, [7, 14]),
+    (10, 19, [10]),
+    (0, None, []),                                                              #no replacement
+])
+def test_add_replacements_years(interval, until, years):
+    flow = add_replacements(np.zeros(21), interval, 3.0, until=until)           #lifetime 20: years 0..20
+    assert list(np.flatnonzero(flow)) == years and (flow[years] == 3.0).all()
+    batch = add_replacements(np.zeros((2, 21)), interval, [1.0, 2.0], until=until)
+    assert list(np.flatnonzero(batch[1])) == years and (batch[1, years] == 2.0).all()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+What-if changes applied to a solved IncrementalModel (apply_change text) against a model built and solved again
+from the changed inputs.
+"""
+import numpy as np
+import pytest
+from energy_hub.incremental import IncrementalModel, apply_change
+from energy_hub.pipeline import build_model
+from energy_hub.solvers import make_solver, available
+from energy_hub.synthetic import synthetic_inputs
+from conftest import requires_highs, assert_same_solution
+
+pytestmark = requires_highs
+
+CHANGES = ['pipe_capacity=20000', 'x6 <= 5e4', 'x4>=1000', 'wind[24:72]*0.5', 'price[:24]*2', 'H2_price=8']
+
+
+@pytest.mark.parametrize('solver', ['persistent', 'highs'])
+def test_apply_change_matches_rebuild(inputs, solver):
+    if solver == 'persistent' and not available('highs', persistent=True):
+        pytest.skip('no persistent HiGHS')
+    wind = inputs['df_EWind_h']['Wind_Power_1'].to_numpy().copy()
+    price = inputs['df_electricity_prices']['Average_2015_2022_[EUR/kWh]'].to_numpy().copy()
+    session = IncrementalModel(inputs, solver=solver)
+    base = session.solve()
+    assert not base['warm_start']
+    for change in CHANGES:
+        apply_change(session, change)
+    stats = session.solve()
+    assert stats['termination'] == 'optimal'
+    assert stats['objective'] != pytest.approx(base['objective'], rel=1e-3)
+    assert stats['changes']['variables'] == 2                                       #x6, x4
+    #pipe_capacity, H2_price and the hours whose value changes (a zero wind or price hour scaled stays the same)
+    assert stats['changes']['params'] == 2 + np.count_nonzero(wind[24:72]) + np.count_nonzero(price[:24])
+    assert stats['warm_start'] == (solver == 'persistent' or session.warmstart)
+
+    assert (inputs['df_EWind_h']['Wind_Power_1'].to_numpy() == wind).all()         #the inputs of the caller are not changed
+    assert session.inputs['df_Hydrogen'].loc['pipe_capacity', 'Input'] == 20000
+    assert (session.inputs['df_EWind_h']['Wind_Power_1'].to_numpy()[24:72] == wind[24:72]*0.5).all()
+
+    rebuilt = build_model(session.inputs)
+    rebuilt.H2_price.set_value(8)
+    rebuilt.x6.setub(5e4)
+    rebuilt.x4.setlb(1000)
+    make_solver('highs').solve(rebuilt)
+    assert_same_solution(session.model, rebuilt)
+
+
+def test_apply_change_rejects_unknown_text(inputs):
+    session = IncrementalModel(inputs, solver='highs')
+    for change in ['x6 < 5', 'x6=5', 'foo=1', 'foo<=1']:                            #not a Param, unknown name
+        with pytest.raises(ValueError):
+            apply_change(session, change)
+
+
+def test_update_scales_with_the_change_not_the_horizon():
+    if not available('highs', persistent=True):
+        pytest.skip('no persistent HiGHS')
+    stats = {}
+    for hours in (168, 672):
+        session = IncrementalModel(synthetic_inputs(hours), profile='fast')
+        session.solve()
+        for change in ['wind[24:48]*0.5', 'PV_CAPEX=500', 'x6<=5e4']:
+            apply_change(session, change)
+        stats[hours] = session.solve()
+        assert stats[hours]['termination'] == 'optimal'
+    #one coefficient per changed wind hour and one objective coefficient of PV_CAPEX, whatever the horizon
+    assert stats[168]['changes']['updates'] == stats[672]['changes']['updates'] == stats[168]['changes']['params']
+    assert stats[672]['update_time_s'] < 10*stats[168]['update_time_s'] + 0.01
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Input workbook cache: sheets parsed once, reused while the workbook is unchanged, rebuilt when its modification time,
+size and SHA-256 hash say it changed.
+"""
+import os
+import pandas as pd
+import pytest
+from energy_hub import input_cache
+from energy_hub.input_cache import read_excel_cached, _load_manifest
+
+pytest.importorskip('pyarrow')
+pytest.importorskip('openpyxl')
+
+SHEETS = {'general': {'sheet_name': 'General', 'index_col': 0}, 'prices': {'sheet_name': 'Prices'}}
+
+
+def write_workbook(path, price=0.05):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'Input': [85, 100]}, index=pd.Index(['shore_distance', 'area_hub'], name='Parameter')).to_excel(writer, sheet_name='General')
+        pd.DataFrame({'Hour': range(24), 'Price': [price]*24}).to_excel(writer, sheet_name='Prices', index=False)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    "Number of sheets parsed (pd.read_excel) and workbooks hashed by the cache"
+    calls = {'read_excel': 0, 'file_hash': 0}
+    read_excel, file_hash = pd.read_excel, input_cache.file_hash
+    def counted_read_excel(*args, **kwargs):
+        calls['read_excel'] += 1
+        return read_excel(*args, **kwargs)
+    def counted_file_hash(*args, **kwargs):
+        calls['file_hash'] += 1
+        return file_hash(*args, **kwargs)
+    monkeypatch.setattr(input_cache.pd, 'read_excel', counted_read_excel)
+    monkeypatch.setattr(input_cache, 'file_hash', counted_file_hash)
+    return calls
+
+
+def test_cache_reused_until_the_workbook_changes(tmp_path, calls):
+    path = str(tmp_path/'input_file.xlsx')
+    cache_dir = str(tmp_path/'.cache')
+    write_workbook(path)
+    first = read_excel_cached(path, SHEETS, cache_dir)
+    assert calls == {'read_excel': 2, 'file_hash': 1}
+
+    again = read_excel_cached(path, SHEETS, cache_dir)                   #same mtime and size: no hash, no parsing
+    assert calls == {'read_excel': 2, 'file_hash': 1}
+    for name in SHEETS:
+        pd.testing.assert_frame_equal(again[name], first[name])
+
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))                  #touched, same content: hashed, the cache is kept
+    read_excel_cached(path, SHEETS, cache_dir)
+    assert calls == {'read_excel': 2, 'file_hash': 2}
+    assert _load_manifest(cache_dir)['mtime'] == stat.st_mtime + 10
+
+    write_workbook(path, price=0.07)                                    #new content: every sheet parsed again
+    changed = read_excel_cached(path, SHEETS, cache_dir)
+    assert calls == {'read_excel': 4, 'file_hash': 3}
+    assert (changed['prices']['Price'] == 0.07).all()
+    assert _load_manifest(cache_dir)['sha256'] == input_cache.file_hash(path)
+
+
+def test_cache_rebuild_and_changed_arguments(tmp_path, calls):
+    path = str(tmp_path/'input_file.xlsx')
+    cache_dir = str(tmp_path/'.cache')
+    write_workbook(path)
+    read_excel_cached(path, SHEETS, cache_dir)
+    read_excel_cached(path, SHEETS, cache_dir, rebuild=True)
+    assert calls['read_excel'] == 4
+
+    sheets = {**SHEETS, 'prices': {'sheet_name': 'Prices', 'usecols': [1]}}   #only the sheet read with other arguments
+    dfs = read_excel_cached(path, sheets, cache_dir)
+    assert calls['read_excel'] == 5
+    assert list(dfs['prices'].columns) == ['Price']
+    os.remove(os.path.join(cache_dir, _load_manifest(cache_dir)['sheets']['general']['file']))   #missing cache file
+    read_excel_cached(path, sheets, cache_dir)
+    assert calls['read_excel'] == 6
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Matrix build (matrix_model.py) against CreateModel: same optimum and design x1-x6 on one synthetic week, with the
+default parameters and with the mutable Params of a changed model passed through.
+"""
+import pytest
+import pyomo.environ as pyo
+from energy_hub.inputs import INPUT_NAMES
+from energy_hub.matrix_model import CreateMatrixModel, solve_matrix_model, model_params
+from energy_hub.pipeline import build_model
+from energy_hub.solvers import make_solver
+from energy_hub.sweep import DESIGN_VARIABLES
+from conftest import requires_highs
+
+pytestmark = requires_highs
+
+
+@pytest.mark.parametrize('changes', [{}, {'H2_price': 6, 'PV_CAPEX': 500, 'pipe_capacity': 20000}])
+def test_matrix_model_matches_pyomo(inputs, changes):
+    model = build_model(inputs)
+    for name, value in changes.items():
+        getattr(model, name).set_value(value)
+    make_solver('highs', 'exact').solve(model)
+    mm = solve_matrix_model(CreateMatrixModel(*[inputs[name] for name in INPUT_NAMES], params=model_params(model)))
+    assert mm.objective == pytest.approx(pyo.value(model.ObjFunction), rel=1e-6)
+    for name in DESIGN_VARIABLES:
+        assert mm.value(name) == pytest.approx(pyo.value(getattr(model, name)), rel=1e-4, abs=1e-3), name
+    assert mm.blocks['carea_check'].size == 1 and mm.blocks['cbalanceH22'].size == len(model.T)
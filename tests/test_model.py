@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Rows of the model: the time-invariant area limit is one scalar constraint, the hourly families one row per hour.
+"""
+import pyomo.environ as pyo
+from energy_hub.pipeline import build_model
+
+
+def test_area_check_is_one_row(inputs):
+    model = build_model(inputs)
+    assert not model.carea_check.is_indexed() and len(model.carea_check) == 1
+    hourly = [c for c in model.component_objects(pyo.Constraint) if c.is_indexed()]
+    assert hourly and all(c.index_set() is model.T for c in hourly)
+    assert len(model.cbalanceH22) == len(model.T)
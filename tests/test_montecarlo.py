@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Monte-Carlo store: per-sample seeding and resume (only the samples missing from the store are solved).
+The evaluate functions are cheap stand-ins of uncertainty.MonteCarloEvaluator, the store logic does not depend on them,
+the last test runs the model evaluator on synthetic data.
+"""
+import pytest
+from energy_hub.montecarlo import run_montecarlo, sample_inputs, load_results
+from energy_hub.uncertainty import MonteCarloDistributions, MonteCarloEvaluator
+from conftest import requires_highs
+
+DISTRIBUTIONS = {'CAPEX_wind': ('triangular', 0.8, 1, 1.3), 'H2_price': ('uniform', 5, 15), 'weather_year': ('choice', [0, 1, 2])}
+
+
+def first_run(inputs):
+    return {'NPV': inputs['H2_price']*1e6, 'run': 1}
+
+
+def resumed_run(inputs):
+    return {'NPV': inputs['H2_price']*1e6, 'run': 2}
+
+
+def test_sample_draws_depend_only_on_seed_and_index():
+    assert sample_inputs(DISTRIBUTIONS, 7, 3) == sample_inputs(DISTRIBUTIONS, 7, 3)
+    assert sample_inputs(DISTRIBUTIONS, 7, 3) != sample_inputs(DISTRIBUTIONS, 7, 4)
+    assert sample_inputs(DISTRIBUTIONS, 7, 3) != sample_inputs(DISTRIBUTIONS, 8, 3)
+
+
+def test_resume_only_solves_missing_samples(tmp_path):
+    store = str(tmp_path/'mc.sqlite')
+    df_first = run_montecarlo(DISTRIBUTIONS, first_run, 3, store, seed=7, workers=2)
+    assert list(df_first.index) == [0, 1, 2]
+
+    df = run_montecarlo(DISTRIBUTIONS, resumed_run, 5, store, seed=7, workers=2)
+    assert list(df.index) == [0, 1, 2, 3, 4]
+    assert list(df['run']) == [1, 1, 1, 2, 2]                   #the stored samples were not solved again
+    for i in df.index:
+        assert df.loc[i, 'H2_price'] == sample_inputs(DISTRIBUTIONS, 7, i)['H2_price']
+    assert load_results(store).equals(df)
+
+
+def test_resume_with_other_seed_is_refused(tmp_path):
+    store = str(tmp_path/'mc.sqlite')
+    run_montecarlo(DISTRIBUTIONS, first_run, 2, store, seed=7, workers=1)
+    with pytest.raises(ValueError):
+        run_montecarlo(DISTRIBUTIONS, first_run, 2, store, seed=8, workers=1)
+
+
+@requires_highs
+def test_resume_with_model_evaluator(inputs, tmp_path):
+    store = str(tmp_path/'mc.sqlite')
+    distributions = MonteCarloDistributions(inputs['df_economic'], inputs['df_Hydrogen'])
+    evaluate = MonteCarloEvaluator(**inputs, solver='highs')
+    df_first = run_montecarlo(distributions, evaluate, 2, store, seed=0, workers=1)
+    df = run_montecarlo(distributions, evaluate, 3, store, seed=0, workers=1)
+    assert list(df.index) == [0, 1, 2]
+    assert (df['termination'] == 'optimal').all()
+    assert df.loc[[0, 1], ['NPV', 'solve_time_s', 'worker']].equals(df_first[['NPV', 'solve_time_s', 'worker']])     #stored rows, not solved again
+    assert df.loc[0, 'NPV_cash_flow'] == pytest.approx(df.loc[0, 'NPV'], rel=1e-6)
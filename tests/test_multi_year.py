@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-year horizon: the blocks of the streamed time series file (iter_years, iter_windows) and CreateMultiYearModel
+against CreateModel.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import pyomo.environ as pyo
+from energy_hub.model import CreateModel, CreateMultiYearModel
+from energy_hub.timeseries import iter_years, iter_windows, count_hours, COLUMNS
+from energy_hub.solvers import make_solver
+from energy_hub.synthetic import synthetic_scenarios
+from conftest import requires_highs, assert_same_solution, HOURS
+
+PARAMETERS = ['df_general', 'df_economic', 'df_solar', 'df_wind', 'df_storage', 'df_Hydrogen']
+FILE_COLUMNS = {'wind': 'wind_kW', 'solar': 'solar_kWh_m2', 'price': 'price_EUR_kWh'}
+
+
+def write_timeseries(path, scenarios):
+    "CSV file with the years of scenarios one after the other, column names FILE_COLUMNS"
+    df = pd.concat([pd.DataFrame({FILE_COLUMNS['wind']: wind[COLUMNS['wind']].to_numpy(), FILE_COLUMNS['solar']: solar[COLUMNS['solar']].to_numpy(),
+                                  FILE_COLUMNS['price']: price[COLUMNS['price']].to_numpy()}) for wind, solar, price in scenarios], ignore_index=True)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_iter_years_and_windows(tmp_path):
+    path = str(tmp_path/'timeseries.csv')
+    df = write_timeseries(path, synthetic_scenarios(100, 1))
+    assert count_hours(path) == 100
+    years = list(iter_years(path, hours_per_year=40, columns=FILE_COLUMNS))
+    assert [len(solar) for _, solar, _ in years] == [40, 40, 20]                #the last block is shorter
+    for key, position in [('wind', 0), ('solar', 1), ('price', 2)]:
+        streamed = np.concatenate([year[position][COLUMNS[key]].to_numpy() for year in years])
+        assert np.allclose(streamed, df[FILE_COLUMNS[key]].to_numpy())
+
+    in_memory = tuple(pd.DataFrame({COLUMNS[key]: df[FILE_COLUMNS[key]]}) for key in ['wind', 'solar', 'price'])
+    windows = list(iter_windows(path, window=30, overlap=10, columns=FILE_COLUMNS))
+    assert [start for start, *_ in windows] == [0, 20, 40, 60, 80]
+    assert len(windows[-1][2]) == 20                                            #the last window ends with the data
+    for (start, wind, solar, price), (start_m, wind_m, solar_m, price_m) in zip(windows, iter_windows(in_memory, window=30, overlap=10)):
+        assert start == start_m
+        assert np.allclose(solar[COLUMNS['solar']].to_numpy(), df[FILE_COLUMNS['solar']].to_numpy()[start:start + 30])
+        assert np.allclose(price[COLUMNS['price']].to_numpy(), price_m[COLUMNS['price']].to_numpy())
+
+
+@requires_highs
+def test_one_year_matches_create_model(inputs, tmp_path):
+    path = str(tmp_path/'timeseries.csv')
+    write_timeseries(path, [(inputs['df_EWind_h'], inputs['df_EPV_h'], inputs['df_electricity_prices'])])
+    multi_year = CreateMultiYearModel(*[inputs[name] for name in PARAMETERS], path, hours_per_year=HOURS, columns=FILE_COLUMNS)
+    model = CreateModel(**inputs)
+    assert len(multi_year.Y) == 1
+    assert pyo.value(multi_year.year_weight[0]) == pytest.approx(pyo.value(model.annuity_factor), rel=1e-12)
+    make_solver('highs', 'exact').solve(multi_year)
+    make_solver('highs', 'exact').solve(model)
+    assert_same_solution(multi_year, model)
+
+
+@requires_highs
+def test_years_linked(inputs, tmp_path):
+    path = str(tmp_path/'timeseries.csv')
+    write_timeseries(path, synthetic_scenarios(HOURS, 2))
+    multi_year = CreateMultiYearModel(*[inputs[name] for name in PARAMETERS], path, hours_per_year=HOURS, columns=FILE_COLUMNS)
+    lifetime = int(inputs['df_general'].loc['system_lifetime', 'Input'])
+    #the years of the lifetime alternate between the 2 weather years: weights of the odd and even years
+    discount = (1 + inputs['df_general'].loc['discount_rate', 'Input'])**-np.arange(1, lifetime + 1)
+    assert [pyo.value(multi_year.year_weight[y]) for y in multi_year.Y] == pytest.approx([discount[0::2].sum(), discount[1::2].sum()], rel=1e-12)
+    make_solver('highs', 'exact').solve(multi_year)
+    #the storage of year 1 starts from the last hour of year 0 (SoC1 at t = 1 uses the level of the previous block)
+    year0, year1 = multi_year.year[0], multi_year.year[1]
+    assert not year1.SoC_h[1].fixed
+    charge = pyo.value(year1.EUsed_Battery_h[1]*multi_year.charge_rate)
+    discharge = pyo.value((year1.EBattery_Grid_h[1] + year1.EBattery_Electrolyser_h[1] + year1.PIPEEBattery_Compressor_h[1] + year1.STOEBattery_Compressor_h[1])/multi_year.discharge_rate)
+    self_discharge = inputs['df_storage'].loc['Self_discharge', 'Input']
+    assert pyo.value(year1.SoC_h[1]) == pytest.approx(pyo.value(year0.SoC_h[HOURS])*self_discharge + charge - discharge, rel=1e-6, abs=1e-3)
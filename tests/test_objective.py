@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+The annuity-factor objective (revenues of one year times model.annuity_factor) against the nested sum it replaced
+(every hourly revenue discounted once per year of the lifetime): same optimum and same design x1-x6.
+"""
+import pytest
+import pyomo.environ as pyo
+from energy_hub.pipeline import build_model
+from energy_hub.solvers import make_solver
+from conftest import requires_highs, assert_same_solution
+
+pytestmark = requires_highs
+
+
+def nested_objective(model, inputs):
+    "Objective before the annuity factor: sum over the hours and the years of the lifetime of the discounted revenues, minus the costs"
+    lifetime = int(inputs['df_general'].loc['system_lifetime', 'Input'])
+    r = inputs['df_general'].loc['discount_rate', 'Input']
+    price = inputs['df_electricity_prices']['Average_2015_2022_[EUR/kWh]'].to_numpy(dtype=float)
+    return (sum((model.H2_Export_h[t]*model.H2_price)/((1+r)**(i+1)) for t in model.T for i in range(lifetime))
+            + sum((model.Electricity_export[t]*price[t-1])/((1+r)**(i+1)) for t in model.T for i in range(lifetime)) - model.costs)
+
+
+def test_annuity_factor_objective_matches_nested_sum(inputs):
+    model = build_model(inputs)
+    make_solver('highs').solve(model)
+
+    nested = build_model(inputs)
+    nested.ObjFunction.deactivate()
+    nested.NestedObjective = pyo.Objective(expr=nested_objective(nested, inputs), sense=pyo.maximize)
+    make_solver('highs').solve(nested)
+
+    assert_same_solution(model, nested)
+    lifetime = int(inputs['df_general'].loc['system_lifetime', 'Input'])
+    r = inputs['df_general'].loc['discount_rate', 'Input']
+    assert pyo.value(model.annuity_factor) == pytest.approx(sum(1/(1+r)**(i+1) for i in range(lifetime)), rel=1e-12)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Pareto front: the anchors (NPV optimum, best metric with NPV >= floor), a short epsilon-constraint front and a sweep
+with an infeasible point.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import pyomo.environ as pyo
+from energy_hub.pareto import anchors, pareto_front, ParetoModel, metric_value, METRICS
+from energy_hub.inputs import INPUT_NAMES
+from energy_hub.pipeline import build_model
+from energy_hub.solvers import make_solver
+from energy_hub.sweep import run_sweep, DESIGN_VARIABLES
+from conftest import requires_highs
+
+pytestmark = requires_highs
+
+
+@pytest.mark.parametrize('metric', ['x4', 'lcoh'])
+def test_anchors(inputs, metric):
+    model = build_model(inputs)
+    make_solver('highs').solve(model)
+    npv_optimum, best, design = anchors(inputs, metric, solver='highs', npv_floor=0)
+    assert design['x4'] == pytest.approx(pyo.value(model.x4), rel=1e-4)
+    if METRICS[metric]['sense'] == 'max':
+        assert npv_optimum == pytest.approx(pyo.value(model.x4), rel=1e-4)
+        assert best >= npv_optimum
+    else:
+        assert best <= npv_optimum
+
+    check = ParetoModel(*[inputs[name] for name in INPUT_NAMES], metric)          #best is reachable with NPV >= 0 and not better
+    check.epsilon.set_value(best*(1 - 1e-4) if METRICS[metric]['sense'] == 'max' else best*(1 + 1e-4))
+    opt = make_solver('highs')
+    opt.solve(check)
+    assert opt.optimal() and pyo.value(check.ObjFunction) >= -1e-3*abs(pyo.value(model.ObjFunction))
+    assert metric_value(check) == pytest.approx(best, rel=1e-3)
+
+
+def test_front_is_monotone(inputs, tmp_path):
+    df = pareto_front(inputs, 'x4', n_points=4, solver='highs', workers=1, out_file=str(tmp_path/'front.csv'))
+    assert len(df) == 4 and df['pareto_optimal'].all()
+    npv = df['NPV'].to_numpy()
+    assert (npv[1:] <= npv[:-1] + 1e-6*abs(npv[0])).all()                      #more electrolyser capacity forced, less NPV
+    label = METRICS['x4']['label']
+    assert (df[label].to_numpy() >= df.index.to_numpy()*(1 - 1e-6)).all()       #every point meets its epsilon
+    assert (tmp_path/'front.csv').exists()
+
+
+@pytest.mark.parametrize('solver', ['persistent', 'highs'])
+def test_sweep_reports_infeasible_point(inputs, tmp_path, solver):
+    label = METRICS['curtailment']['label']
+    out_file = tmp_path/'sweep.csv'
+    df = run_sweep(ParetoModel, tuple(inputs[name] for name in INPUT_NAMES) + ('curtailment', False), 'epsilon', [-1, 1e12],
+                   result_fn=lambda model: {label: metric_value(model)}, solver=solver, workers=1, out_file=str(out_file), cache_dir=str(tmp_path/'cache'))
+    assert len(df) == 2                                                         #curtailment <= -1 is infeasible, the chunk goes on
+    assert df.loc[-1, 'termination'] != 'optimal'
+    assert df.loc[-1, ['objective', label] + DESIGN_VARIABLES].isna().all()
+    assert df.loc[1e12, 'termination'] == 'optimal' and not np.isnan(df.loc[1e12, label])
+    written = pd.read_csv(out_file, index_col='epsilon')
+    assert list(written.index) == [-1, 1e12] and label in written.columns      #the first row had no result_fn columns
+
+    again = run_sweep(ParetoModel, tuple(inputs[name] for name in INPUT_NAMES) + ('curtailment', False), 'epsilon', [-1, 1e12],
+                      result_fn=lambda model: {label: metric_value(model)}, solver=solver, workers=1, cache_dir=str(tmp_path/'cache'))
+    assert list(again['cached']) == [False, True]                               #the infeasible point is not cached
+
+
+def test_lcoh_without_h2_at_the_npv_optimum(inputs):
+    inputs['df_economic'] = inputs['df_economic'].copy()
+    inputs['df_economic'].loc['CAPEX_Electrolysis', 'Input'] *= 100                 #the NPV optimum builds no electrolyser
+    npv_optimum, best, design = anchors(inputs, 'lcoh', solver='highs')
+    assert design['x4'] == pytest.approx(0, abs=1e-6) and npv_optimum == np.inf
+    assert np.isfinite(best) and best > 0                                       #Dinkelbach started from an H2-producing solution
+    with pytest.raises(ValueError):
+        pareto_front(inputs, 'lcoh', n_points=3, solver='highs', workers=1)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Run profiling: phases recorded only inside a RunProfile, nested phase names, model sizes and the written files.
+"""
+import json
+import pstats
+import pytest
+import pyomo.environ as pyo
+from energy_hub.profiling import RunProfile, phase, model_size
+from energy_hub.model import CreateModel
+from energy_hub.solvers import make_solver
+from conftest import requires_highs
+
+
+def test_phase_without_run_profile():
+    with phase('solve', solver='highs') as record:
+        record['extra'] = 1
+    assert record == {'solver': 'highs', 'extra': 1}                        #nothing measured
+
+
+def test_nested_phases(tmp_path):
+    with RunProfile(cprofile=True, case='test') as run_profile:
+        with phase('build_model', hours=24) as record:
+            record['n'] = 5
+            with phase('design_constants'):
+                sum(range(100000))
+        with pytest.raises(ValueError):
+            with phase('postprocess'):
+                raise ValueError('recorded anyway')
+        with pytest.raises(RuntimeError):
+            with RunProfile():
+                pass
+    records = {record['phase']: record for record in run_profile.phases}
+    assert list(records) == ['build_model/design_constants', 'build_model', 'postprocess']
+    assert records['build_model']['hours'] == 24 and records['build_model']['n'] == 5
+    assert records['build_model']['wall_time_s'] >= records['build_model/design_constants']['wall_time_s']
+    assert records['build_model']['start_s'] <= records['build_model/design_constants']['start_s']
+    assert [line.split()[0] for line in run_profile.summary()] == ['build_model', 'design_constants', 'postprocess']
+    assert run_profile.summary()[1].startswith('  design_constants')
+
+    paths = run_profile.write(str(tmp_path/'run_profile.json'))
+    assert paths == [str(tmp_path/'run_profile.json'), str(tmp_path/'run_profile.prof')]
+    with open(paths[0]) as f:
+        data = json.load(f)
+    assert data['run']['case'] == 'test' and len(data['phases']) == 3
+    assert pstats.Stats(paths[1]).total_calls > 0
+    with phase('after'):                                                    #no RunProfile active any more
+        pass
+    assert len(run_profile.phases) == 3
+
+
+def test_model_size():
+    model = pyo.ConcreteModel()
+    model.x = pyo.Var(within=pyo.Binary)
+    model.y = pyo.Var(within=pyo.Integers)
+    model.z = pyo.Var([1, 2])
+    model.z[2].fix(1)
+    model.c = pyo.Constraint(expr=model.x + model.y <= 3)
+    model.d = pyo.Constraint([1, 2], rule=lambda model, i: model.z[i] + model.y >= i)
+    model.e = pyo.Constraint(expr=model.x >= 0)
+    model.e.deactivate()
+    model.obj = pyo.Objective(expr=model.x + model.z[1] + model.z[2])
+    size = model_size(model)
+    assert (size['n_variables'], size['n_binary'], size['n_integer']) == (3, 1, 1)
+    assert size['n_constraints'] == 3 and size['n_nonzeros'] == 2 + 2 + 1     #z[2] fixed: a constant
+    assert size['constraint_blocks'] == {'c': {'constraints': 1, 'nonzeros': 2}, 'd': {'constraints': 2, 'nonzeros': 3}}
+    assert size['objective_nonzeros'] == 2
+
+
+@requires_highs
+def test_solver_phase_and_model_size(inputs):
+    with RunProfile() as run_profile:
+        model = CreateModel(**inputs)
+        size = run_profile.add_model('base', model)
+        make_solver('highs').solve(model)
+    assert size['n_constraints'] == model.nconstraints()
+    assert size['n_integer'] == 1                                           #x2, the number of turbines
+    record, = [record for record in run_profile.phases if record['phase'] == 'solver']
+    assert record['solver'] == 'highs' and record['wall_time_s'] > 0
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Headless report: min/max decimation of long series, the rendering tasks and the files rendered off-screen.
+"""
+import os
+import numpy as np
+import pytest
+from energy_hub.report import minmax_indices, decimate, report_tasks, render_report
+from energy_hub.plots import FIGURES, figure_series
+from energy_hub.model import CreateModel
+from energy_hub.results import extract_timeseries
+from energy_hub.solvers import make_solver
+from conftest import requires_highs
+
+
+def test_short_series_not_decimated():
+    series = {'hour': np.arange(100), 'a': np.random.default_rng(0).random(100)}
+    assert np.array_equal(minmax_indices([series['a']], max_points=100), np.arange(100))
+    assert np.array_equal(decimate(series, max_points=100)['a'], series['a'])
+
+
+def test_minmax_decimation_keeps_the_envelope():
+    rng = np.random.default_rng(1)
+    n = 70000
+    a, b = rng.normal(size=n).cumsum(), rng.random(n)
+    b[12345] = 50                                                           #isolated peak
+    a[[0, n-1]] = np.nan                                                    #NaN drawn as gaps, decimated as 0
+    index = minmax_indices([a, b], max_points=2000)
+    assert len(index) <= 2000 + 2
+    assert np.all(np.diff(index) > 0)
+    assert index[0] == 0 and index[-1] == n-1
+    assert 12345 in index
+    n_buckets = 2000//4
+    size = -(-n//n_buckets)
+    for y in (np.nan_to_num(a), b):                                          #same min and max in every bucket
+        kept = np.full(n, np.nan)
+        kept[index] = y[index]
+        for start in range(0, n, size):
+            assert np.nanmax(kept[start:start+size]) == y[start:start+size].max()
+            assert np.nanmin(kept[start:start+size]) == y[start:start+size].min()
+
+    series = decimate({'hour': np.arange(n) + 1, 'a': a, 'b': b}, max_points=2000)
+    assert np.array_equal(series['hour'], index + 1)                        #x axis at the kept hours, not decimated itself
+    assert np.array_equal(series['b'], b[index])
+
+
+@pytest.fixture
+def df_results(inputs):
+    model = CreateModel(**inputs)
+    make_solver('highs').solve(model)
+    return extract_timeseries(model)
+
+
+@requires_highs
+def test_report_tasks(df_results, tmp_path):
+    tasks = report_tasks({'base': df_results, 'H2_6': df_results}, str(tmp_path), max_points=40)
+    assert len(tasks) == 2*len(FIGURES)
+    for spec, series, base, formats, dpi in tasks:
+        assert list(series) == figure_series(spec)
+        if spec['window'][0] < len(df_results):                               #the zoom windows are after the synthetic week
+            assert 0 < len(series['hour']) <= 40 + 2
+        assert os.path.dirname(base) in (str(tmp_path/'base'), str(tmp_path/'H2_6'))
+
+
+@requires_highs
+def test_render_report(df_results, tmp_path):
+    pytest.importorskip('matplotlib')
+    paths = render_report(df_results, str(tmp_path), formats=('png', 'svg'), workers=2)
+    assert sorted(paths) == sorted(str(tmp_path/(spec['name'] + '.' + fmt)) for spec in FIGURES for fmt in ('png', 'svg'))
+    assert all(os.path.getsize(path) > 0 for path in paths)
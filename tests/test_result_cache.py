@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Result cache: keys of the inputs and options, stored entries and the eviction of the least recently used entries.
+"""
+import os
+import numpy as np
+from energy_hub.result_cache import cache_key, save_result, load_result, evict, model_params
+from energy_hub.model import CreateModel
+
+
+def test_cache_key(inputs):
+    df = inputs['df_electricity_prices']
+    key = cache_key(df, {'solver': 'highs', 'compact': False})
+    assert key == cache_key(df.copy(), {'compact': False, 'solver': 'highs'})        #same content, dict order ignored
+    changed = df.copy()
+    changed.iloc[5, 1] += 1e-6
+    assert cache_key(changed, {'solver': 'highs', 'compact': False}) != key
+    assert cache_key(df.rename(columns={'Hour': 'hour'}), {'solver': 'highs', 'compact': False}) != key
+    assert cache_key(df, {'solver': 'highs', 'compact': True}) != key
+    assert cache_key(np.arange(3)) != cache_key(np.arange(3, dtype=float))
+
+
+def test_model_params_in_key(inputs):
+    model = CreateModel(**inputs)
+    params = model_params(model)
+    assert params['H2_price'] == 10
+    model.H2_price.set_value(6)
+    assert cache_key(model_params(model)) != cache_key(params)
+
+
+def test_save_and_load(tmp_path):
+    cache_dir = str(tmp_path)
+    arrays = {'x2': np.array([60.0]), 'SoC_h': np.array([0.0, np.nan, 3.5])}
+    assert load_result(cache_dir, 'missing') is None
+    save_result(cache_dir, 'a', arrays, {'NPV': 1.5, 'IRR': np.float64(0.2)})
+    loaded, kpis = load_result(cache_dir, 'a')
+    assert kpis == {'NPV': 1.5, 'IRR': 0.2}
+    assert loaded.keys() == arrays.keys()
+    for name in arrays:
+        np.testing.assert_array_equal(loaded[name], arrays[name])
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
+
+
+def test_lru_eviction(tmp_path):
+    cache_dir = str(tmp_path)
+    for age, key in enumerate(['c', 'b', 'a']):                            #a oldest, c newest
+        save_result(cache_dir, key, {'values': np.random.default_rng(age).random(1000)}, {'key': key})
+        mtime = 1e9 + 100*(2 - age)
+        os.utime(os.path.join(cache_dir, key + '.json'), (mtime, mtime))
+    size = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+    assert load_result(cache_dir, 'a') is not None                          #a used: now the most recent
+    assert evict(cache_dir, max_bytes=size) == 0
+    assert evict(cache_dir, max_bytes=size - 1) == 1                         #b, the least recently used, goes first
+    assert sorted(os.listdir(cache_dir)) == ['a.json', 'a.npz', 'c.json', 'c.npz']
+    assert evict(cache_dir, max_bytes=1) == 2
+    assert os.listdir(cache_dir) == []
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk extraction of the solution: extract_timeseries against pyo.value hour by hour, and the solution_arrays/load_solution
+round trip of the result cache.
+"""
+import numpy as np
+import pytest
+import pyomo.environ as pyo
+from energy_hub.model import CreateModel
+from energy_hub.results import hourly_variables, extract_timeseries, solution_arrays, load_solution
+from energy_hub.solvers import make_solver
+from conftest import requires_highs, HOURS
+
+
+def test_unsolved_values_are_nan(inputs):
+    model = CreateModel(**inputs)
+    df = extract_timeseries(model, ['SoC_h', 'EPV_h'])
+    assert df.loc[1, 'SoC_h'] == 0                                          #fixed initial level
+    assert df['SoC_h'].iloc[1:].isna().all()
+    assert df['EPV_h'].isna().all()
+
+
+@requires_highs
+@pytest.mark.parametrize('compact', [False, True])
+def test_extract_timeseries_matches_pyo_value(inputs, compact):
+    model = CreateModel(**inputs, compact=compact)
+    make_solver('highs').solve(model)
+    names = hourly_variables(model)
+    assert {'EPV_h', 'SoC_h', 'H2_Export_h', 'variation'} <= set(names)   #Vars, and the Expressions of the compact formulation
+    df = extract_timeseries(model)
+    assert list(df.index) == list(range(1, HOURS + 1))
+    assert list(df.columns) == names
+    for name in names:
+        expected = [pyo.value(getattr(model, name)[t]) for t in model.T]
+        assert np.allclose(df[name].to_numpy(), expected, rtol=0, atol=1e-9), name
+
+
+@requires_highs
+def test_solution_round_trip(inputs):
+    model = CreateModel(**inputs)
+    make_solver('highs').solve(model)
+    arrays = solution_arrays(model)
+    assert arrays['x2'].shape == (1,) and arrays['SoC_h'].shape == (HOURS,)
+    copy = CreateModel(**inputs)
+    load_solution(copy, arrays)
+    for var in model.component_data_objects(pyo.Var):
+        assert copy.find_component(var.name).value == var.value, var.name
+    assert pyo.value(copy.ObjFunction) == pytest.approx(pyo.value(model.ObjFunction), rel=1e-12)
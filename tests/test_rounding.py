@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+LP relaxation and rounding of x2 (rounding.py) against the MILP. A hub area of 79.3 km2 gives a fractional relaxed
+turbine count (47.58 on the synthetic week) and a rounding gap of about 1.2 %.
+"""
+import pytest
+import pyomo.environ as pyo
+from energy_hub.pipeline import build_model
+from energy_hub.rounding import solve_lp_rounding
+from energy_hub.solvers import make_solver
+from conftest import requires_highs, assert_same_solution
+
+pytestmark = requires_highs
+
+
+@pytest.fixture
+def fractional(inputs):
+    inputs['df_general'].loc['area_hub', 'Input'] = 79.3
+    return inputs
+
+
+def milp(inputs):
+    model = build_model(inputs)
+    make_solver('highs').solve(model)
+    return model
+
+
+@pytest.mark.parametrize('solver', [None, 'highs'])
+def test_gap_above_tolerance_solves_milp(fractional, solver):
+    reference = milp(fractional)
+    model = build_model(fractional)
+    stats = solve_lp_rounding(model, solver=solver, gap_tol=0.001)
+    assert stats['method'] == 'lp_rounding+milp'
+    assert stats['relaxed_x2'] == pytest.approx(47.58, abs=0.01)
+    assert set(stats['rounded']) == {'47', '48'} and stats['rounded']['48'] is None          #48 turbines do not fit in the hub area
+    assert stats['rounded']['47'] <= pyo.value(reference.ObjFunction)*(1 + 1e-9)             #the MIP start
+    assert stats['lp_bound'] >= pyo.value(reference.ObjFunction)
+    assert pyo.value(model.x2) == int(pyo.value(model.x2))
+    assert model.x2.domain is pyo.NonNegativeIntegers                         #integer again after the relaxation
+    assert_same_solution(model, reference)
+
+
+def test_gap_below_tolerance_keeps_rounded_solution(fractional):
+    reference = pyo.value(milp(fractional).ObjFunction)
+    model = build_model(fractional)
+    stats = solve_lp_rounding(model, gap_tol=0.05)
+    assert stats['method'] == 'lp_rounding'
+    assert set(stats['rounded']) == {'47', '48'} and stats['rounded']['48'] is None
+    assert stats['objective'] == stats['rounded']['47']                                      #the better (only feasible) candidate
+    assert stats['gap'] == pytest.approx((stats['lp_bound'] - stats['objective'])/abs(stats['objective']), rel=1e-9)   #certified gap
+    assert 0.001 < stats['gap'] <= 0.05
+    assert stats['objective'] == pytest.approx(pyo.value(model.ObjFunction), rel=1e-9)      #the loaded solution is the rounded one
+    assert stats['objective'] <= reference*(1 + 1e-9) <= stats['lp_bound']*(1 + 1e-9)
+    assert pyo.value(model.x2) in (47, 48)
+
+
+def test_integral_relaxation_is_optimal(inputs):
+    reference = pyo.value(milp(inputs).ObjFunction)
+    model = build_model(inputs)
+    stats = solve_lp_rounding(model)
+    assert stats['gap'] == 0 and stats['method'] == 'lp_rounding'
+    assert stats['objective'] == pytest.approx(reference, rel=1e-6)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Site screening: site table read and applied to the inputs, every site solved as its own model, ranking by NPV,
+failed sites last and a second run served by the result cache.
+"""
+import pandas as pd
+import pytest
+import pyomo.environ as pyo
+from energy_hub.pipeline import build_model
+from energy_hub.sites import read_sites, site_inputs, run_sites
+from energy_hub.solvers import make_solver
+from energy_hub.synthetic import synthetic_inputs
+from energy_hub.timeseries import COLUMNS
+from conftest import requires_highs, HOURS
+
+pytestmark = requires_highs
+
+
+@pytest.fixture
+def sites(tmp_path):
+    "Site table: A = the inputs, B farther from shore, C other weather (profiles file), D a parameter that does not exist"
+    other = synthetic_inputs(HOURS, seed=5)
+    pd.DataFrame({column: other[name][column] for name, column in [('df_EWind_h', COLUMNS['wind']), ('df_EPV_h', COLUMNS['solar']),
+                                                                    ('df_electricity_prices', COLUMNS['price'])]}).to_csv(tmp_path/'weather.csv', index=False)
+    pd.DataFrame({'site': ['A', 'B', 'C', 'D'], 'profiles': [None, None, 'weather.csv', None], 'shore_distance': [None, 200, None, None],
+                  'CAPEX_pipe': [None, 9e7, None, None], 'not_a_parameter': [None, None, None, 1.0]}).to_csv(tmp_path/'sites.csv', index=False)
+    return str(tmp_path/'sites.csv')
+
+
+def test_site_inputs_override_parameters_and_profiles(inputs, sites):
+    table = read_sites(sites)
+    inputs_b = site_inputs(inputs, table.loc['B'])
+    assert inputs_b['df_general'].loc['shore_distance', 'Input'] == 200
+    assert inputs['df_general'].loc['shore_distance', 'Input'] != 200           #the inputs are not changed
+    assert inputs_b['df_EWind_h'] is inputs['df_EWind_h']
+    inputs_c = site_inputs(inputs, table.loc['C'])
+    assert len(inputs_c['df_EWind_h']) == HOURS
+    assert not inputs_c['df_EWind_h'][COLUMNS['wind']].equals(inputs['df_EWind_h'][COLUMNS['wind']])
+    with pytest.raises(ValueError):
+        site_inputs(inputs, table.loc['D'])
+
+
+def test_run_sites_ranking_and_cache(inputs, sites, tmp_path):
+    table = read_sites(sites)
+    table.loc['E'] = table.loc['A']
+    table.loc['E', 'profiles'] = str(tmp_path/'missing.csv')                   #D and E fail: reported last, the other sites go on
+    cache_dir = str(tmp_path/'cache')
+    df = run_sites(inputs, table, solver='highs', workers=2, cache_dir=cache_dir, out_file=str(tmp_path/'ranking.csv'))
+
+    assert list(df['rank']) == [1, 2, 3, 4, 5]
+    assert set(df.index[-2:]) == {'D', 'E'} and df.loc[['D', 'E'], 'error'].map(lambda error: isinstance(error, str)).all()
+    assert 'not_a_parameter' in df.loc['D', 'error']
+    ranked = df.drop(index=['D', 'E'])
+    assert ranked['NPV'].is_monotonic_decreasing
+    assert ranked.loc['A', 'NPV'] > ranked.loc['B', 'NPV']                    #same site farther from shore with a dearer pipe
+    model = build_model(inputs)                                                 #site A = the model of the inputs
+    make_solver('highs').solve(model)
+    assert ranked.loc['A', 'NPV'] == pytest.approx(pyo.value(model.ObjFunction), rel=1e-6)
+
+    df_again = run_sites(inputs, table.drop(index=['D', 'E']), solver='highs', workers=2, cache_dir=cache_dir)
+    assert df_again['cached'].all()
+    assert df_again['NPV'].to_dict() == pytest.approx(ranked['NPV'].to_dict())
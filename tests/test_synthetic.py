@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic input data: the same hours and seed give the same data, plausible profiles, costs scaled to the horizon,
+and a workbook that load_inputs reads back.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from energy_hub.synthetic import synthetic_inputs, synthetic_profiles, synthetic_scenarios, write_workbook, ECONOMIC
+from energy_hub.inputs import INPUT_NAMES, load_inputs
+
+
+def test_same_seed_same_data():
+    a, b = synthetic_inputs(500, seed=3), synthetic_inputs(500, seed=3)
+    assert list(a) == INPUT_NAMES
+    for name in INPUT_NAMES:
+        pd.testing.assert_frame_equal(a[name], b[name])
+    other = synthetic_inputs(500, seed=4)
+    assert not np.array_equal(a['df_EWind_h']['Wind_Power_1'], other['df_EWind_h']['Wind_Power_1'])
+    scenarios = synthetic_scenarios(500, 2, seed=3)                       #scenario s = seed + s
+    pd.testing.assert_frame_equal(scenarios[0][1], a['df_EPV_h'])
+    pd.testing.assert_frame_equal(scenarios[1][2], other['df_electricity_prices'])
+
+
+def test_profiles():
+    wind_cf, solar_cf, price = synthetic_profiles(8760)
+    assert wind_cf.min() >= 0 and wind_cf.max() <= 1
+    assert solar_cf.min() >= 0 and solar_cf.max() <= 1
+    night = np.arange(8760) % 24 < 3
+    assert solar_cf[night].max() == 0                                       #no sun at night at 54 N
+    assert solar_cf[:24*31].sum() < solar_cf[24*170:24*201].sum()           #January below June-July
+    assert 0 < (price < 0).mean() < 0.05                                    #a few negative hours
+    assert 0.2 < wind_cf.mean() < 0.8
+
+
+def test_costs_scaled_to_the_horizon():
+    week, year = synthetic_inputs(168), synthetic_inputs(8760)
+    assert year['df_economic'].loc['CAPEX_wind', 'Input'] == ECONOMIC['CAPEX_wind']
+    assert week['df_economic'].loc['CAPEX_wind', 'Input'] == pytest.approx(ECONOMIC['CAPEX_wind']*168/8760)
+    assert week['df_Hydrogen'].loc['pipe_capacity', 'Input'] == year['df_Hydrogen'].loc['pipe_capacity', 'Input']     #not a cost
+
+
+def test_workbook_round_trip(tmp_path):
+    pytest.importorskip('openpyxl')
+    inputs = synthetic_inputs(48, seed=1)
+    path = str(tmp_path/'input_file.xlsx')
+    write_workbook(path, inputs)
+    loaded = load_inputs(path)
+    for name in INPUT_NAMES:
+        expected = inputs[name]
+        if expected.index.name == 'Parameter':
+            assert np.allclose(loaded[name]['Input'].to_numpy(dtype=float), expected['Input'].to_numpy(dtype=float)), name
+            assert list(loaded[name].index) == list(expected.index), name
+        else:
+            column = expected.columns[1]
+            assert np.allclose(loaded[name][column].to_numpy(dtype=float), expected[column].to_numpy()), name